@@ -2,24 +2,40 @@
 
 import asyncio
 import argparse
+import functools
 import json
+import os
 import sys
 import time
 import yaml
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Awaitable, Callable, List, Dict, Any, Optional, Union
 
 from src.utils.logger import Logger
 from src.utils.xray_config_generator import XrayConfigGenerator
 from src.utils.glider_config_generator import GliderConfigGenerator
 from src.encoders.encoder import ProxyEncoder
+from src.models.proxy_record import ProxyRecord
 from src.parsers.line_parser import LineParser
-from src.parsers.base64_parser import Base64Parser
+from src.parsers.subscription_parser import SubscriptionParser
 from src.testers.tcp_tester import TCPTester
 from src.testers.xray_tester import XrayTester
 from src.testers.glider_tester import GliderTester
 from src.testers.ssh_tester import SSHTester
-from src.fetchers.http_fetcher import HttpFetcher
+from src.testers.batch_dispatcher import BatchDispatcher
+from src.testers.test_result import TestResult
+from src.fetchers.http_fetcher import HttpFetcher, StreamedLinks
+from src.fetchers.fetch_cache import FetchCache
+from src.utils.dns_resolver import DNSResolver
+from src.utils.concurrency import AdaptiveLimiter
+from src.utils.pipeline import Pipeline, Stage
+from src.utils.health_store import HealthStore
+from src.utils.encode_cache import EncodeCache
+from src.utils.proxy_ranker import ProxyRanker
+from src.utils.config_writer import ConfigWriter
+from src.utils.scheduler import Scheduler
+from src.utils.glider_supervisor import GliderSupervisor
 from src.outputs.file_output import FileOutput
 from tqdm import tqdm
 from src.validators.proxy_validator import ProxyValidator
@@ -38,27 +54,57 @@ def format_time(seconds: float) -> str:
         minutes = int((seconds % 3600) / 60)
         return f"{hours}h{minutes:02d}m"
 
-async def parse_subscription(content: str, logger: Logger) -> List[str]:
-    """解析订阅内容并返回代理链接列表"""
+def create_encode_cache(cache_config: Dict[str, Any], logger: Logger):
+    """创建链接编码缓存（未启用时返回None）"""
+    if not cache_config.get('enabled', False):
+        return None
+    return EncodeCache(
+        db_path=cache_config.get('db', 'results/cache/encode_cache.db'),
+        memory_size=cache_config.get('memory_size', 20000),
+        max_entries=cache_config.get('max_entries', 200000),
+        logger=logger
+    )
+
+def create_proxy_ranker(client_config: Dict[str, Any], logger: Logger) -> ProxyRanker:
+    """创建代理排序器（读取结果文件旁的测试指标，健康状态数据库存在时加入历史成功情况）"""
+    ranking_config = client_config.get('ranking', {})
+    site_metrics = {
+        site: FileOutput.load_metrics(results_file)
+        for site, results_file in client_config['proxy_results'].items()
+    }
+    health_db = ranking_config.get('health_db')
+    health_store = HealthStore(db_path=health_db, logger=logger) if health_db and os.path.exists(health_db) else None
+    return ProxyRanker(site_metrics, health_store, ranking_config.get('failure_penalty', 0.5))
+
+async def parse_subscription(content: str, logger: Logger) -> List[Union[str, ProxyRecord]]:
+    """解析订阅内容并返回代理链接列表（根据内容开头识别格式，Clash/sing-box配置返回代理记录）"""
     try:
-        # 尝试Base64解码
-        parser = Base64Parser()
-        lines = parser.parse(content)
+        lines = SubscriptionParser().parse(content)
                 
     except Exception as e:
-        # 如果Base64解析失败，尝试直接按行解析
-        logger.debug(f"Base64 parsing failed, trying line by line: {str(e)}")
+        # 识别为Base64/配置但解析失败时，按行解析
+        logger.debug(f"Subscription parsing failed, trying line by line: {str(e)}")
         line_parser = LineParser()
         lines = line_parser.parse(content)
     
     return lines
 
-async def filter_subscriptions(logger: Logger):
-    """清洗订阅源的代理"""
+async def filter_subscriptions(logger: Logger, refresh: Optional[List[str]] = None,
+                               source_items: Optional[Dict[str, List[Any]]] = None,
+                               config: Optional[Dict[str, Any]] = None) -> bool:
+    """清洗订阅源的代理，保存了结果时返回True
+
+    Args:
+        refresh: 需要重新获取的订阅源，为None时获取全部订阅源
+        source_items: 订阅源 -> 上次解析出的代理链接和代理记录（守护模式在多次运行之间保留），
+            不在 refresh 中或获取失败的订阅源直接使用上次的内容
+        config: 清洗配置，为None时读取 config/proxies_filter.yaml
+    """
     try:
         # 加载配置
-        with open('config/proxies_filter.yaml', 'r') as f:
-            config = yaml.safe_load(f)
+        if config is None:
+            with open('config/proxies_filter.yaml', 'r') as f:
+                config = yaml.safe_load(f)
         
         # 备份现有结果
         logger.info("\nBacking up previous results...")
@@ -70,92 +116,26 @@ async def filter_subscriptions(logger: Logger):
         )
         output.backup_results()
         
-        # 获取代理
-        logger.section("Fetching Proxies")
-        
-        # 使用集合存储所有代理链接，自动去重
-        all_proxy_links = set()
-        
-        # 配置HTTP获取器
-        fetcher_config = config['subscription']['fetcher']
-        http_fetcher = HttpFetcher(
-            logger=logger,
-            connect_timeout=fetcher_config['timeout'],
-            max_retries=fetcher_config['retry_times'],
-            proxy=fetcher_config.get('proxy')
-        )
-        
-        # 获取所有订阅源的代理链接
-        for url in config['subscription']['urls']:
-            try:
-                content = await http_fetcher.fetch(url)
-                proxy_links = await parse_subscription(content, logger)
-                if proxy_links:
-                    original_count = len(all_proxy_links)
-                    all_proxy_links.update(proxy_links)
-                    new_count = len(all_proxy_links)
-                    added_count = new_count - original_count
-                    logger.info(f"[+] Found {len(proxy_links)} proxies from {url} ({added_count} new)")
-            except Exception as e:
-                logger.error(f"[-] Failed to fetch from {url}: {str(e)}")
-        
-        if not all_proxy_links:
-            logger.error("No proxies found")
-            return
-            
-        # 将代理链接转换为元信息
-        logger.info(f"\nConverting {len(all_proxy_links)} unique proxy links to metadata")
-        all_proxies = []
-        for link in all_proxy_links:
-            try:
-                proxy_info = ProxyEncoder.encode(link)
-                if proxy_info:
-                    all_proxies.append(proxy_info)
-            except Exception as e:
-                logger.debug(f"Failed to encode link: {str(e)}")
-        
-        # 验证代理配置
-        logger.section("Validating Proxies")
-        validator = ProxyValidator()
-        valid_proxies = []
-        invalid_count = 0
-        
-        for proxy in all_proxies:
-            valid, reason = validator.validate(proxy)
-            if valid:
-                valid_proxies.append(proxy)
-            else:
-                invalid_count += 1
-                logger.debug(f"Invalid proxy configuration: {reason}")
-        
-        if not valid_proxies:
-            logger.error("No valid proxies found")
-            return
-            
-        # 显示代理统计
-        proxy_types = {}
-        for proxy in valid_proxies:
-            proxy_type = proxy["proxy_protocol"].value
-            proxy_types[proxy_type] = proxy_types.get(proxy_type, 0) + 1
-        
-        logger.info("\n[*] Proxy Statistics:")
-        for proxy_type, count in sorted(proxy_types.items()):
-            logger.info(f"    {proxy_type.upper():<10}: {count:>3} {'proxy' if count == 1 else 'proxies'}")
-        logger.info(f"    {'INVALID':<10}: {invalid_count:>3} proxies")
-        logger.info(f"    {'TOTAL':<10}: {len(valid_proxies):>3} valid proxies\n")
-        
-        # 测试代理
-        logger.section("Testing Proxies")
-        
         # 初始化测试器
         testers_config = config['testers']
         
+        # DNS解析器 - 所有测试器共享解析缓存
+        dns_config = testers_config.get('dns', {})
+        resolver = DNSResolver(
+            ttl=dns_config.get('ttl', 300),
+            negative_ttl=dns_config.get('negative_ttl', 60),
+            timeout=dns_config.get('timeout', 5),
+            max_workers=dns_config.get('max_workers', 16),
+            logger=logger
+        )
+        
         # TCP测试器 - 仅测试代理服务器是否在线
         tcp_config = testers_config['tcp_tester']
         tcp_tester = TCPTester(
             logger=logger,
             connect_timeout=tcp_config['connect_timeout'],
-            retry_times=tcp_config['retry_times']
+            retry_times=tcp_config['retry_times'],
+            resolver=resolver
         ) if tcp_config['enabled'] else None
         
         # Xray测试器 - 测试代理连通性
@@ -164,7 +144,10 @@ async def filter_subscriptions(logger: Logger):
             logger=logger,
             timeout=xray_config['connect_timeout'],
             retry_times=xray_config['retry_times'],
-            xray_path=xray_config['xray_path']
+            xray_path=xray_config['xray_path'],
+            pool_size=xray_config.get('pool_size', 0),
+            pool_slots=xray_config.get('pool_slots', 16),
+            startup_timeout=xray_config.get('startup_timeout', 5)
         ) if xray_config['enabled'] else None
         
         # Glider测试器 - 测试代理连通性
@@ -174,16 +157,149 @@ async def filter_subscriptions(logger: Logger):
             config=glider_config
         ) if glider_config['enabled'] else None
         
-        # 创建信号量来限制并发
-        concurrent_tests = testers_config['basic']['concurrent_tests']
-        semaphore = asyncio.Semaphore(concurrent_tests)
+        # 吞吐量采样：站点检查成功后通过代理下载一段数据（未配置URL时不采样）
+        throughput_config = testers_config.get('throughput', {})
+        for tester in (xray_tester, glider_tester):
+            if tester:
+                tester.set_throughput_sample(
+                    throughput_config.get('url'),
+                    throughput_config.get('max_bytes', 512 * 1024)
+                )
+        
+        # 并发配置：未单独配置的阶段使用 concurrent_tests
+        basic_config = testers_config['basic']
+        concurrent_tests = basic_config['concurrent_tests']
+        stages_config = basic_config.get('stages', {})
+        
+        # Glider批量模式：一个glider进程测试一整批代理
+        glider_batch_size = glider_config.get('batch_size', 1)
+        glider_dispatcher = BatchDispatcher(
+            glider_tester.measure_batch,
+            batch_size=glider_batch_size,
+            linger=glider_config.get('batch_linger', 0.5),
+            logger=logger,
+            failure=TestResult(False)
+        ) if glider_tester and glider_batch_size > 1 else None
+        
+        # Xray进程池模式：长期运行的xray进程，每个进程承载多个代理槽位
+        xray_dispatcher = BatchDispatcher(
+            xray_tester.measure_batch,
+            batch_size=xray_config.get('pool_slots', 16),
+            linger=xray_config.get('batch_linger', 0.5),
+            logger=logger,
+            failure=TestResult(False)
+        ) if xray_tester and xray_config.get('pool_size', 0) > 0 else None
+        
+        # 批量模式下并发数按进程计算，每个进程承载一个批次
+        batch_sizes = [1]
+        if glider_dispatcher:
+            batch_sizes.append(glider_batch_size)
+        if xray_dispatcher:
+            batch_sizes.append(xray_dispatcher.batch_size)
+        core_scale = max(batch_sizes)
+        
+        def create_limiter(stage: str, scale: int, slow_threshold: float) -> AdaptiveLimiter:
+            """创建阶段并发限制器"""
+            stage_config = stages_config.get(stage, {})
+            initial = stage_config.get('initial', concurrent_tests)
+            return AdaptiveLimiter(
+                stage,
+                initial=initial * scale,
+                min_limit=stage_config.get('min', 1) * scale,
+                max_limit=stage_config.get('max', initial) * scale,
+                adaptive=basic_config.get('adaptive', False),
+                slow_threshold=stage_config.get('slow_threshold', slow_threshold),
+                logger=logger
+            )
+        
+        # TCP探测开销小，可以大量并发；代理核心（xray/glider进程）并发受限
+        tcp_limiter = create_limiter('tcp', 1, tcp_config['connect_timeout'])
+        core_limiter = create_limiter('core', core_scale, 15)
+        
+        # 站点矩阵模式：每个代理测试所有目标站点，记录其可访问的全部站点
+        site_matrix = basic_config.get('site_matrix', False)
+        
+        async def test_sites(tester, dispatcher, proxy) -> Dict[str, TestResult]:
+            """使用指定测试器测试代理可访问的站点，返回 {站点: 测试结果}"""
+            target_hosts = config['target_hosts']
+            if site_matrix:
+                if dispatcher:
+                    results = await asyncio.gather(*(
+                        dispatcher.submit(proxy, site_config) for site_config in target_hosts.values()
+                    ))
+                    return {site: result for site, result in zip(target_hosts, results) if result}
+                # 一个代理核心，并发检查所有站点
+                results = await tester.measure_sites(proxy, target_hosts)
+                return {site: result for site, result in results.items() if result}
+            
+            # 按顺序测试，只记录第一个可访问的站点
+            for site, site_config in target_hosts.items():
+                if dispatcher:
+                    result = await dispatcher.submit(proxy, site_config)
+                else:
+                    result = (await tester.measure_sites(proxy, {site: site_config})).get(site)
+                if result:
+                    return {site: result}
+            return {}
+        
+        # 获取并测试代理
+        # 流水线：获取 -> 解析 -> 编码/验证/去重 -> TCP测试 -> 站点测试
+        # 各阶段通过有界队列连接，订阅源下载完成后其代理立即进入测试
+        logger.section("Fetching and Testing Proxies")
+        
+        # 配置HTTP获取器
+        fetcher_config = config['subscription']['fetcher']
+
+        # 条件请求缓存：未变化的订阅源直接复用上次的解析结果
+        cache_config = config['subscription'].get('cache', {})
+        fetch_cache = FetchCache(
+            cache_file=cache_config.get('file', 'results/cache/fetch_cache.json'),
+            logger=logger
+        ) if cache_config.get('enabled', False) else None
+
+        http_fetcher = HttpFetcher(
+            logger=logger,
+            connect_timeout=fetcher_config['timeout'],
+            max_retries=fetcher_config['retry_times'],
+            proxy=fetcher_config.get('proxy'),
+            max_connections=fetcher_config.get('max_connections', 32),
+            max_connections_per_host=fetcher_config.get('max_connections_per_host', 8),
+            keepalive_timeout=fetcher_config.get('keepalive_timeout', 30),
+            cache=fetch_cache,
+            chunk_size=fetcher_config.get('chunk_size', 65536)
+        )
+        # 流式解析：边下载边解码，不在内存中保存完整的订阅内容
+        parse_stream = SubscriptionParser().parse_stream if fetcher_config.get('stream', True) else None
+        
+        validator = ProxyValidator()
+        
+        # 健康状态数据库：复用最近的测试结果，连续失败的代理按指数退避推迟重测
+        health_config = testers_config.get('health', {})
+        health_store = HealthStore(
+            db_path=health_config.get('db', 'results/cache/health.db'),
+            fresh_ttl=health_config.get('fresh_ttl', 3600),
+            backoff_base=health_config.get('backoff_base', 3600),
+            backoff_max=health_config.get('backoff_max', 604800),
+            history_size=health_config.get('history_size', 20),
+            logger=logger
+        ) if health_config.get('enabled', False) else None
+        reused_count = 0
         
-        # 初始化站点代理字典
+        # 已见过的代理链接（快速去重）
+        seen_links = set()
+        # 规范标识 -> 代理（语义去重，重复代理的名称记为别名）
+        unique_proxies = {}
+        duplicate_count = 0
+        proxy_types = {}
+        invalid_count = 0
+        
+        # 初始化站点代理字典（测试指标与代理按相同顺序保存）
         site_proxies = {site: [] for site in config['target_hosts'].keys()}
+        site_metrics = {site: [] for site in config['target_hosts'].keys()}
         
-        # 进度条
+        # 进度条（总数随验证通过的代理增加）
         progress = tqdm(
-            total=len(valid_proxies),
+            total=0,
             desc="Progress",
             dynamic_ncols=True,  # 启用动态宽度
             leave=True,  # 完成后保留进度条
@@ -191,54 +307,261 @@ async def filter_subscriptions(logger: Logger):
             bar_format='{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}, {rate_fmt}{postfix}]'
         )
         working_count = 0
+        found_count = 0
+        
+        def split_records(items):
+            """分离代理链接和配置订阅（Clash/sing-box）直接解析出的代理记录"""
+            if all(isinstance(item, str) for item in items):
+                return items, []
+            return ([item for item in items if isinstance(item, str)],
+                    [item for item in items if not isinstance(item, str)])
+        
+        async def parse_stage(fetched):
+            """解析订阅内容，返回新的代理链接和代理记录"""
+            nonlocal found_count
+            url, content = fetched
+            if isinstance(content, StreamedLinks) and not content.links:
+                # 流式解析没有得到代理时与获取失败相同，不覆盖上次解析的内容
+                content = None
+            try:
+                if content is None and source_items and url in source_items:
+                    # 未到刷新时间或获取失败的订阅源使用上次解析的内容
+                    proxy_links, proxy_records = split_records(source_items[url])
+                    logger.debug(f"Using previous proxies of {url}")
+                elif content is None:
+                    raise ValueError("empty or failed response")
+                elif isinstance(content, StreamedLinks):
+                    # 流式获取时已经边下载边解析
+                    proxy_links, proxy_records = split_records(content.links)
+                    # 链接缓存只保存链接，配置订阅每次重新解析
+                    if fetch_cache and proxy_links and not proxy_records:
+                        fetch_cache.put_links(url, None, proxy_links, digest=content.digest)
+                else:
+                    proxy_links = fetch_cache.get_links(url, content) if fetch_cache else None
+                    if proxy_links is not None:
+                        logger.debug(f"Subscription unchanged, using cached links: {url}")
+                        proxy_records = []
+                    else:
+                        proxy_links, proxy_records = split_records(await parse_subscription(content, logger))
+                        if fetch_cache and proxy_links and not proxy_records:
+                            fetch_cache.put_links(url, content, proxy_links)
+            except Exception as e:
+                logger.error(f"[-] Failed to fetch from {url}: {str(e)}")
+                return None
+            if source_items is not None:
+                source_items[url] = proxy_links + proxy_records
+            
+            new_links = [link for link in dict.fromkeys(proxy_links) if link not in seen_links]
+            seen_links.update(new_links)
+            found = len(proxy_links) + len(proxy_records)
+            found_count += found
+            # 代理记录没有链接，由验证阶段按规范标识去重
+            logger.info(f"[+] Found {found} proxies from {url} ({len(new_links) + len(proxy_records)} new)")
+            return new_links + proxy_records if proxy_records else new_links
+        
+        # 链接编码：大批量链接在进程池中并行编码，编码在线程中执行以免阻塞事件循环
+        encoder_config = config['subscription'].get('encoder', {})
+        encode_workers = encoder_config.get('workers', 0) or os.cpu_count() or 1
+        encode_pool = ProcessPoolExecutor(max_workers=encode_workers) if encode_workers > 1 else None
+        # 编码缓存：多次运行之间重复出现的链接不再重新编码
+        encode_cache = create_encode_cache(encoder_config.get('cache', {}), logger)
+        
+        async def encode_stage(items):
+            """将一批代理链接转换为元信息（只编码未缓存的链接，代理记录直接传递）"""
+            links, proxies = split_records(items)
+            if encode_cache:
+                results, missing = encode_cache.get_many(links)
+            else:
+                results, missing = [None] * len(links), list(range(len(links)))
+            missing_links = [links[i] for i in missing]
+            if missing_links:
+                encoded = await asyncio.get_running_loop().run_in_executor(
+                    None,
+                    functools.partial(
+                        ProxyEncoder.encode_many,
+                        missing_links,
+                        workers=encode_workers,
+                        chunk_size=encoder_config.get('chunk_size', 1000),
+                        min_parallel=encoder_config.get('min_parallel', 5000),
+                        executor=encode_pool
+                    )
+                )
+                if encode_cache:
+                    encode_cache.put_many(missing_links, encoded)
+                for index, result in zip(missing, encoded):
+                    results[index] = result
+            
+            for proxy, error in results:
+                if proxy is None:
+                    logger.debug(f"Failed to encode link: {error}")
+                else:
+                    proxies.append(proxy)
+            return proxies
+        
+        async def validate_stage(proxy):
+            """验证代理配置并按规范标识去重"""
+            nonlocal invalid_count, duplicate_count
+            valid, reason = validator.validate(proxy)
+            if not valid:
+                invalid_count += 1
+                logger.debug(f"Invalid proxy configuration: {reason}")
+                return None
+            
+            # 同一服务器的不同链接（名称、参数顺序、填充不同）只测试一次
+            key = ProxyEncoder.canonical_key(proxy)
+            existing = unique_proxies.get(key)
+            if existing is not None:
+                duplicate_count += 1
+                if proxy["name"] and proxy["name"] not in existing["aliases"]:
+                    existing["aliases"].append(proxy["name"])
+                return None
+            proxy["aliases"] = [proxy["name"]] if proxy["name"] else []
+            unique_proxies[key] = proxy
+            
+            proxy_type = proxy["proxy_protocol"].value
+            proxy_types[proxy_type] = proxy_types.get(proxy_type, 0) + 1
+            progress.total += 1
+            progress.refresh()
+            return proxy
         
-        # 测试函数
-        async def test_proxy(proxy):
+        def finish(proxy, test_results: Dict[str, TestResult]) -> None:
+            """记录测试结果"""
             nonlocal working_count
-            async with semaphore:
-                # 1. 首先进行TCP连接测试（检查代理服务器是否在线）
-                if tcp_tester and not await tcp_tester.test(proxy):
-                    progress.update(1)
-                    progress.set_postfix_str(f"working:{working_count}")
-                    return False
-                
-                # 2. 然后使用配置的测试器测试目标站点的连通性
-                test_results = []
-                
-                # 使用Xray测试
-                if xray_tester:
-                    for site, site_config in config['target_hosts'].items():
-                        if await xray_tester.test(proxy, site_config):
-                            test_results.append(site)
-                            break
-                
-                # 使用Glider测试
-                if glider_tester:
-                    for site, site_config in config['target_hosts'].items():
-                        if await glider_tester.test(proxy, site_config):
-                            test_results.append(site)
-                            break
-                
-                # 更新站点代理字典
-                for site in test_results:
-                    site_proxies[site].append(proxy)
-                    working_count += 1
-                
-                progress.update(1)
-                progress.set_postfix_str(f"working:{working_count}")
-                return bool(test_results)
+            for site, result in test_results.items():
+                site_proxies[site].append(proxy)
+                site_metrics[site].append(result.metrics())
+                working_count += 1
+            progress.update(1)
+            progress.set_postfix_str(f"working:{working_count}")
         
-        # 并发测试所有代理
-        tasks = [test_proxy(proxy) for proxy in valid_proxies]
-        await asyncio.gather(*tasks)
+        async def tcp_stage(proxy):
+            """TCP连接测试（检查代理服务器是否在线）"""
+            nonlocal reused_count
+            # 复用健康数据库中仍然有效的结果
+            if health_store:
+                key = HealthStore.proxy_key(proxy)
+                cached_sites = health_store.cached_sites(key)
+                if cached_sites is not None:
+                    reused_count += 1
+                    # 复用的结果使用各站点最近一次记录的指标和连接信息
+                    route = health_store.route(key)
+                    finish(proxy, {
+                        site: TestResult.from_metrics({**health_store.latest_latency(key, site), **route})
+                        for site in cached_sites if site in site_proxies
+                    })
+                    return None
+            
+            probe = {}
+            if tcp_tester:
+                async with tcp_limiter:
+                    probe = await tcp_tester.probe(proxy)
+                if probe is None:
+                    if health_store:
+                        health_store.record(HealthStore.proxy_key(proxy), [], [])
+                    finish(proxy, {})
+                    return None
+            return proxy, probe
         
-        progress.close()
+        async def site_stage(item):
+            """使用配置的测试器测试目标站点的连通性"""
+            proxy, probe = item
+            # TCP延迟和连接成功的地址（没有TCP测试时为空）
+            latency = {'tcp': probe['rtt']} if probe else {}
+            route = {key: probe[key] for key in TestResult.ROUTE} if probe else {}
+            test_results = {}
+            async with core_limiter:
+                for tester, dispatcher in ((xray_tester, xray_dispatcher), (glider_tester, glider_dispatcher)):
+                    if tester:
+                        for site, result in (await test_sites(tester, dispatcher, proxy)).items():
+                            test_results.setdefault(site, result._replace(tcp=latency.get('tcp'), **route))
+            
+            if health_store:
+                # 记录TCP延迟、连接成功的地址和每个站点的各项指标
+                site_latency = {
+                    site: {stage: value for stage, value in result.metrics().items()
+                           if stage in TestResult.METRICS and stage != 'tcp'}
+                    for site, result in test_results.items()
+                }
+                # 非矩阵模式在第一个成功的站点后停止测试
+                sites_ok = list(test_results)
+                sites_tested = list(site_proxies) if site_matrix or not sites_ok else sites_ok
+                health_store.record(HealthStore.proxy_key(proxy), sites_ok, sites_tested, latency,
+                                    site_latency=site_latency, route=route)
+            finish(proxy, test_results)
+            return None
+        
+        queue_size = basic_config.get('queue_size', 1024)
+        pipeline = Pipeline([
+            Stage("parse", parse_stage, workers=4, queue_size=8),
+            Stage("encode", encode_stage, queue_size=8, expand=True),
+            Stage("validate", validate_stage, queue_size=queue_size),
+            Stage("tcp", tcp_stage, workers=tcp_limiter.max_limit, queue_size=queue_size),
+            Stage("sites", site_stage, workers=core_limiter.max_limit, queue_size=queue_size)
+        ], logger=logger)
+        
+        # 需要获取的订阅源，其余的订阅源使用上次解析的内容
+        urls = config['subscription']['urls']
+        if source_items is not None:
+            for url in set(source_items) - set(urls):
+                del source_items[url]
+        fetch_urls = [
+            url for url in urls
+            if refresh is None or url in refresh or not source_items or url not in source_items
+        ]
+        
+        async def sources():
+            """产出 (订阅源, 内容)，使用上次内容的订阅源的内容为None"""
+            for url in urls:
+                if url not in fetch_urls:
+                    yield url, None
+            async for fetched in http_fetcher.fetch_many(fetch_urls, parse_stream):
+                yield fetched
+        
+        try:
+            async with http_fetcher:
+                await pipeline.run(sources())
+        finally:
+            progress.close()
+            
+            # 释放测试器资源（如Xray进程池）
+            for tester in (tcp_tester, xray_tester, glider_tester):
+                if tester:
+                    await tester.close()
+            resolver.close()
+            if health_store:
+                health_store.close()
+            if encode_pool:
+                encode_pool.shutdown()
+            if encode_cache:
+                encode_cache.close()
+        
+        if fetch_cache:
+            fetch_cache.save()
+        
+        if not found_count:
+            logger.error("No proxies found")
+            return False
+        
+        # 显示代理统计
+        logger.info("\n[*] Proxy Statistics:")
+        for proxy_type, count in sorted(proxy_types.items()):
+            logger.info(f"    {proxy_type.upper():<10}: {count:>3} {'proxy' if count == 1 else 'proxies'}")
+        logger.info(f"    {'INVALID':<10}: {invalid_count:>3} proxies")
+        logger.info(f"    {'DUPLICATE':<10}: {duplicate_count:>3} proxies (same server as another link)")
+        logger.info(f"    {'TOTAL':<10}: {sum(proxy_types.values()):>3} valid proxies")
+        if health_store:
+            logger.info(f"    {'CACHED':<10}: {reused_count:>3} proxies (results reused, not retested)")
+        logger.info("")
+        
+        if not proxy_types:
+            logger.error("No valid proxies found")
+            return False
         
         # 检查结果
         total_site_proxies = sum(len(proxies) for proxies in site_proxies.values())
         if total_site_proxies == 0:
             logger.error("\nNo working proxies found for any target site")
-            return
+            return False
             
         # 显示结果
         logger.info("\nWorking proxies by site:")
@@ -256,18 +579,115 @@ async def filter_subscriptions(logger: Logger):
         
         for site, proxies in site_proxies.items():
             if proxies:
-                output.save(site, proxies)
+                output.save(site, proxies, metrics=site_metrics[site])
+        return True
         
     except Exception as e:
         logger.error(f"\nUnexpected error: {str(e)}")
-        return
+        return False
+
+async def run_daemon(logger: Logger, generators: List[Callable[[Logger], Awaitable[List[Path]]]]) -> None:
+    """守护模式：在一个常驻进程中按计划清洗订阅源，保存结果后重新生成配置
 
-async def generate_xray_config(logger: Logger):
-    """生成Xray配置文件"""
+    每个订阅源按各自的刷新间隔（daemon.fetch_interval / daemon.source_intervals）
+    重新获取，未到期的订阅源使用上次解析的内容。有订阅源到期或到达重测间隔
+    （daemon.retest_interval）时运行一次清洗，健康状态数据库中结果仍然有效的
+    代理直接复用，只重测结果已过期的代理。配置在每次运行开始时重新读取，
+    读取失败时记录错误并继续使用上次读取成功的配置。
+
+    Args:
+        generators: 保存结果后依次运行的配置生成函数
+    """
+    source_items: Dict[str, List[Any]] = {}
+    sources = Scheduler(3600)
+    retest = Scheduler(1800)
+    config = None
+    
+    while True:
+        try:
+            with open('config/proxies_filter.yaml', 'r') as f:
+                new_config = yaml.safe_load(f)
+            daemon_config = new_config.get('daemon') or {}
+            new_urls = new_config['subscription']['urls'] or []
+            sources.default_interval = daemon_config.get('fetch_interval', 3600)
+            sources.intervals = daemon_config.get('source_intervals') or {}
+            retest.default_interval = daemon_config.get('retest_interval', 1800)
+            config, urls = new_config, new_urls
+        except Exception as e:
+            # 启动时没有可用的配置
+            if config is None:
+                raise
+            logger.error(f"Failed to reload config, keeping the previous one: {str(e)}")
+        
+        refresh = sources.due(urls)
+        if refresh or retest.due(['retest']):
+            start_time = time.time()
+            logger.section(f"Daemon cycle: refreshing {len(refresh)} of {len(urls)} sources")
+            saved = await filter_subscriptions(logger, refresh, source_items, config)
+            for url in refresh:
+                sources.mark(url, start_time)
+            retest.mark('retest', start_time)
+            
+            if saved:
+                for generate in generators:
+                    try:
+                        await generate(logger)
+                    except Exception as e:
+                        logger.error(f"Failed to regenerate config: {str(e)}")
+            logger.info(f"\nDaemon cycle finished in {format_time(time.time() - start_time)}")
+        
+        wait = min(sources.wait_time(urls), retest.wait_time(['retest']))
+        logger.info(f"Next daemon cycle in {format_time(wait)}")
+        await asyncio.sleep(wait)
+
+async def supervise_glider(logger: Logger) -> None:
+    """运行glider并维护其forward（检查失败的代理被替换，变化明显时重写配置并重启glider）"""
+    with open('config/client_config.yaml', 'r') as f:
+        client_config = yaml.safe_load(f)
+    with open('config/proxies_filter.yaml', 'r') as f:
+        tester_config = yaml.safe_load(f)['testers']['glider_tester']
+    supervisor_config = client_config.get('supervisor', {})
+    
+    encode_cache = create_encode_cache(client_config.get('encode_cache', {}), logger) or EncodeCache(':memory:', logger=logger)
+    tester = GliderTester(logger=logger, config=tester_config)
+    supervisor = GliderSupervisor(
+        client_config,
+        tester,
+        encode_cache,
+        functools.partial(create_proxy_ranker, client_config, logger),
+        logger=logger,
+        glider_path=supervisor_config.get('glider_path', tester_config.get('glider_path', 'glider')),
+        check_interval=supervisor_config.get('check_interval', 300),
+        restart_threshold=supervisor_config.get('restart_threshold', 0.3),
+        drain_timeout=supervisor_config.get('drain_timeout', 10),
+        startup_timeout=supervisor_config.get('startup_timeout', 5)
+    )
+    try:
+        await supervisor.run()
+    finally:
+        await tester.close()
+        encode_cache.close()
+
+async def generate_xray_config(logger: Logger) -> List[Path]:
+    """生成Xray配置文件，返回改变了的文件"""
     # 加载配置
     with open('config/client_config.yaml', 'r') as f:
         client_config = yaml.safe_load(f)
     
+    # 链接编码缓存（与清洗阶段共享，结果文件中的链接通常已经编码过）；
+    # 未启用时使用内存缓存，验证时生成的出站配置在生成配置时直接复用
+    encode_cache = create_encode_cache(client_config.get('encode_cache', {}), logger) or EncodeCache(':memory:', logger=logger)
+    ranker = create_proxy_ranker(client_config, logger)
+    try:
+        return await _generate_xray_config(client_config, encode_cache, logger, ranker)
+    finally:
+        ranker.close()
+        if encode_cache:
+            encode_cache.close()
+
+async def _generate_xray_config(client_config: Dict, encode_cache, logger: Logger,
+                                ranker: ProxyRanker = None) -> List[Path]:
+    """读取结果文件并生成Xray配置文件（内容没有变化的文件不会重写），返回改变了的文件"""
     # 读取所有站点的结果文件
     site_proxies = {}
     ssh_proxies = {}  # 存储SSH代理
@@ -282,7 +702,7 @@ async def generate_xray_config(logger: Logger):
     
     for site, results_file in client_config['proxy_results'].items():
         results_path = Path(results_file)
-        proxies = await load_proxies(results_path, logger)
+        proxies = await load_proxies(results_path, logger, encode_cache)
         valid_proxies = []
         site_ssh_proxies = []
         
@@ -296,8 +716,10 @@ async def generate_xray_config(logger: Logger):
                     continue
                     
                 # 验证Xray代理配置
-                XrayConfigGenerator._generate_proxy_settings(proxy)
-                XrayConfigGenerator._generate_stream_settings(proxy)
+                if encode_cache:
+                    encode_cache.xray_outbound(proxy)
+                else:
+                    XrayConfigGenerator._generate_server_config(proxy)
                 valid_proxies.append(proxy)
                 total_proxies += 1
                 proxy_types[proxy.proxy_type] = proxy_types.get(proxy.proxy_type, 0) + 1
@@ -330,7 +752,7 @@ async def generate_xray_config(logger: Logger):
     
     if not site_proxies and not ssh_proxies:
         logger.error("No valid proxies found")
-        return
+        return []
     
     # 显示代理类型统计
     logger.info("\nProxy types distribution:")
@@ -363,15 +785,16 @@ async def generate_xray_config(logger: Logger):
                 logger.info(f"    {error_msg:<50}: {count:>3} {'proxy' if count == 1 else 'proxies'}")
     
     # 生成Xray配置
+    writer = ConfigWriter(logger)
     try:
         xray_config = XrayConfigGenerator.generate_client_config(
             site_proxies=site_proxies,
-            client_config=client_config
+            client_config=client_config,
+            encode_cache=encode_cache
         )
         
         xray_config_file = Path('config/xray_client.json')
-        with open(xray_config_file, 'w', encoding='utf-8') as f:
-            json.dump(xray_config, f, indent=2, ensure_ascii=False)
+        writer.write(xray_config_file, json.dumps(xray_config, indent=2, ensure_ascii=False))
         
         logger.info(f"\nXray config file saved to: {xray_config_file}")
     except Exception as e:
@@ -381,18 +804,19 @@ async def generate_xray_config(logger: Logger):
     try:
         glider_config = GliderConfigGenerator.generate_client_config(
             site_proxies=site_proxies,
-            client_config=client_config
+            client_config=client_config,
+            encode_cache=encode_cache,
+            ranker=ranker
         )
         
         glider_config_file = Path('config/glider.conf')
-        with open(glider_config_file, 'w', encoding='utf-8') as f:
-            f.write(glider_config)
+        writer.write(glider_config_file, glider_config)
         
         logger.info(f"Glider config file saved to: {glider_config_file}")
         logger.info(f"To start glider, run: glider -config {glider_config_file}")
     except Exception as e:
         logger.error(f"Failed to generate Glider config: {str(e)}")
-        return
+        return writer.changed
     
     # 显示入站端口
     logger.info("\nAvailable inbound ports:")
@@ -428,13 +852,37 @@ async def generate_xray_config(logger: Logger):
         logger.info(f"\n  [{display_name}]:")
         for proxy_type, count in sorted(proxy_types.items()):
             logger.info(f"    {proxy_type.upper():<10}: {count:>3} {'proxy' if count == 1 else 'proxies'}")
+    
+    if writer.changed:
+        logger.info(f"\nChanged files: {', '.join(str(path) for path in writer.changed)}")
+    else:
+        logger.info("\nConfig files unchanged")
+    return writer.changed
 
-async def generate_glider_config(logger: Logger):
-    """生成Glider配置文件"""
+async def generate_glider_config(logger: Logger) -> List[Path]:
+    """生成Glider配置文件，返回改变了的文件"""
     # 加载配置
     with open('config/client_config.yaml', 'r') as f:
         client_config = yaml.safe_load(f)
     
+    # 链接编码缓存（与清洗阶段共享，结果文件中的链接通常已经编码过）；
+    # 未启用时使用内存缓存，验证时解码得到的glider链接在生成配置时直接复用
+    encode_cache = create_encode_cache(client_config.get('encode_cache', {}), logger) or EncodeCache(':memory:', logger=logger)
+    ranker = create_proxy_ranker(client_config, logger)
+    try:
+        return await _generate_glider_config(client_config, encode_cache, logger, ranker)
+    finally:
+        ranker.close()
+        if encode_cache:
+            encode_cache.close()
+
+async def _generate_glider_config(client_config: Dict, encode_cache, logger: Logger,
+                                  ranker: ProxyRanker = None) -> List[Path]:
+    """读取结果文件并生成Glider配置文件
+
+    内容没有变化的规则文件和主配置文件不会重写，返回改变了的文件（写入或删除），
+    为空时运行中的glider不需要重新加载。
+    """
     # 读取所有站点的结果文件
     site_proxies = {}
     total_proxies = 0
@@ -459,9 +907,9 @@ async def generate_glider_config(logger: Logger):
         for line in lines:
             try:
                 # 解析为元信息
-                proxy_info = ProxyEncoder.encode(line)
+                proxy_info = encode_cache.encode(line) if encode_cache else ProxyEncoder.encode(line)
                 # 尝试转换为glider链接
-                glider_link = GliderDecoder.decode(proxy_info)
+                glider_link = encode_cache.glider_link(proxy_info) if encode_cache else GliderDecoder.decode(proxy_info)
                 if glider_link:
                     valid_proxies.append(proxy_info)
                     total_proxies += 1
@@ -483,7 +931,7 @@ async def generate_glider_config(logger: Logger):
                 
     if not site_proxies:
         logger.error("No valid proxies found")
-        return
+        return []
     
     # 显示代理类型统计
     logger.info("\nProxy types distribution:")
@@ -506,43 +954,38 @@ async def generate_glider_config(logger: Logger):
                 logger.info(f"    {error_msg:<50}: {count:>3} {'proxy' if count == 1 else 'proxies'}")
     
     # 生成Glider配置
+    writer = ConfigWriter(logger)
     try:
         # 生成主配置文件
         glider_config = GliderConfigGenerator.generate_client_config(
             site_proxies=site_proxies,
-            client_config=client_config
+            client_config=client_config,
+            encode_cache=encode_cache,
+            ranker=ranker
         )
         
-        config_dir = Path(client_config['output']['dir'])
-
-        # 创建规则文件目录
-        rules_dir = config_dir/'rules.d'
-        rules_dir.mkdir(parents=True, exist_ok=True)
-        
         # 生成规则文件
         rule_files = GliderConfigGenerator.generate_rule_files(
             site_proxies=site_proxies,
-            client_config=client_config
+            client_config=client_config,
+            encode_cache=encode_cache,
+            ranker=ranker
         )
         
-        # 保存规则文件
-        for filename, content in rule_files.items():
-            rule_file = rules_dir / filename
-            with open(rule_file, 'w', encoding='utf-8') as f:
-                f.write(content)
-            logger.debug(f"Rule file saved to: {rule_file}")
-        
-        # 保存主配置文件
-        glider_config_file = config_dir/'glider.conf'
-        with open(glider_config_file, 'w', encoding='utf-8') as f:
-            f.write(glider_config)
+        # 保存配置（只写入内容变化的文件），删除已没有可用代理的站点的规则文件
+        glider_config_file = GliderConfigGenerator.save_config(glider_config, rule_files, client_config, writer)
         
         logger.info(f"\nGlider config file saved to: {glider_config_file}")
+        logger.info(f"Glider forwards: {glider_config.count('forward=')} (fastest of {total_proxies} proxies)")
+        if writer.changed:
+            logger.info(f"Changed files: {', '.join(str(path) for path in writer.changed)}")
+        else:
+            logger.info("Glider config unchanged, no reload needed")
         logger.info(f"To start glider, run: glider -config {glider_config_file}")
         
     except Exception as e:
         logger.error(f"Failed to generate Glider config: {str(e)}")
-        return
+        return writer.changed
     
     # 显示入站端口
     logger.info("\nAvailable inbound ports:")
@@ -575,9 +1018,11 @@ async def generate_glider_config(logger: Logger):
         logger.info(f"\n  [{display_name}]:")
         for proxy_type, count in sorted(proxy_types.items()):
             logger.info(f"    {proxy_type.upper():<10}: {count:>3} {'proxy' if count == 1 else 'proxies'}")
+    
+    return writer.changed
 
-async def load_proxies(results_file: Path, logger) -> List[Dict[str, Any]]:
-    """从结果文件加载代理"""
+async def load_proxies(results_file: Path, logger, encode_cache=None) -> List[Dict[str, Any]]:
+    """从结果文件加载代理（传入 encode_cache 时复用缓存的编码结果）"""
     proxies = []
     if not results_file.exists():
         logger.error(f"Results file not found: {results_file}")
@@ -589,7 +1034,7 @@ async def load_proxies(results_file: Path, logger) -> List[Dict[str, Any]]:
                 line = line.strip()
                 if line and not line.startswith('#'):
                     try:
-                        proxy_info = ProxyEncoder.encode(line)
+                        proxy_info = encode_cache.encode(line) if encode_cache else ProxyEncoder.encode(line)
                         if proxy_info:
                             proxies.append(proxy_info)
                     except Exception as e:
@@ -606,6 +1051,10 @@ def main():
     parser.add_argument('--filter_subscriptions', action='store_true', help='清洗订阅源的代理')
     parser.add_argument('--generate_xray_config', action='store_true', help='生成Xray配置文件')
     parser.add_argument('--generate_glider_config', action='store_true', help='生成Glider配置文件')
+    parser.add_argument('--daemon', action='store_true',
+                        help='守护模式：按计划持续清洗订阅源，并重新生成同时指定的配置文件')
+    parser.add_argument('--supervise_glider', action='store_true',
+                        help='运行glider并持续检查和替换失效的代理（可与 --daemon 同时使用）')
     args = parser.parse_args()
     
     # 初始化日志
@@ -613,6 +1062,23 @@ def main():
     
     try:
         need_print_help = True
+        if args.daemon or args.supervise_glider:
+            services = []
+            if args.daemon:
+                generators = []
+                if args.generate_xray_config:
+                    generators.append(generate_xray_config)
+                # 运行glider守护时由守护生成Glider配置（只包含检查通过的代理）
+                if args.generate_glider_config and not args.supervise_glider:
+                    generators.append(generate_glider_config)
+                services.append(run_daemon(logger, generators))
+            if args.supervise_glider:
+                services.append(supervise_glider(logger))
+            
+            async def run_services():
+                await asyncio.gather(*services)
+            asyncio.run(run_services())
+            return
         if args.filter_subscriptions:
             asyncio.run(filter_subscriptions(logger))
             need_print_help = False
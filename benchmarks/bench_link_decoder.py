@@ -0,0 +1,39 @@
+"""代理链接解码（ProxyEncoder.encode）吞吐量基准
+
+用法: python benchmarks/bench_link_decoder.py [链接数量]
+
+按协议分别统计每秒可以解码的链接数。
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from src.encoders.encoder import ProxyEncoder
+from bench_proxy_record import generate_links
+
+def links_per_second(links, repeat: int = 5) -> float:
+    """取多次运行中最快的一次"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for link in links:
+            ProxyEncoder.encode(link)
+        best = min(best, time.perf_counter() - start)
+    return len(links) / best
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    links = generate_links(count)
+
+    by_protocol = {}
+    for link in links:
+        by_protocol.setdefault(link.split("://", 1)[0], []).append(link)
+
+    for protocol, protocol_links in sorted(by_protocol.items()):
+        print(f"{protocol:<8} {links_per_second(protocol_links):>10,.0f} links/s")
+    print(f"{'mixed':<8} {links_per_second(links):>10,.0f} links/s")
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 from pathlib import Path
 from typing import List, Dict, Any
-from src.models.proxy_v2 import ProxyParser
+from src.encoders.encoder import ProxyEncoder
 from src.decoders.glider_decoder import GliderDecoder
 
 class GliderConfigGenerator:
@@ -30,7 +30,7 @@ class GliderConfigGenerator:
             for link in links:
                 try:
                     # 解析为元信息
-                    proxy_info = ProxyParser.parse(link)
+                    proxy_info = ProxyEncoder.encode(link)
                     # 转换为glider链接
                     glider_link = GliderDecoder.decode(proxy_info)
                     glider_links.append(glider_link)
@@ -1,11 +1,12 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Mapping, Optional
 from enum import Enum
+from src.encoders.encoder import ProxyEncoder
 
 class GliderDecoder:
     """将代理元信息解码为Glider链接格式"""
     
     @staticmethod
-    def decode(proxy_info: Dict[str, Any]) -> str:
+    def decode(proxy_info: Mapping[str, Any]) -> str:
         """将代理信息解码为Glider链接格式
         格式: [安全层,][传输层,][裸协议]
         
@@ -53,7 +54,7 @@ class GliderDecoder:
             for alpn in alpn_list:
                 params.append(f"alpn={alpn}")
             
-            base = f"tls://{info['server']}:{info['port']}"
+            base = f"tls://{ProxyEncoder.host_port(info)}"
             return f"{base}?{'&'.join(params)}" if params else base
         return None
     
@@ -78,12 +79,12 @@ class GliderDecoder:
     @staticmethod
     def _decode_ss(info: Dict[str, Any]) -> str:
         """解码为Shadowsocks的Glider链接格式"""
-        return f"ss://{info['method']}:{info['password']}@{info['server']}:{info['port']}"
+        return f"ss://{info['method']}:{info['password']}@{ProxyEncoder.host_port(info)}"
     
     @staticmethod
     def _decode_ssr(info: Dict[str, Any]) -> str:
         """解码为ShadowsocksR的Glider链接格式"""
-        base = f"ssr://{info['method']}:{info['password']}@{info['server']}:{info['port']}"
+        base = f"ssr://{info['method']}:{info['password']}@{ProxyEncoder.host_port(info)}"
         params = []
         
         if info.get("protocol"):
@@ -116,7 +117,7 @@ class GliderDecoder:
         encryption = info.get("encryption", "auto")
         if encryption == "auto":
             encryption = "aes-128-gcm"
-        base = f"vmess://{encryption}:{info['id']}@{info['server']}:{info['port']}"
+        base = f"vmess://{encryption}:{info['id']}@{ProxyEncoder.host_port(info)}"
         if "aid" in info:
             base = f"{base}?alterID={info['aid']}"
         parts.append(base)
@@ -139,7 +140,7 @@ class GliderDecoder:
             parts.append(transport_layer)
             
         # 3. 裸协议
-        base = f"vless://{info['id']}@{info['server']}:{info['port']}"
+        base = f"vless://{info['id']}@{ProxyEncoder.host_port(info)}"
         if info.get("fallback"):
             base = f"{base}?fallback={info['fallback']}"
         parts.append(base)
@@ -162,7 +163,7 @@ class GliderDecoder:
             parts.append(transport_layer)
             
         # 3. 裸协议
-        base = f"trojan://{info['password']}@{info['server']}:{info['port']}"
+        base = f"trojan://{info['password']}@{ProxyEncoder.host_port(info)}"
         parts.append(base)
         
         return ",".join(parts)
@@ -176,9 +177,9 @@ class GliderDecoder:
                 auth = f"{info['username']}:{info['password']}"
             else:
                 auth = info['username']
-            base = f"ssh://{auth}@{info['server']}:{info['port']}"
+            base = f"ssh://{auth}@{ProxyEncoder.host_port(info)}"
         else:
-            base = f"ssh://{info['server']}:{info['port']}"
+            base = f"ssh://{ProxyEncoder.host_port(info)}"
             
         params = []
         if info.get("private_key"):
@@ -0,0 +1,174 @@
+import base64
+import json
+import urllib.parse
+from typing import Dict, Any, List, Mapping
+from src.encoders.encoder import ProxyEncoder
+
+class LinkDecoder:
+    """将代理元信息解码为分享链接（ProxyEncoder 可以重新编码的格式）
+
+    用于没有原始链接的代理（如从Clash/sing-box配置解析的代理），
+    保存结果时生成与订阅链接相同格式的链接。
+    """
+
+    @staticmethod
+    def decode(proxy_info: Mapping[str, Any]) -> str:
+        """将代理信息解码为分享链接"""
+        if not proxy_info or "proxy_protocol" not in proxy_info:
+            raise ValueError("Invalid proxy info")
+
+        protocol = proxy_info["proxy_protocol"]
+        if hasattr(protocol, "value"):
+            protocol = protocol.value
+
+        decoder = _DECODERS.get(protocol)
+        if not decoder:
+            raise ValueError(f"Unsupported protocol: {protocol}")
+
+        try:
+            return decoder(proxy_info)
+        except Exception as e:
+            raise ValueError(f"Failed to decode {protocol} link: {str(e)}")
+
+    @staticmethod
+    def link(proxy_info: Mapping[str, Any]) -> str:
+        """代理的链接：有原始链接时直接返回，否则生成分享链接"""
+        return proxy_info.get("raw_link") or LinkDecoder.decode(proxy_info)
+
+    @staticmethod
+    def _fragment(info: Mapping[str, Any]) -> str:
+        """名称部分"""
+        name = info.get("name", "")
+        return f"#{urllib.parse.quote(name, safe='')}" if name else ""
+
+    @staticmethod
+    def _query(params: List[tuple]) -> str:
+        """查询参数（忽略空值）"""
+        params = [(key, value) for key, value in params if value not in ("", None, [])]
+        return f"?{urllib.parse.urlencode(params, quote_via=urllib.parse.quote)}" if params else ""
+
+    @staticmethod
+    def _alpn(info: Mapping[str, Any]) -> str:
+        """alpn参数（逗号分隔）"""
+        alpn = info.get("alpn") or []
+        return alpn if isinstance(alpn, str) else ",".join(alpn)
+
+    @staticmethod
+    def _b64(value: str) -> str:
+        """url-safe base64（无填充）"""
+        return base64.urlsafe_b64encode(value.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def _decode_ss(info: Mapping[str, Any]) -> str:
+        """Shadowsocks SIP002链接"""
+        user_info = LinkDecoder._b64(f"{info['method']}:{info['password']}")
+        plugin = ""
+        if info.get("plugin"):
+            value = info["plugin"] + (f";{info['plugin_opts']}" if info.get("plugin_opts") else "")
+            plugin = f"/?plugin={urllib.parse.quote(value, safe='')}"
+        return f"ss://{user_info}@{ProxyEncoder.host_port(info)}{plugin}{LinkDecoder._fragment(info)}"
+
+    @staticmethod
+    def _decode_ssr(info: Mapping[str, Any]) -> str:
+        """ShadowsocksR链接"""
+        main = ":".join((
+            info["server"], str(info["port"]), info.get("protocol") or "origin", info["method"],
+            info.get("obfs") or "plain", LinkDecoder._b64(info["password"])
+        ))
+        params = [
+            (key, LinkDecoder._b64(value))
+            for key, value in (
+                ("obfsparam", info.get("obfs_param", "")),
+                ("protoparam", info.get("protocol_param", "")),
+                ("remarks", info.get("name", "")),
+            )
+            if value
+        ]
+        query = f"/?{'&'.join(f'{key}={value}' for key, value in params)}" if params else ""
+        return f"ssr://{LinkDecoder._b64(main + query)}"
+
+    @staticmethod
+    def _decode_vmess(info: Mapping[str, Any]) -> str:
+        """VMess链接（v2rayN格式）"""
+        config = {
+            "v": "2",
+            "ps": info.get("name", ""),
+            "add": info["server"],
+            "port": str(info["port"]),
+            "id": info["id"],
+            "aid": str(info.get("aid", 0)),
+            "scy": info.get("encryption") or "auto",
+            "net": info.get("type") or "tcp",
+            "type": "none",
+            "host": info.get("host", ""),
+            "path": info.get("path", ""),
+            "tls": "tls" if info.get("security") == "tls" else "",
+            "sni": info.get("sni", ""),
+        }
+        for key, field in (("alpn", "alpn"), ("fp", "fingerprint"), ("flow", "flow"),
+                           ("pbk", "publicKey"), ("sid", "shortId"), ("spx", "spiderX")):
+            if info.get(field):
+                config[key] = info[field]
+        return f"vmess://{base64.b64encode(json.dumps(config, ensure_ascii=False).encode()).decode()}"
+
+    @staticmethod
+    def _decode_vless(info: Mapping[str, Any]) -> str:
+        """VLESS链接"""
+        query = LinkDecoder._query([
+            ("encryption", info.get("encryption") or "none"),
+            ("flow", info.get("flow")),
+            ("security", info.get("security")),
+            ("sni", info.get("sni")),
+            ("fp", info.get("fp")),
+            ("type", info.get("type") or "tcp"),
+            ("host", info.get("host")),
+            ("path", info.get("path")),
+            ("headerType", info.get("headerType")),
+            ("alpn", LinkDecoder._alpn(info)),
+            ("pbk", info.get("publicKey")),
+            ("sid", info.get("shortId")),
+            ("spx", info.get("spiderX")),
+        ])
+        return f"vless://{info['id']}@{ProxyEncoder.host_port(info)}{query}{LinkDecoder._fragment(info)}"
+
+    @staticmethod
+    def _decode_trojan(info: Mapping[str, Any]) -> str:
+        """Trojan链接"""
+        query = LinkDecoder._query([
+            ("security", info.get("security")),
+            ("sni", info.get("sni")),
+            ("type", info.get("type") or "tcp"),
+            ("host", info.get("host")),
+            ("path", info.get("path")),
+            ("allowInsecure", "1" if info.get("allowInsecure") == "1" or info.get("skipVerify") else None),
+            ("alpn", LinkDecoder._alpn(info)),
+            ("fp", info.get("fingerprint")),
+        ])
+        # 密码只转义会破坏链接结构的分隔符，其余字符保持原样
+        password = info["password"].translate(_DELIMITERS)
+        return f"trojan://{password}@{ProxyEncoder.host_port(info)}{query}{LinkDecoder._fragment(info)}"
+
+    @staticmethod
+    def _decode_ssh(info: Mapping[str, Any]) -> str:
+        """SSH链接"""
+        auth = ""
+        if info.get("username"):
+            auth = info["username"] + (f":{info['password']}" if info.get("password") else "") + "@"
+        params = [
+            ("name", info.get("name")),
+            ("key", info.get("private_key")),
+            ("key_password", info.get("key_password")),
+        ]
+        params.extend((f"ssh_{key}", value) for key, value in (info.get("ssh_options") or {}).items())
+        return f"ssh://{auth}{ProxyEncoder.host_port(info)}{LinkDecoder._query(params)}"
+
+_DELIMITERS = str.maketrans({char: f"%{ord(char):02X}" for char in "@#?/"})
+
+_DECODERS: Dict[str, Any] = {
+    "ss": LinkDecoder._decode_ss,
+    "ssr": LinkDecoder._decode_ssr,
+    "vmess": LinkDecoder._decode_vmess,
+    "vless": LinkDecoder._decode_vless,
+    "trojan": LinkDecoder._decode_trojan,
+    "ssh": LinkDecoder._decode_ssh,
+}
@@ -1,8 +1,13 @@
 from enum import Enum
+from concurrent.futures import Executor, ProcessPoolExecutor
 import base64
 import json
+import os
+import re
 import urllib.parse
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
+
+from src.models.proxy_record import ProxyRecord
 
 class ProxyProtocol(str, Enum):
     """代理协议类型"""
@@ -17,8 +22,8 @@ class ProxyEncoder:
     """代理链接编码器 - 将代理链接编码为标准格式的元信息字典"""
     
     @staticmethod
-    def encode(raw_link: str) -> Dict[str, Any]:
-        """将代理链接编码为元信息字典"""
+    def encode(raw_link: str) -> ProxyRecord:
+        """将代理链接编码为元信息记录（ProxyRecord，兼容字典用法）"""
         if not raw_link or not isinstance(raw_link, str):
             raise ValueError("Invalid proxy link")
             
@@ -31,109 +36,160 @@ class ProxyEncoder:
             raise ValueError(f"Unsupported protocol: {raw_link}")
             
         # 根据类型编码
-        encoder_map = {
-            ProxyProtocol.SS: ProxyEncoder._encode_ss,
-            ProxyProtocol.SSR: ProxyEncoder._encode_ssr,
-            ProxyProtocol.VMESS: ProxyEncoder._encode_vmess,
-            ProxyProtocol.VLESS: ProxyEncoder._encode_vless,
-            ProxyProtocol.TROJAN: ProxyEncoder._encode_trojan,
-            ProxyProtocol.SSH: ProxyEncoder._encode_ssh
-        }
-        
-        encoder = encoder_map.get(protocol)
+        encoder = _ENCODERS.get(protocol)
         if not encoder:
             raise ValueError(f"No encoder found for protocol: {protocol}")
             
         try:
-            proxy_info = encoder(raw_link)
+            proxy_info = ProxyRecord(encoder(raw_link))
             # 添加通用字段
-            proxy_info.update({
-                "proxy_protocol": protocol,
-                "raw_link": raw_link,
-                "name": proxy_info.get("name", ""),
-                "server": proxy_info.get("server", ""),
-                "port": proxy_info.get("port", "22") if protocol == ProxyProtocol.SSH else proxy_info.get("port", 0)
-            })
+            proxy_info.proxy_protocol = protocol
+            proxy_info.raw_link = raw_link
+            if "name" not in proxy_info:
+                proxy_info.name = ""
+            if "server" not in proxy_info:
+                proxy_info.server = ""
+            if "port" not in proxy_info:
+                proxy_info.port = "22" if protocol == ProxyProtocol.SSH else 0
             return proxy_info
         except Exception as e:
             raise ValueError(f"Failed to encode {protocol} link: {str(e)}")
 
+    @staticmethod
+    def encode_many(links: List[str], workers: Optional[int] = None, chunk_size: int = 1000,
+                    min_parallel: int = 5000, executor: Optional[Executor] = None
+                    ) -> List[Tuple[Optional[ProxyRecord], Optional[str]]]:
+        """批量编码代理链接
+
+        链接数量达到 min_parallel 时按 chunk_size 分块，在进程池中并行编码；
+        数量较少或 workers 为1时直接串行编码（避免进程间传输的开销）。
+
+        Args:
+            links: 代理链接列表
+            workers: 进程数，默认为CPU核数（传入 executor 时忽略）
+            chunk_size: 每个任务编码的链接数
+            min_parallel: 启用并行编码的最少链接数
+            executor: 复用的进程池，未传入时临时创建
+
+        Returns:
+            List[Tuple]: 与 links 顺序对应的 (记录, 错误信息)，编码失败时记录为None
+        """
+        workers = workers or os.cpu_count() or 1
+        if len(links) < min_parallel or (executor is None and workers <= 1):
+            return _encode_chunk(links)
+
+        chunks = [links[i:i + chunk_size] for i in range(0, len(links), chunk_size)]
+        if executor is not None:
+            return ProxyEncoder._collect(executor.map(_encode_chunk_to_dicts, chunks))
+
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+            return ProxyEncoder._collect(pool.map(_encode_chunk_to_dicts, chunks))
+
+    @staticmethod
+    def _collect(chunks) -> List[Tuple[Optional[ProxyRecord], Optional[str]]]:
+        """将进程池返回的字典转换为记录"""
+        return [
+            (ProxyRecord(data) if data is not None else None, error)
+            for chunk in chunks for data, error in chunk
+        ]
+
+    @staticmethod
+    def canonical_key(proxy_info: Dict[str, Any]) -> str:
+        """代理的规范标识
+
+        由协议、服务器、端口、认证信息和传输/TLS参数组成，忽略名称、原始链接、
+        参数顺序、base64填充和空值，同一个服务器的不同链接得到相同的标识。
+        """
+        protocol = proxy_info["proxy_protocol"]
+        protocol = protocol.value if hasattr(protocol, "value") else str(protocol)
+
+        fields = {}
+        for key, value in proxy_info.items():
+            if key in ("name", "raw_link", "aliases", "proxy_protocol", "server", "port"):
+                continue
+            if isinstance(value, (list, tuple)):
+                value = ",".join(sorted(str(v).strip().lower() for v in value if str(v).strip()))
+            elif isinstance(value, dict):
+                value = json.dumps(value, sort_keys=True) if value else ""
+            if value in ("", None):
+                continue
+            if key in ("method", "security", "type", "encryption", "headerType", "fingerprint", "fp", "sni", "host"):
+                value = str(value).lower()
+            fields[key] = value
+
+        server = str(proxy_info.get("server", "")).strip("[]").lower()
+        return f"{protocol}://{server}:{int(proxy_info.get('port') or 0)}?{json.dumps(fields, sort_keys=True, ensure_ascii=False)}"
+
     @staticmethod
     def _get_protocol(raw_link: str) -> ProxyProtocol:
         """获取代理协议类型"""
-        if raw_link.startswith("ss://"):
-            return ProxyProtocol.SS
-        elif raw_link.startswith("ssr://"):
-            return ProxyProtocol.SSR
-        elif raw_link.startswith("vmess://"):
-            return ProxyProtocol.VMESS
-        elif raw_link.startswith("vless://"):
-            return ProxyProtocol.VLESS
-        elif raw_link.startswith("trojan://"):
-            return ProxyProtocol.TROJAN
-        elif raw_link.startswith("ssh://"):
-            return ProxyProtocol.SSH
-        return None
+        scheme, separator, _ = raw_link.partition("://")
+        if not separator:
+            return None
+        return _SCHEMES.get(scheme)
+
+    @staticmethod
+    def _split_host_port(host_port: str) -> Tuple[str, str]:
+        """分离服务器地址和端口，支持 [IPv6]:port 格式（返回的地址不带方括号，端口部分保留后续内容）"""
+        if host_port.startswith("["):
+            host, sep, rest = host_port[1:].partition("]")
+            if not sep or not rest.startswith(":"):
+                raise ValueError("Invalid server address format")
+            return host, rest[1:]
+        host, port = host_port.split(":", 1)
+        return host, port
+
+    @staticmethod
+    def host_port(proxy_info: Dict[str, Any]) -> str:
+        """代理的服务器地址和端口，IPv6地址加方括号（与 _split_host_port 相反，供各解码器生成链接）"""
+        server = proxy_info["server"]
+        if ":" in server and not server.startswith("["):
+            server = f"[{server}]"
+        return f"{server}:{proxy_info['port']}"
 
     # ... (其余编码方法保持不变，只需将方法名从_parse_xxx改为_encode_xxx) 
     @staticmethod
     def _encode_ss(raw_link: str) -> Dict[str, Any]:
         """解析 Shadowsocks 链接"""
-        # 移除前缀
-        content = raw_link[5:]
+        # 移除前缀，分离名称
+        content, _, name = raw_link[5:].partition("#")
+        user_info, at, server_info = content.partition("@")
         
         # 处理 SIP002 格式
-        if "@" in content:
+        if at:
             # 示例: ss://YWVzLTEyOC1nY206dGVzdA@192.168.100.1:8888#Example
-            if "#" in content:
-                content, name = content.split("#", 1)
-            else:
-                name = ""
-                
-            user_info, server_info = content.split("@", 1)
-            
-            # 解码用户信息
-            try:
-                user_info = base64.urlsafe_b64decode(user_info + "=" * (-len(user_info) % 4)).decode()
-            except:
-                # 可能已经是解码后的格式
-                pass
-                
-            method, password = user_info.split(":", 1)
+            # 用户信息含":"时是明文（不是base64），否则解码
+            if ":" not in user_info:
+                try:
+                    user_info = _b64decode(user_info)
+                except Exception:
+                    pass
+            method, colon, password = user_info.partition(":")
+            if not colon:
+                raise ValueError("Invalid user info")
             
-            # 处理服务器信息，考虑可能存在的插件参数
-            if "/?" in server_info:
-                server_port, plugin_info = server_info.split("/?", 1)
-            else:
-                server_port = server_info
-                plugin_info = ""
-                
-            server, port = server_port.split(":", 1)
-            
-            # 如果端口后还有其他内容，只取端口部分
-            port = port.split("/")[0]
+            # 端口后可能有插件参数（/?plugin=...）
+            server, port = ProxyEncoder._split_host_port(server_info)
+            port = _PORT_END.split(port, 1)[0]
             
         # 处理传统格式
         else:
             # 示例: ss://YWVzLTEyOC1nY206dGVzdEAxOTIuMTY4LjEwMC4xOjg4ODg#Example
-            if "#" in content:
-                content, name = content.split("#", 1)
-            else:
-                name = ""
-                
             try:
-                content = base64.urlsafe_b64decode(content + "=" * (-len(content) % 4)).decode()
-            except:
+                content = _b64decode(content)
+            except Exception:
                 raise ValueError("Invalid base64 encoding")
                 
-            method, rest = content.split(":", 1)
-            password, server_info = rest.split("@", 1)
-            server, port = server_info.split(":", 1)
+            method, _, rest = content.partition(":")
+            password, at, server_info = rest.rpartition("@")
+            if not at:
+                raise ValueError("Invalid SS link format")
+            server, port = ProxyEncoder._split_host_port(server_info)
             
         return {
-            "name": urllib.parse.unquote(name),
+            "name": _unquote(name),
             "server": server,
-            "port": int(port),  # 转换为���数
+            "port": int(port),  # 转换为整数
             "method": method,
             "password": password,
             # 默认值
@@ -145,20 +201,14 @@ class ProxyEncoder:
     @staticmethod
     def _encode_ssr(raw_link: str) -> Dict[str, Any]:
         """解析 ShadowsocksR 链接"""
-        # 移除前缀
-        content = raw_link[6:]
-        
         try:
-            content = base64.urlsafe_b64decode(content + "=" * (-len(content) % 4)).decode()
-        except:
+            content = _b64decode(raw_link[6:])
+        except Exception:
             raise ValueError("Invalid base64 encoding")
             
         # 解析主要部分和参数部分
-        if "?" in content:
-            main_part, params_str = content.split("?", 1)
-        else:
-            main_part, params_str = content, ""
-            
+        main_part, _, params_str = content.partition("?")
+        
         # 解析主要部分
         parts = main_part.split(":", 5)
         if len(parts) != 6:
@@ -167,20 +217,20 @@ class ProxyEncoder:
         server, port, protocol, method, obfs, password_b64 = parts
         
         try:
-            # 修改这里：移除密码中的填充字符
-            password = base64.urlsafe_b64decode(password_b64 + "=" * (-len(password_b64) % 4)).decode().rstrip('\x0f')
-        except:
+            # 移除密码中的填充字符
+            password = _b64decode(password_b64.rstrip("/")).rstrip('\x0f')
+        except Exception:
             raise ValueError("Invalid password encoding")
             
-        # 解析参数
+        # 解析参数（参数值为base64编码）
         params = {}
         if params_str:
             for item in params_str.split("&"):
-                if "=" in item:
-                    k, v = item.split("=", 1)
+                k, eq, v = item.partition("=")
+                if eq:
                     try:
-                        params[k] = base64.urlsafe_b64decode(v + "=" * (-len(v) % 4)).decode()
-                    except:
+                        params[k] = _b64decode(v)
+                    except Exception:
                         params[k] = v
                         
         return {
@@ -200,183 +250,137 @@ class ProxyEncoder:
     @staticmethod
     def _encode_vmess(raw_link: str) -> Dict[str, Any]:
         """解析 VMess 链接"""
-        # 移除前缀
-        content = raw_link[8:]
-        
         try:
-            content = base64.urlsafe_b64decode(content + "=" * (-len(content) % 4)).decode()
-            config = json.loads(content)
-        except:
+            config = json.loads(_b64decode(raw_link[8:]))
+        except Exception:
             raise ValueError("Invalid VMess link format")
             
         # 提取信息并确保aid是整数
+        get = config.get
         return {
-            "name": config.get("ps", ""),
-            "server": config.get("add", ""),
-            "port": int(config.get("port", 0)),  # 转换为整数
-            "id": config.get("id", ""),
-            "aid": int(config.get("aid", 0)),
-            "type": config.get("net", "tcp"),  # 使用net字段作为传输类型
-            "host": config.get("host", ""),
-            "path": config.get("path", ""),
-            "security": "tls" if config.get("tls") == "tls" else "",
-            "sni": config.get("sni", ""),
-            "encryption": config.get("scy", "auto"),
-            "flow": config.get("flow", ""),
-            "alpn": config.get("alpn", []),
-            "fingerprint": config.get("fp", ""),
-            "publicKey": config.get("pbk", ""),
-            "shortId": config.get("sid", ""),
-            "spiderX": config.get("spx", "")
+            "name": get("ps", ""),
+            "server": get("add", "").strip("[]"),
+            "port": int(get("port", 0)),  # 转换为整数
+            "id": get("id", ""),
+            "aid": int(get("aid", 0)),
+            "type": get("net", "tcp"),  # 使用net字段作为传输类型
+            "host": get("host", ""),
+            "path": get("path", ""),
+            "security": "tls" if get("tls") == "tls" else "",
+            "sni": get("sni", ""),
+            "encryption": get("scy", "auto"),
+            "flow": get("flow", ""),
+            "alpn": get("alpn", []),
+            "fingerprint": get("fp", ""),
+            "publicKey": get("pbk", ""),
+            "shortId": get("sid", ""),
+            "spiderX": get("spx", "")
         }
 
     @staticmethod
-    def _encode_vless(raw_link: str) -> Dict[str, Any]:
-        """编码 VLESS 链接"""
-        # 移除前缀
-        content = raw_link[8:]
-        
-        # 分离名称
-        if "#" in content:
-            content, name = content.split("#", 1)
-            name = urllib.parse.unquote(name)
-        else:
-            name = ""
-            
-        # 分离用户信息和服务器信息
-        if "@" not in content:
-            raise ValueError("Invalid VLESS link format")
-            
-        user_info, server_info = content.split("@", 1)
-        
-        # 分离服务器和端口
+    def _split_authority(content: str, kind: str) -> Tuple[str, str, str, Dict[str, str]]:
+        """分离 user@host:port?query 形式的链接主体（vless/trojan共用）
+
+        Returns:
+            Tuple: (用户信息, 服务器, 端口, 参数)
+        """
+        user_info, at, server_info = content.partition("@")
+        if not at:
+            raise ValueError(f"Invalid {kind} link format")
         if ":" not in server_info:
             raise ValueError("Invalid server address format")
             
-        server, port = server_info.split(":", 1)
-        if "?" in port:
-            port, params_str = port.split("?", 1)
-        else:
-            params_str = ""
-            
-        # 解析参数
-        params = {}
-        if params_str:
-            params = dict(urllib.parse.parse_qsl(params_str))
+        server, port = ProxyEncoder._split_host_port(server_info)
+        port, _, params_str = port.partition("?")
+        # 允许 host:port/?query 形式
+        return user_info, server, port.rstrip("/"), _parse_query(params_str) if params_str else {}
+
+    @staticmethod
+    def _encode_vless(raw_link: str) -> Dict[str, Any]:
+        """编码 VLESS 链接"""
+        # 移除前缀，分离名称
+        content, _, name = raw_link[8:].partition("#")
+        user_info, server, port, params = ProxyEncoder._split_authority(content, "VLESS")
+        get = params.get
             
         # 处理alpn参数，可能是逗号分隔的字符串
-        alpn = params.get("alpn", "")
+        alpn = get("alpn", "")
         if alpn:
             alpn = [a.strip() for a in alpn.split(",") if a.strip()]
         
         return {
-            "name": name,
+            "name": _unquote(name),
             "server": server,
             "port": int(port),
             "id": user_info,
-            "flow": params.get("flow", ""),
-            "encryption": params.get("encryption", "none"),
-            "security": params.get("security", ""),
-            "sni": params.get("sni", ""),
-            "fp": params.get("fp", ""),
-            "type": params.get("type", "tcp"),
-            "host": params.get("host", ""),
-            "path": params.get("path", ""),
-            "headerType": params.get("headerType", ""),
+            "flow": get("flow", ""),
+            "encryption": get("encryption", "none"),
+            "security": get("security", ""),
+            "sni": get("sni", ""),
+            "fp": get("fp", ""),
+            "type": get("type", "tcp"),
+            "host": get("host", ""),
+            "path": get("path", ""),
+            "headerType": get("headerType", ""),
             "alpn": alpn,  # 保存为列表
             # 默认值
-            "publicKey": params.get("pbk", ""),
-            "shortId": params.get("sid", ""),
-            "spiderX": params.get("spx", "")
+            "publicKey": get("pbk", ""),
+            "shortId": get("sid", ""),
+            "spiderX": get("spx", "")
         }
 
     @staticmethod
     def _encode_trojan(raw_link: str) -> Dict[str, Any]:
         """解析 Trojan 链接"""
-        # 移除前缀
-        content = raw_link[9:]
-        
-        # 分离名称
-        if "#" in content:
-            content, name = content.split("#", 1)
-            name = urllib.parse.unquote(name)
-        else:
-            name = ""
-            
-        # 分离密码和服务器信息
-        if "@" not in content:
-            raise ValueError("Invalid Trojan link format")
-            
-        password, server_info = content.split("@", 1)
-        
-        # 分离服务器和端口
-        if ":" not in server_info:
-            raise ValueError("Invalid server address format")
-            
-        server, port = server_info.split(":", 1)
-        if "?" in port:
-            port, params_str = port.split("?", 1)
-        else:
-            params_str = ""
-            
-        # 解析参数
-        params = {}
-        if params_str:
-            params = dict(urllib.parse.parse_qsl(params_str))
+        # 移除前缀，分离名称
+        content, _, name = raw_link[9:].partition("#")
+        password, server, port, params = ProxyEncoder._split_authority(content, "Trojan")
+        get = params.get
+        allow_insecure = get("allowInsecure", "0")
+        alpn = get("alpn")
             
         return {
-            "name": name,
+            "name": _unquote(name),
             "server": server,
             "port": int(port),  # 转换为整数
             "password": password,
-            # 修改这里：只在明确指定时才设置TLS
-            "security": params.get("security", ""),  # 不再默认为tls
-            "sni": params.get("sni", ""),
-            "type": params.get("type", "tcp"),
-            "host": params.get("host", ""),
-            "path": params.get("path", ""),
-            # 添加allowInsecure参数
-            "allowInsecure": params.get("allowInsecure", "0"),
+            # 只在明确指定时才设置TLS
+            "security": get("security", ""),
+            "sni": get("sni", ""),
+            "type": get("type", "tcp"),
+            "host": get("host", ""),
+            "path": get("path", ""),
+            "allowInsecure": allow_insecure,
             # 默认值
-            "alpn": params.get("alpn", "").split(",") if params.get("alpn") else [],
-            "fingerprint": params.get("fp", ""),
-            "skipVerify": params.get("allowInsecure", "0") == "1",
+            "alpn": alpn.split(",") if alpn else [],
+            "fingerprint": get("fp", ""),
+            "skipVerify": allow_insecure == "1",
             "udp": True
         }
 
     @staticmethod
     def _encode_ssh(raw_link: str) -> Dict[str, Any]:
         """解析 SSH 链接"""
-        # 移除前缀
-        content = raw_link[6:]
-        
-        # 分离服务器信息和参数
-        if "?" in content:
-            server_info, params_str = content.split("?", 1)
-        else:
-            server_info, params_str = content, ""
+        # 移除前缀，分离服务器信息和参数
+        server_info, _, params_str = raw_link[6:].partition("?")
             
         # 解析用户名、密码和服务器信息
-        if "@" in server_info:
-            auth_info, host_info = server_info.split("@", 1)
-            if ":" in auth_info:
-                username, password = auth_info.split(":", 1)
-            else:
-                username, password = auth_info, ""
+        auth_info, at, host_info = server_info.rpartition("@")
+        if at:
+            username, _, password = auth_info.partition(":")
         else:
             username, password = "", ""
-            host_info = server_info
             
         # 解析服务器和端口
-        if ":" in host_info:
-            server, port = host_info.split(":", 1)
+        if host_info.startswith("[") and "]:" not in host_info:
+            server, port = host_info.strip("[]"), "22"
+        elif ":" in host_info:
+            server, port = ProxyEncoder._split_host_port(host_info)
         else:
             server, port = host_info, "22"
             
         # 解析参数
-        params = {}
-        if params_str:
-            params = dict(urllib.parse.parse_qsl(params_str))
+        params = _parse_query(params_str) if params_str else {}
             
         return {
             "name": params.get("name", ""),
@@ -387,4 +391,60 @@ class ProxyEncoder:
             "private_key": params.get("key", ""),
             "key_password": params.get("key_password", ""),
             "ssh_options": {k[4:]: v for k, v in params.items() if k.startswith("ssh_")}
-        } 
\ No newline at end of file
+        } 
+
+def _b64decode(data: str) -> str:
+    """解码base64（兼容url-safe字符和缺失的填充）"""
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4)).decode()
+
+def _unquote(value: str) -> str:
+    """URL解码（无转义字符时直接返回）"""
+    return urllib.parse.unquote(value) if "%" in value else value
+
+def _parse_query(query: str) -> Dict[str, str]:
+    """解析查询参数，结果与 dict(urllib.parse.parse_qsl(query)) 一致，但不含转义时跳过解码"""
+    params = {}
+    for field in query.split("&"):
+        key, eq, value = field.partition("=")
+        # 与 parse_qsl 一致：跳过没有"="或值为空的参数
+        if not eq or not value:
+            continue
+        if "%" in key or "+" in key:
+            key = urllib.parse.unquote(key.replace("+", " "))
+        if "%" in value or "+" in value:
+            value = urllib.parse.unquote(value.replace("+", " "))
+        params[key] = value
+    return params
+
+# SS端口之后的插件参数分隔符
+_PORT_END = re.compile(r"[/?]")
+
+# 链接前缀 -> 协议
+_SCHEMES = {protocol.value: protocol for protocol in ProxyProtocol}
+
+# 协议 -> 编码函数
+_ENCODERS = {
+    ProxyProtocol.SS: ProxyEncoder._encode_ss,
+    ProxyProtocol.SSR: ProxyEncoder._encode_ssr,
+    ProxyProtocol.VMESS: ProxyEncoder._encode_vmess,
+    ProxyProtocol.VLESS: ProxyEncoder._encode_vless,
+    ProxyProtocol.TROJAN: ProxyEncoder._encode_trojan,
+    ProxyProtocol.SSH: ProxyEncoder._encode_ssh
+}
+
+def _encode_chunk(links: List[str]) -> List[Tuple[Optional[ProxyRecord], Optional[str]]]:
+    """编码一组链接"""
+    results = []
+    for link in links:
+        try:
+            results.append((ProxyEncoder.encode(link), None))
+        except Exception as e:
+            results.append((None, str(e)))
+    return results
+
+def _encode_chunk_to_dicts(links: List[str]) -> List[Tuple[Optional[Dict[str, Any]], Optional[str]]]:
+    """进程池任务：编码一组链接，结果以字典返回（普通字典的序列化开销最小）"""
+    return [
+        (record.to_dict() if record is not None else None, error)
+        for record, error in _encode_chunk(links)
+    ]
@@ -0,0 +1,91 @@
+import hashlib
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+# 服务器返回304时获取器返回的标记
+NOT_MODIFIED = object()
+
+class FetchCache:
+    """订阅源获取缓存
+
+    为每个URL保存 ETag、Last-Modified、内容摘要和解析后的代理链接，
+    订阅源未变化（304或内容摘要相同）时直接返回上次的解析结果。
+    """
+
+    def __init__(self, cache_file: str = "results/cache/fetch_cache.json", logger=None):
+        self.cache_file = cache_file
+        self.logger = logger
+        self.entries: Dict[str, Dict] = {}
+        # 已收到但尚未确认（解析成功）的校验信息
+        self._pending: Dict[str, Dict] = {}
+        self.load()
+
+    def load(self) -> None:
+        """从磁盘加载缓存"""
+        if not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except Exception as e:
+            if self.logger:
+                self.logger.debug(f"Failed to load fetch cache {self.cache_file}: {str(e)}")
+            self.entries = {}
+
+    def save(self) -> None:
+        """原子地写入缓存文件"""
+        os.makedirs(os.path.dirname(self.cache_file) or ".", exist_ok=True)
+        tmp_file = f"{self.cache_file}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False)
+        os.replace(tmp_file, self.cache_file)
+
+    @staticmethod
+    def digest(content: str) -> str:
+        """计算内容摘要"""
+        return hashlib.sha256(content.encode("utf-8", "surrogatepass")).hexdigest()
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """生成条件请求头（仅在已有解析结果时发送）"""
+        entry = self.entries.get(url)
+        if not entry or entry.get("links") is None:
+            return {}
+
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def record_validators(self, url: str, etag: Optional[str], last_modified: Optional[str]) -> None:
+        """记录响应中的校验信息，等待 put_links 确认"""
+        self._pending[url] = {"etag": etag, "last_modified": last_modified}
+
+    def get_links(self, url: str, content) -> Optional[List[str]]:
+        """返回未变化订阅源的缓存链接，订阅源有变化时返回None"""
+        entry = self.entries.get(url)
+        if not entry or entry.get("links") is None:
+            return None
+
+        if content is NOT_MODIFIED or entry.get("digest") == self.digest(content):
+            # 内容未变化时沿用新的校验信息
+            pending = self._pending.pop(url, None)
+            if pending:
+                entry.update(pending)
+            entry["checked_at"] = time.time()
+            return entry["links"]
+        return None
+
+    def put_links(self, url: str, content: Optional[str], links: List[str], digest: Optional[str] = None) -> None:
+        """保存订阅源的解析结果（流式获取时没有完整内容，直接传入摘要）"""
+        pending = self._pending.pop(url, {})
+        self.entries[url] = {
+            "etag": pending.get("etag"),
+            "last_modified": pending.get("last_modified"),
+            "digest": digest or self.digest(content),
+            "links": list(links),
+            "checked_at": time.time()
+        }
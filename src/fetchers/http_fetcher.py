@@ -1,27 +1,126 @@
 import aiohttp
+import asyncio
+import hashlib
 import os
-from typing import Optional
+from typing import Any, Optional, Iterable, AsyncIterable, AsyncIterator, Callable, List, NamedTuple, Tuple, Union
 from .base_fetcher import BaseFetcher
+from .fetch_cache import FetchCache, NOT_MODIFIED
+
+# 流式解析函数：接收原始数据块，产出代理链接（配置订阅产出代理记录）
+StreamParser = Callable[[AsyncIterable[bytes]], AsyncIterator[Any]]
+
+class StreamedLinks(NamedTuple):
+    """流式获取并解析的结果"""
+    links: List[Any]
+    digest: str  # 原始内容的摘要（与 FetchCache.digest 相同）
+
+# 获取结果：响应内容、流式解析结果、NOT_MODIFIED（object）或获取失败时的None
+FetchResult = Optional[Union[str, StreamedLinks, object]]
 
 class HttpFetcher(BaseFetcher):
     """HTTP获取器"""
-    
-    def __init__(self, logger=None, connect_timeout: int = 10, max_retries: int = 3, proxy: Optional[dict] = None):
+
+    def __init__(self, logger=None, connect_timeout: int = 10, max_retries: int = 3, proxy: Optional[dict] = None,
+                 max_connections: int = 32, max_connections_per_host: int = 8, keepalive_timeout: int = 30,
+                 cache: Optional[FetchCache] = None, chunk_size: int = 65536):
         super().__init__(logger)
         self.connect_timeout = connect_timeout
         self.max_retries = max_retries
         self.proxy = proxy
-        
-    async def fetch(self, url: str) -> Optional[str]:
+
+        # 条件请求缓存（可选）
+        self.cache = cache
+        # 流式读取时每块的大小（字节）
+        self.chunk_size = chunk_size
+
+        # 连接池参数
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.keepalive_timeout = keepalive_timeout
+
+        # 长生命周期会话（在上下文管理器内共享）
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self):
+        """打开共享会话"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ssl=False  # 忽略SSL证书验证
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """关闭共享会话"""
+        await self.close()
+
+    async def close(self):
+        """关闭共享会话"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def fetch(self, url: str, parse_stream: Optional[StreamParser] = None) -> FetchResult:
         """获取URL内容
-        
+
         支持:
         - HTTP/HTTPS URL
         - 本地文件路径（相对于项目根目录）
+
+        配置了缓存且服务器返回304时，返回 NOT_MODIFIED。
+        传入 parse_stream 时按块读取内容并边读边解析，返回 StreamedLinks
+        （不在内存中保存完整的响应内容）。
+        """
+        # 没有打开的会话时，为本次请求临时创建
+        if self._session is None:
+            async with self:
+                return await self._fetch(url, parse_stream)
+        return await self._fetch(url, parse_stream)
+
+    async def fetch_many(self, urls: Iterable[str], parse_stream: Optional[StreamParser] = None
+                         ) -> AsyncIterator[Tuple[str, FetchResult]]:
+        """并发获取多个URL，按完成顺序产出 (url, content)
+
+        所有请求共享同一个会话和连接池，获取失败时 content 为 None，
+        订阅源未变化时 content 为 NOT_MODIFIED。parse_stream 同 fetch。
         """
+        owns_session = self._session is None
+        if owns_session:
+            await self.__aenter__()
+
+        tasks = [asyncio.ensure_future(self._fetch_with_url(url, parse_stream)) for url in urls]
+        try:
+            for future in asyncio.as_completed(tasks):
+                yield await future
+        finally:
+            # 提前退出时取消尚未完成的请求
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            if owns_session:
+                await self.close()
+
+    async def _fetch_with_url(self, url: str, parse_stream: Optional[StreamParser] = None) -> Tuple[str, FetchResult]:
+        """获取URL内容并附带URL返回"""
+        try:
+            return url, await self._fetch(url, parse_stream)
+        except Exception as e:
+            if self.logger:
+                self.logger.debug(f"Failed to fetch {url}: {str(e)}")
+            return url, None
+
+    async def _fetch(self, url: str, parse_stream: Optional[StreamParser] = None) -> FetchResult:
+        """使用共享会话获取URL内容"""
         # 检查是否是本地文件
         if not url.startswith(('http://', 'https://')):
             try:
+                if parse_stream:
+                    return await self._parse_chunks(self._read_file(url), parse_stream, url)
                 # 尝试作为相对路径读取
                 with open(url, 'r', encoding='utf-8') as f:
                     return f.read()
@@ -29,33 +128,49 @@ class HttpFetcher(BaseFetcher):
                 if self.logger:
                     self.logger.debug(f"Failed to read local file {url}: {str(e)}")
                 return None
-        
+
+        # 配置代理
+        proxy = None
+        if self.proxy and self.proxy.get("enabled"):
+            proxy = self.proxy.get("url")
+
+        # 条件请求头
+        headers = self.cache.conditional_headers(url) if self.cache else {}
+
         # HTTP/HTTPS URL
         for i in range(self.max_retries + 1):
             try:
-                # 配置代理
-                proxy = None
-                if self.proxy and self.proxy.get("enabled"):
-                    proxy = self.proxy.get("url")
-                
-                # 创建会话
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(
-                        url,
-                        timeout=aiohttp.ClientTimeout(total=self.connect_timeout),
-                        proxy=proxy,
-                        ssl=False  # 忽略SSL证书验证
-                    ) as response:
-                        if response.status == 200:
-                            content = await response.text()
-                            if content:
-                                return content
-                            if self.logger:
-                                self.logger.debug(f"Empty response from {url}")
+                async with self._session.get(
+                    url,
+                    headers=headers,
+                    timeout=aiohttp.ClientTimeout(total=self.connect_timeout),
+                    proxy=proxy
+                ) as response:
+                    if response.status == 304 and headers:
+                        if self.logger:
+                            self.logger.debug(f"Not modified: {url}")
+                        return NOT_MODIFIED
+                    if response.status == 200:
+                        if parse_stream:
+                            content = await self._parse_chunks(
+                                response.content.iter_chunked(self.chunk_size), parse_stream, url
+                            )
                         else:
-                            if self.logger:
-                                self.logger.debug(f"HTTP {response.status} from {url}")
-                            continue
+                            content = await response.text()
+                        if content:
+                            if self.cache:
+                                self.cache.record_validators(
+                                    url,
+                                    response.headers.get("ETag"),
+                                    response.headers.get("Last-Modified")
+                                )
+                            return content
+                        if self.logger:
+                            self.logger.debug(f"Empty response from {url}")
+                    else:
+                        if self.logger:
+                            self.logger.debug(f"HTTP {response.status} from {url}")
+                        continue
             except Exception as e:
                 if i == self.max_retries:
                     if self.logger:
@@ -63,4 +178,33 @@ class HttpFetcher(BaseFetcher):
                     return None
                 continue
         return None
-    
\ No newline at end of file
+
+    async def _read_file(self, path: str) -> AsyncIterator[bytes]:
+        """按块读取本地文件"""
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(self.chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+    async def _parse_chunks(self, chunks: AsyncIterable[bytes], parse_stream: StreamParser, url: str) -> Optional[StreamedLinks]:
+        """边读取边解析，同时计算内容摘要（内容为空或格式错误时返回None，与空响应的处理相同）"""
+        digest = hashlib.sha256()
+        size = 0
+
+        async def hashed():
+            nonlocal size
+            async for chunk in chunks:
+                digest.update(chunk)
+                size += len(chunk)
+                yield chunk
+
+        try:
+            links = [link async for link in parse_stream(hashed())]
+        except ValueError as e:
+            # 格式错误的内容不记录缓存校验信息
+            if self.logger:
+                self.logger.debug(f"Failed to parse {url}: {str(e)}")
+            return None
+        return StreamedLinks(links, digest.hexdigest()) if size else None
@@ -0,0 +1,129 @@
+import sys
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, Optional
+
+class ProxyRecord(MutableMapping):
+    """代理元信息记录
+
+    使用 __slots__ 存储各协议的字段，比每个链接一个字典占用更少的内存；
+    同时实现映射接口（record['server']、record.get('sni')、dict(record)），
+    与原来的字典用法兼容。未设置的字段视为不存在的键。
+    """
+
+    # 各协议编码结果的全部字段
+    FIELDS = (
+        # 通用
+        "proxy_protocol", "raw_link", "name", "server", "port", "aliases", "udp",
+        # SS / SSR
+        "method", "password", "plugin", "plugin_opts",
+        "protocol", "protocol_param", "obfs", "obfs_param",
+        # VMess / VLESS / Trojan
+        "id", "aid", "flow", "encryption", "security", "sni", "alpn", "fp", "fingerprint",
+        "type", "host", "path", "headerType", "publicKey", "shortId", "spiderX",
+        "allowInsecure", "skipVerify",
+        # SSH
+        "username", "private_key", "key_password", "ssh_options",
+    )
+
+    # 取值范围小、在大量链接间重复的字段，驻留字符串以共享同一个对象
+    INTERNED_FIELDS = frozenset((
+        "server", "method", "protocol", "obfs", "flow", "encryption", "security", "sni",
+        "fp", "fingerprint", "type", "host", "headerType", "allowInsecure",
+    ))
+
+    __slots__ = FIELDS + ("_extra",)
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None, **fields: Any):
+        self._extra = None
+        if data:
+            self._fill(data)
+        if fields:
+            self._fill(fields)
+
+    def _fill(self, data: Dict[str, Any]) -> None:
+        """批量设置字段（编码时的热点路径，避免逐个调用 __setitem__）"""
+        slot_set = self._SLOT_SET
+        interned = self.INTERNED_FIELDS
+        intern = sys.intern
+        for key, value in data.items():
+            if key in slot_set:
+                if key in interned and type(value) is str:
+                    value = intern(value)
+                setattr(self, key, value)
+            else:
+                self[key] = value
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ProxyRecord":
+        """从字典创建记录"""
+        return cls(data)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        return dict(self.items())
+
+    @property
+    def proxy_type(self) -> str:
+        """协议名称字符串"""
+        protocol = self["proxy_protocol"]
+        return protocol.value if hasattr(protocol, "value") else protocol
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._SLOT_SET:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in self._SLOT_SET:
+            if key in self.INTERNED_FIELDS and type(value) is str:
+                value = sys.intern(value)
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key in self._SLOT_SET:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        elif self._extra is not None and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        if key in self._SLOT_SET:
+            return hasattr(self, key)
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self) -> Iterator[str]:
+        for field in self.FIELDS:
+            if hasattr(self, field):
+                yield field
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __repr__(self) -> str:
+        return f"ProxyRecord({self.to_dict()!r})"
+
+    def __reduce__(self):
+        return (self.__class__, (self.to_dict(),))
+
+ProxyRecord._SLOT_SET = frozenset(ProxyRecord.FIELDS)
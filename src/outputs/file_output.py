@@ -1,10 +1,16 @@
+import json
 import os
 import shutil
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Mapping, Optional
 from datetime import datetime
+from src.decoders.link_decoder import LinkDecoder
 
 class FileOutput:
-    """文件输出处理器"""
+    """文件输出处理器
+
+    每个站点保存为 {站点}.txt（代理链接），测试指标保存在同名的 {站点}.json 中，
+    按链接记录各项时间和吞吐量。
+    """
     
     def __init__(self, logger=None, output_dir="results/output", backup_dir="results/output/backup", config=None):
         self.logger = logger
@@ -12,8 +18,16 @@ class FileOutput:
         self.backup_dir = backup_dir
         self.config = config or {}
         
-    def save(self, site: str, proxies: List[Dict[str, Any]], config: Dict = None) -> None:
-        """保存代理到文件"""
+    def save(self, site: str, proxies: List[Mapping[str, Any]], config: Dict = None,
+             metrics: Optional[List[Dict[str, Any]]] = None) -> None:
+        """保存代理到文件
+        
+        Args:
+            site: 站点名
+            proxies: 代理列表
+            config: 配置（未使用）
+            metrics: 与 proxies 顺序对应的测试指标（TestResult.metrics()），为None时不保存指标
+        """
         if not proxies:
             return
             
@@ -31,14 +45,34 @@ class FileOutput:
             ""  # 空行分隔注释和内容
         ]
         
-        # 保存到文件
+        # 保存到文件（没有原始链接的代理生成分享链接）
+        links = [LinkDecoder.link(proxy) for proxy in proxies]
         output_file = os.path.join(self.output_dir, f"{site}.txt")
         with open(output_file, "w", encoding="utf-8") as f:
             # 写入文件头
             f.write("\n".join(header))
             # 写入代理链接
-            for proxy in proxies:
-                f.write(f"{proxy['raw_link']}\n")
+            for link in links:
+                f.write(f"{link}\n")
+        
+        if metrics is not None:
+            metrics_file = os.path.join(self.output_dir, f"{site}.json")
+            with open(metrics_file, "w", encoding="utf-8") as f:
+                json.dump({
+                    "site": site,
+                    "timestamp": timestamp,
+                    "proxies": {link: proxy_metrics for link, proxy_metrics in zip(links, metrics)}
+                }, f, ensure_ascii=False, indent=1)
+    
+    @staticmethod
+    def load_metrics(results_file) -> Dict[str, Dict[str, Any]]:
+        """读取结果文件（{站点}.txt）对应的测试指标，返回 {链接: 指标}，没有指标文件时返回空字典"""
+        metrics_file = os.path.splitext(str(results_file))[0] + ".json"
+        try:
+            with open(metrics_file, "r", encoding="utf-8") as f:
+                return json.load(f).get("proxies", {})
+        except (OSError, ValueError):
+            return {}
                 
     def backup_results(self) -> None:
         """备份现有结果"""
@@ -52,7 +86,26 @@ class FileOutput:
         
         # 复制文件
         for file in os.listdir(self.output_dir):
-            if file.endswith(".txt"):
+            if file.endswith((".txt", ".json")):
                 src = os.path.join(self.output_dir, file)
                 dst = os.path.join(backup_path, file)
-                shutil.copy2(src, dst)
\ No newline at end of file
+                shutil.copy2(src, dst)
+        
+        # 删除超出 max_backups 的旧备份（0表示不限制）
+        max_backups = self.config.get("output", {}).get("backup", {}).get("max_backups", 0)
+        if max_backups:
+            backups = sorted(
+                name for name in os.listdir(self.backup_dir)
+                if self._is_backup(name) and os.path.isdir(os.path.join(self.backup_dir, name))
+            )
+            for name in backups[:-max_backups]:
+                shutil.rmtree(os.path.join(self.backup_dir, name), ignore_errors=True)
+    
+    @staticmethod
+    def _is_backup(name: str) -> bool:
+        """是否为 backup_results 创建的备份目录（以时间戳命名）"""
+        try:
+            datetime.strptime(name, "%Y%m%d_%H%M%S")
+            return True
+        except ValueError:
+            return False
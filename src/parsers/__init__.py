@@ -3,5 +3,10 @@
 from .base_parser import BaseParser
 from .base64_parser import Base64Parser
 from .line_parser import LineParser
+from .config_parser import ConfigParser
+from .clash_parser import ClashParser
+from .singbox_parser import SingBoxParser
+from .content_sniffer import ContentFormat, ContentSniffer
+from .subscription_parser import SubscriptionParser
 
-__all__ = ['BaseParser', 'Base64Parser', 'LineParser']
+__all__ = ['BaseParser', 'Base64Parser', 'LineParser', 'ConfigParser', 'ClashParser', 'SingBoxParser', 'ContentFormat', 'ContentSniffer', 'SubscriptionParser']
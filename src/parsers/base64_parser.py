@@ -1,8 +1,35 @@
 import base64
-from typing import List
+import binascii
+from typing import AsyncIterable, AsyncIterator, List
 from .base_parser import BaseParser
 from .line_parser import LineParser
 
+# url-safe字符转换为标准字符
+_URLSAFE = bytes.maketrans(b"-_", b"+/")
+
+class Base64StreamDecoder:
+    """增量Base64解码器
+
+    每次只解码完整的4字符组，余下的字符留到下一块，数据块可以在任意位置切分。
+    """
+
+    def __init__(self):
+        self._rest = b""
+
+    def feed(self, data: bytes) -> bytes:
+        """解码一块数据（忽略空白字符）"""
+        data = self._rest + data.translate(_URLSAFE, b" \t\r\n\x0b\x0c")
+        end = len(data) - len(data) % 4
+        self._rest = data[end:]
+        return binascii.a2b_base64(data[:end]) if end else b""
+
+    def finish(self) -> bytes:
+        """补齐填充并解码剩余字符"""
+        rest, self._rest = self._rest, b""
+        if not rest:
+            return b""
+        return binascii.a2b_base64(rest + b"=" * (-len(rest) % 4))
+
 class Base64Parser(BaseParser):
     """Base64解析器 - 用于解析Base64编码的订阅内容"""
     
@@ -24,4 +51,23 @@ class Base64Parser(BaseParser):
             return self.line_parser.parse(decoded)
             
         except Exception as e:
-            raise ValueError(f"Invalid Base64 content: {str(e)}") 
\ No newline at end of file
+            raise ValueError(f"Invalid Base64 content: {str(e)}")
+
+    async def parse_stream(self, chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+        """流式解析Base64编码的内容，逐块解码并产出代理链接
+
+        按4字符边界增量解码，解码结果交给行解析器逐行解析，
+        内存中只保留当前数据块和未结束的一行。
+        """
+        decoder = Base64StreamDecoder()
+
+        async def decoded():
+            async for chunk in chunks:
+                yield decoder.feed(chunk)
+            yield decoder.finish()
+
+        try:
+            async for link in self.line_parser.parse_stream(decoded()):
+                yield link
+        except (binascii.Error, ValueError) as e:
+            raise ValueError(f"Invalid Base64 content: {str(e)}")
@@ -0,0 +1,177 @@
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, Tuple
+import yaml
+from .config_parser import ConfigParser
+from src.encoders.encoder import ProxyProtocol
+
+# libyaml可用时使用C实现的加载器，大配置的加载速度快很多
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+class ClashParser(ConfigParser):
+    """Clash配置解析器 - 将 proxies 列表中的代理直接转换为代理记录"""
+
+    def load(self, content: str) -> Iterable[Any]:
+        """加载YAML配置，返回 proxies 列表"""
+        try:
+            data = yaml.load(content, Loader=_Loader)
+        except yaml.YAMLError as e:
+            raise ValueError(f"Invalid Clash config: {str(e)}")
+        if isinstance(data, list):
+            return data
+        if not isinstance(data, dict):
+            raise ValueError("Invalid Clash config: no proxies")
+        return data.get("proxies") or []
+
+    async def iter_entries(self, chunks: AsyncIterable[bytes]) -> AsyncIterator[Any]:
+        """YAML不能增量加载，读取完整内容后一次性加载"""
+        content = bytearray()
+        async for chunk in chunks:
+            content += chunk
+        for entry in self.load(content.decode("utf-8", "ignore")):
+            yield entry
+
+    def converters(self) -> Dict[str, Any]:
+        return _CONVERTERS
+
+    @staticmethod
+    def _transport(entry: Dict[str, Any]) -> Dict[str, Any]:
+        """传输层设置（ws/h2/http/grpc）"""
+        network = entry.get("network") or "tcp"
+        host, path = "", ""
+        if network == "ws":
+            opts = entry.get("ws-opts") or {}
+            headers = opts.get("headers") or entry.get("ws-headers") or {}
+            host = headers.get("Host") or headers.get("host") or ""
+            path = opts.get("path") or entry.get("ws-path") or ""
+        elif network == "h2":
+            opts = entry.get("h2-opts") or {}
+            host = ClashParser._first(opts.get("host"))
+            path = opts.get("path") or ""
+        elif network == "http":
+            opts = entry.get("http-opts") or {}
+            headers = opts.get("headers") or {}
+            host = ClashParser._first(headers.get("Host") or headers.get("host"))
+            path = ClashParser._first(opts.get("path"))
+        elif network == "grpc":
+            opts = entry.get("grpc-opts") or {}
+            path = opts.get("grpc-service-name") or ""
+        return {"type": network, "host": str(host), "path": str(path)}
+
+    @staticmethod
+    def _tls(entry: Dict[str, Any], enabled: bool) -> Dict[str, Any]:
+        """TLS/REALITY设置"""
+        reality = entry.get("reality-opts") or {}
+        alpn = entry.get("alpn") or []
+        return {
+            "security": "reality" if reality else ("tls" if enabled else ""),
+            "sni": str(entry.get("servername") or entry.get("sni") or ""),
+            "alpn": [alpn] if isinstance(alpn, str) else list(alpn),
+            "publicKey": str(reality.get("public-key") or ""),
+            "shortId": str(reality.get("short-id") or ""),
+            "spiderX": "",
+        }
+
+    @staticmethod
+    def _convert_ss(entry: Dict[str, Any]) -> Tuple[ProxyProtocol, Dict[str, Any]]:
+        """Shadowsocks"""
+        return ProxyProtocol.SS, {
+            "name": entry.get("name"),
+            "server": entry["server"],
+            "port": entry["port"],
+            "method": entry["cipher"],
+            "password": str(entry["password"]),
+            "udp": True,
+            "plugin": entry.get("plugin") or "",
+            "plugin_opts": ClashParser._plugin_opts(entry.get("plugin-opts")),
+        }
+
+    @staticmethod
+    def _convert_ssr(entry: Dict[str, Any]) -> Tuple[ProxyProtocol, Dict[str, Any]]:
+        """ShadowsocksR"""
+        return ProxyProtocol.SSR, {
+            "name": entry.get("name"),
+            "server": entry["server"],
+            "port": entry["port"],
+            "method": entry["cipher"],
+            "password": str(entry["password"]),
+            "protocol": entry.get("protocol") or "origin",
+            "protocol_param": str(entry.get("protocol-param") or ""),
+            "obfs": entry.get("obfs") or "plain",
+            "obfs_param": str(entry.get("obfs-param") or ""),
+            "udp": True,
+        }
+
+    @staticmethod
+    def _convert_vmess(entry: Dict[str, Any]) -> Tuple[ProxyProtocol, Dict[str, Any]]:
+        """VMess"""
+        fields = {
+            "name": entry.get("name"),
+            "server": entry["server"],
+            "port": entry["port"],
+            "id": entry["uuid"],
+            "aid": int(entry.get("alterId") or 0),
+            "encryption": entry.get("cipher") or "auto",
+            "flow": "",
+            "fingerprint": entry.get("client-fingerprint") or "",
+        }
+        fields.update(ClashParser._transport(entry))
+        fields.update(ClashParser._tls(entry, bool(entry.get("tls"))))
+        return ProxyProtocol.VMESS, fields
+
+    @staticmethod
+    def _convert_vless(entry: Dict[str, Any]) -> Tuple[ProxyProtocol, Dict[str, Any]]:
+        """VLESS"""
+        fields = {
+            "name": entry.get("name"),
+            "server": entry["server"],
+            "port": entry["port"],
+            "id": entry["uuid"],
+            "flow": entry.get("flow") or "",
+            "encryption": "none",
+            "fp": entry.get("client-fingerprint") or "",
+            "headerType": "",
+        }
+        fields.update(ClashParser._transport(entry))
+        fields.update(ClashParser._tls(entry, bool(entry.get("tls"))))
+        return ProxyProtocol.VLESS, fields
+
+    @staticmethod
+    def _convert_trojan(entry: Dict[str, Any]) -> Tuple[ProxyProtocol, Dict[str, Any]]:
+        """Trojan（Clash中的Trojan总是使用TLS）"""
+        skip_verify = bool(entry.get("skip-cert-verify"))
+        fields = {
+            "name": entry.get("name"),
+            "server": entry["server"],
+            "port": entry["port"],
+            "password": str(entry["password"]),
+            "allowInsecure": "1" if skip_verify else "0",
+            "fingerprint": entry.get("client-fingerprint") or "",
+            "skipVerify": skip_verify,
+            "udp": True,
+        }
+        fields.update(ClashParser._transport(entry))
+        tls = ClashParser._tls(entry, True)
+        fields.update(security=tls["security"], sni=tls["sni"], alpn=tls["alpn"])
+        return ProxyProtocol.TROJAN, fields
+
+    @staticmethod
+    def _convert_ssh(entry: Dict[str, Any]) -> Tuple[ProxyProtocol, Dict[str, Any]]:
+        """SSH"""
+        return ProxyProtocol.SSH, {
+            "name": entry.get("name"),
+            "server": entry["server"],
+            "port": entry.get("port") or 22,
+            "username": entry.get("username") or "",
+            "password": str(entry.get("password") or ""),
+            "private_key": entry.get("private-key") or "",
+            "key_password": entry.get("private-key-passphrase") or "",
+            "ssh_options": {},
+        }
+
+_CONVERTERS: Dict[str, Any] = {
+    "ss": ClashParser._convert_ss,
+    "ssr": ClashParser._convert_ssr,
+    "vmess": ClashParser._convert_vmess,
+    "vless": ClashParser._convert_vless,
+    "trojan": ClashParser._convert_trojan,
+    "ssh": ClashParser._convert_ssh,
+}
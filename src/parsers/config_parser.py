@@ -0,0 +1,89 @@
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, List, Mapping, Optional
+from .base_parser import BaseParser
+from src.encoders.encoder import ProxyProtocol
+from src.models.proxy_record import ProxyRecord
+
+class ConfigParser(BaseParser):
+    """客户端配置解析器基类 - 用于Clash、sing-box等以结构化数据描述代理的订阅
+
+    配置中的每个代理条目直接转换为与 ProxyEncoder 编码结果字段相同的
+    ProxyRecord（没有原始链接），不经过中间的链接字符串。
+    """
+
+    def parse(self, content: str) -> List[ProxyRecord]:
+        """解析配置内容为代理记录列表"""
+        return self.parse_entries(self.load(content))
+
+    async def parse_stream(self, chunks: AsyncIterable[bytes]) -> AsyncIterator[ProxyRecord]:
+        """流式解析配置内容，逐个产出代理记录"""
+        async for entry in self.iter_entries(chunks):
+            record = self.parse_entry(entry)
+            if record is not None:
+                yield record
+
+    def parse_entries(self, entries: Iterable[Any]) -> List[ProxyRecord]:
+        """转换代理条目（忽略不支持的条目）"""
+        records = []
+        for entry in entries:
+            record = self.parse_entry(entry)
+            if record is not None:
+                records.append(record)
+        return records
+
+    def parse_entry(self, entry: Any) -> Optional[ProxyRecord]:
+        """转换单个代理条目，不支持或格式错误时返回None"""
+        if not isinstance(entry, dict):
+            return None
+        converter = self.converters().get(entry.get("type"))
+        if converter is None:
+            return None
+        try:
+            protocol, fields = converter(entry)
+            return self._record(protocol, fields)
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def load(self, content: str) -> Iterable[Any]:
+        """加载配置，返回代理条目"""
+        raise NotImplementedError
+
+    async def iter_entries(self, chunks: AsyncIterable[bytes]) -> AsyncIterator[Any]:
+        """从数据流中逐个产出代理条目"""
+        raise NotImplementedError
+        yield
+
+    def converters(self) -> Dict[str, Any]:
+        """条目类型 -> 转换函数（返回 (协议, 字段)）"""
+        raise NotImplementedError
+
+    @staticmethod
+    def _record(protocol: ProxyProtocol, fields: Dict[str, Any]) -> ProxyRecord:
+        """创建代理记录（补齐与编码结果相同的通用字段）"""
+        record = ProxyRecord(fields)
+        record.proxy_protocol = protocol
+        if "name" not in record or record.name is None:
+            record.name = ""
+        record.name = str(record.name)
+        record.server = str(record.server).strip("[]")
+        record.port = str(record.port) if protocol == ProxyProtocol.SSH else int(record.port)
+        return record
+
+    @staticmethod
+    def _plugin_opts(opts: Any) -> str:
+        """插件参数转换为SIP003格式（key=value;flag）"""
+        if not isinstance(opts, Mapping):
+            return str(opts or "")
+        parts = []
+        for key, value in opts.items():
+            if value is True:
+                parts.append(str(key))
+            elif value not in (None, False, ""):
+                parts.append(f"{key}={value}")
+        return ";".join(parts)
+
+    @staticmethod
+    def _first(value: Any, default: str = "") -> str:
+        """取列表的第一个值"""
+        if isinstance(value, (list, tuple)):
+            return str(value[0]) if value else default
+        return str(value) if value is not None else default
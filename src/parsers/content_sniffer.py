@@ -0,0 +1,47 @@
+import re
+from enum import Enum
+
+class ContentFormat(str, Enum):
+    """订阅内容格式"""
+    BASE64 = "base64"  # Base64编码的链接列表
+    LINES = "lines"    # 按行分隔的链接列表
+    CLASH = "clash"    # Clash YAML配置
+    JSON = "json"      # JSON配置（如sing-box）
+
+class ContentSniffer:
+    """订阅内容格式识别 - 只检查内容开头的一小段，不做完整解码"""
+
+    # 识别格式时检查的字符数
+    PREFIX_SIZE = 1024
+
+    # Base64字符（含url-safe字符和填充）占非空白字符的最低比例
+    BASE64_RATIO = 0.98
+
+    # Clash配置的顶层键
+    CLASH_MARKERS = re.compile(
+        r"^(proxies|proxy-groups|proxy-providers|rules|port|socks-port|mixed-port|allow-lan|mode|log-level)\s*:",
+        re.MULTILINE
+    )
+
+    _BASE64_CHARS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/=-_")
+    _WHITESPACE = re.compile(r"\s+")
+
+    @staticmethod
+    def sniff(prefix: str) -> ContentFormat:
+        """根据内容开头判断格式"""
+        text = prefix[:ContentSniffer.PREFIX_SIZE].lstrip("\ufeff \t\r\n")
+        if not text:
+            return ContentFormat.LINES
+
+        if text[0] in "{[":
+            return ContentFormat.JSON
+        if ContentSniffer.CLASH_MARKERS.search(text):
+            return ContentFormat.CLASH
+        if "://" in text:
+            return ContentFormat.LINES
+
+        compact = ContentSniffer._WHITESPACE.sub("", text)
+        valid = sum(1 for char in compact if char in ContentSniffer._BASE64_CHARS)
+        if valid >= len(compact) * ContentSniffer.BASE64_RATIO:
+            return ContentFormat.BASE64
+        return ContentFormat.LINES
@@ -1,6 +1,10 @@
-from typing import List
+import codecs
+from typing import AsyncIterable, AsyncIterator, List, Optional
 from .base_parser import BaseParser
 
+# str.splitlines 识别的换行符
+_LINE_BREAKS = "\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+
 class LineParser(BaseParser):
     """行解析器 - 用于解析按行分隔的订阅内容"""
     
@@ -9,35 +13,67 @@ class LineParser(BaseParser):
         try:
             lines = []
             for line in content.splitlines():
-                line = line.strip()
-                
-                # 1. 跳过空行和纯注释行
-                if not line or line.startswith('#'):
-                    continue
-                
-                # 2. 如果有空格，在第一个空格处截断
-                if ' ' in line:
-                    line = line.split(None, 1)[0]
-                
-                # 3. 如果没有空格但有多个#，只保留到第二个#之前的部分
-                elif line.count('#') > 1:
-                    protocol_part = line.split('://', 1)
-                    if len(protocol_part) == 2:
-                        protocol, rest = protocol_part
-                        # 找到第二个#的位置
-                        first_hash = rest.find('#')
-                        if first_hash != -1:
-                            second_hash = rest.find('#', first_hash + 1)
-                            if second_hash != -1:
-                                line = f"{protocol}://{rest[:second_hash]}"
-                
-                # 4. 验证是否是有效的代理链接
-                if "://" not in line:
-                    continue
-                
-                lines.append(line)
+                line = self.parse_line(line)
+                if line:
+                    lines.append(line)
                     
             return lines
             
         except Exception as e:
-            raise ValueError(f"Invalid content format: {str(e)}")
\ No newline at end of file
+            raise ValueError(f"Invalid content format: {str(e)}")
+
+    async def parse_stream(self, chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+        """流式解析按行分隔的内容（UTF-8），逐行产出代理链接
+
+        数据块可以在任意位置切分，跨块的行和多字节字符会拼接完整。
+        """
+        text_decoder = codecs.getincrementaldecoder("utf-8")()
+        pending = ""
+        try:
+            async for chunk in chunks:
+                lines = (pending + text_decoder.decode(chunk)).splitlines(True)
+                # 最后一行可能还没有结束
+                pending = lines.pop() if lines and lines[-1][-1] not in _LINE_BREAKS else ""
+                for line in lines:
+                    line = self.parse_line(line)
+                    if line:
+                        yield line
+            pending += text_decoder.decode(b"", final=True)
+        except UnicodeDecodeError as e:
+            raise ValueError(f"Invalid content format: {str(e)}")
+
+        for line in pending.splitlines():
+            line = self.parse_line(line)
+            if line:
+                yield line
+
+    @staticmethod
+    def parse_line(line: str) -> Optional[str]:
+        """解析一行内容，返回代理链接（不是代理链接时返回None）"""
+        line = line.strip()
+        
+        # 1. 跳过空行和纯注释行
+        if not line or line.startswith('#'):
+            return None
+        
+        # 2. 如果有空格，在第一个空格处截断
+        if ' ' in line:
+            line = line.split(None, 1)[0]
+        
+        # 3. 如果没有空格但有多个#，只保留到第二个#之前的部分
+        elif line.count('#') > 1:
+            protocol_part = line.split('://', 1)
+            if len(protocol_part) == 2:
+                protocol, rest = protocol_part
+                # 找到第二个#的位置
+                first_hash = rest.find('#')
+                if first_hash != -1:
+                    second_hash = rest.find('#', first_hash + 1)
+                    if second_hash != -1:
+                        line = f"{protocol}://{rest[:second_hash]}"
+        
+        # 4. 验证是否是有效的代理链接
+        if "://" not in line:
+            return None
+        
+        return line
@@ -0,0 +1,249 @@
+import codecs
+import json
+import re
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, List, Tuple
+from .config_parser import ConfigParser
+from src.encoders.encoder import ProxyProtocol
+
+_OUTBOUNDS_START = re.compile(r'"outbounds"\s*:\s*\[')
+_SEPARATORS = " \t\r\n,"
+
+class OutboundScanner:
+    """增量JSON扫描器 - 从分块到达的文本中逐个取出 outbounds 数组（或顶层数组）的元素
+
+    只有当前未完成的元素保留在缓冲区中，不需要加载完整的配置。
+    """
+
+    # 查找数组开头时保留的尾部长度（键名可能跨越两个数据块）
+    TAIL_SIZE = 64
+
+    def __init__(self):
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.state = "start"  # start -> items -> done
+
+    def feed(self, text: str) -> List[Any]:
+        """追加文本，返回已完整的元素"""
+        if self.state == "done":
+            return []
+        self.buffer += text
+        if self.state == "start" and not self._find_array():
+            return []
+
+        items = []
+        buffer, pos = self.buffer, 0
+        while True:
+            while pos < len(buffer) and buffer[pos] in _SEPARATORS:
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if buffer[pos] == "]":
+                self.state = "done"
+                break
+            try:
+                item, pos = self.decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # 元素还不完整，等待更多数据
+                break
+            items.append(item)
+        self.buffer = "" if self.state == "done" else buffer[pos:]
+        return items
+
+    def close(self) -> None:
+        """结束扫描，数组未结束时抛出异常"""
+        if self.state == "items":
+            raise ValueError("Invalid JSON config: unterminated outbounds")
+
+    def _find_array(self) -> bool:
+        """定位数组开头"""
+        stripped = self.buffer.lstrip("\ufeff \t\r\n")
+        if not stripped:
+            return False
+        if stripped[0] == "[":
+            self.buffer = stripped[1:]
+        else:
+            match = _OUTBOUNDS_START.search(self.buffer)
+            if not match:
+                self.buffer = self.buffer[-self.TAIL_SIZE:]
+                return False
+            self.buffer = self.buffer[match.end():]
+        self.state = "items"
+        return True
+
+class SingBoxParser(ConfigParser):
+    """sing-box配置解析器 - 将 outbounds 中的代理直接转换为代理记录"""
+
+    def load(self, content: str) -> Iterable[Any]:
+        """加载JSON配置，返回 outbounds 列表"""
+        try:
+            data = json.loads(content)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON config: {str(e)}")
+        if isinstance(data, list):
+            return data
+        if not isinstance(data, dict):
+            raise ValueError("Invalid JSON config: no outbounds")
+        return data.get("outbounds") or []
+
+    async def iter_entries(self, chunks: AsyncIterable[bytes]) -> AsyncIterator[Any]:
+        """增量解析 outbounds，每个元素完整后立即产出"""
+        scanner = OutboundScanner()
+        text_decoder = codecs.getincrementaldecoder("utf-8")("ignore")
+        async for chunk in chunks:
+            for entry in scanner.feed(text_decoder.decode(chunk)):
+                yield entry
+        for entry in scanner.feed(text_decoder.decode(b"", final=True)):
+            yield entry
+        scanner.close()
+
+    def converters(self) -> Dict[str, Any]:
+        return _CONVERTERS
+
+    @staticmethod
+    def _transport(entry: Dict[str, Any]) -> Dict[str, Any]:
+        """传输层设置（ws/http/grpc/httpupgrade）"""
+        transport = entry.get("transport") or {}
+        network = transport.get("type") or "tcp"
+        host, path = "", ""
+        if network == "ws":
+            headers = transport.get("headers") or {}
+            host = headers.get("Host") or headers.get("host") or ""
+            path = transport.get("path") or ""
+        elif network == "http":
+            network = "h2"
+            host = SingBoxParser._first(transport.get("host"))
+            path = transport.get("path") or ""
+        elif network == "grpc":
+            path = transport.get("service_name") or ""
+        elif network == "httpupgrade":
+            host = transport.get("host") or ""
+            path = transport.get("path") or ""
+        return {"type": network, "host": str(host), "path": str(path)}
+
+    @staticmethod
+    def _tls(entry: Dict[str, Any]) -> Dict[str, Any]:
+        """TLS/REALITY设置"""
+        tls = entry.get("tls") or {}
+        enabled = bool(tls.get("enabled"))
+        reality = (tls.get("reality") or {}) if enabled else {}
+        alpn = tls.get("alpn") or []
+        return {
+            "security": "reality" if reality.get("enabled") else ("tls" if enabled else ""),
+            "sni": str(tls.get("server_name") or ""),
+            "alpn": [alpn] if isinstance(alpn, str) else list(alpn),
+            "insecure": bool(tls.get("insecure")),
+            "fingerprint": str((tls.get("utls") or {}).get("fingerprint") or ""),
+            "publicKey": str(reality.get("public_key") or ""),
+            "shortId": str(reality.get("short_id") or ""),
+            "spiderX": "",
+        }
+
+    @staticmethod
+    def _convert_ss(entry: Dict[str, Any]) -> Tuple[ProxyProtocol, Dict[str, Any]]:
+        """Shadowsocks"""
+        return ProxyProtocol.SS, {
+            "name": entry.get("tag"),
+            "server": entry["server"],
+            "port": entry["server_port"],
+            "method": entry["method"],
+            "password": str(entry["password"]),
+            "udp": True,
+            "plugin": entry.get("plugin") or "",
+            "plugin_opts": entry.get("plugin_opts") or "",
+        }
+
+    @staticmethod
+    def _convert_ssr(entry: Dict[str, Any]) -> Tuple[ProxyProtocol, Dict[str, Any]]:
+        """ShadowsocksR（旧版sing-box）"""
+        return ProxyProtocol.SSR, {
+            "name": entry.get("tag"),
+            "server": entry["server"],
+            "port": entry["server_port"],
+            "method": entry["method"],
+            "password": str(entry["password"]),
+            "protocol": entry.get("protocol") or "origin",
+            "protocol_param": entry.get("protocol_param") or "",
+            "obfs": entry.get("obfs") or "plain",
+            "obfs_param": entry.get("obfs_param") or "",
+            "udp": True,
+        }
+
+    @staticmethod
+    def _convert_vmess(entry: Dict[str, Any]) -> Tuple[ProxyProtocol, Dict[str, Any]]:
+        """VMess"""
+        tls = SingBoxParser._tls(entry)
+        fields = {
+            "name": entry.get("tag"),
+            "server": entry["server"],
+            "port": entry["server_port"],
+            "id": entry["uuid"],
+            "aid": int(entry.get("alter_id") or 0),
+            "encryption": entry.get("security") or "auto",
+            "flow": "",
+        }
+        fields.update(SingBoxParser._transport(entry))
+        fields.update((key, tls[key]) for key in
+                      ("security", "sni", "alpn", "fingerprint", "publicKey", "shortId", "spiderX"))
+        return ProxyProtocol.VMESS, fields
+
+    @staticmethod
+    def _convert_vless(entry: Dict[str, Any]) -> Tuple[ProxyProtocol, Dict[str, Any]]:
+        """VLESS"""
+        tls = SingBoxParser._tls(entry)
+        fields = {
+            "name": entry.get("tag"),
+            "server": entry["server"],
+            "port": entry["server_port"],
+            "id": entry["uuid"],
+            "flow": entry.get("flow") or "",
+            "encryption": "none",
+            "fp": tls["fingerprint"],
+            "headerType": "",
+        }
+        fields.update(SingBoxParser._transport(entry))
+        fields.update((key, tls[key]) for key in
+                      ("security", "sni", "alpn", "publicKey", "shortId", "spiderX"))
+        return ProxyProtocol.VLESS, fields
+
+    @staticmethod
+    def _convert_trojan(entry: Dict[str, Any]) -> Tuple[ProxyProtocol, Dict[str, Any]]:
+        """Trojan"""
+        tls = SingBoxParser._tls(entry)
+        fields = {
+            "name": entry.get("tag"),
+            "server": entry["server"],
+            "port": entry["server_port"],
+            "password": str(entry["password"]),
+            "security": tls["security"],
+            "sni": tls["sni"],
+            "allowInsecure": "1" if tls["insecure"] else "0",
+            "alpn": tls["alpn"],
+            "fingerprint": tls["fingerprint"],
+            "skipVerify": tls["insecure"],
+            "udp": True,
+        }
+        fields.update(SingBoxParser._transport(entry))
+        return ProxyProtocol.TROJAN, fields
+
+    @staticmethod
+    def _convert_ssh(entry: Dict[str, Any]) -> Tuple[ProxyProtocol, Dict[str, Any]]:
+        """SSH"""
+        return ProxyProtocol.SSH, {
+            "name": entry.get("tag"),
+            "server": entry["server"],
+            "port": entry.get("server_port") or 22,
+            "username": entry.get("user") or "",
+            "password": str(entry.get("password") or ""),
+            "private_key": entry.get("private_key") or "",
+            "key_password": entry.get("private_key_passphrase") or "",
+            "ssh_options": {},
+        }
+
+_CONVERTERS: Dict[str, Any] = {
+    "shadowsocks": SingBoxParser._convert_ss,
+    "shadowsocksr": SingBoxParser._convert_ssr,
+    "vmess": SingBoxParser._convert_vmess,
+    "vless": SingBoxParser._convert_vless,
+    "trojan": SingBoxParser._convert_trojan,
+    "ssh": SingBoxParser._convert_ssh,
+}
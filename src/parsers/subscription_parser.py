@@ -0,0 +1,55 @@
+from typing import AsyncIterable, AsyncIterator, Dict, List, Union
+from .base_parser import BaseParser
+from .base64_parser import Base64Parser
+from .clash_parser import ClashParser
+from .content_sniffer import ContentFormat, ContentSniffer
+from .line_parser import LineParser
+from .singbox_parser import SingBoxParser
+from src.models.proxy_record import ProxyRecord
+
+class SubscriptionParser(BaseParser):
+    """订阅解析器 - 识别订阅内容的格式后交给对应的解析器
+
+    格式由 ContentSniffer 根据内容开头判断，不需要先尝试Base64解码再回退。
+    链接列表解析为代理链接；Clash/sing-box配置直接解析为代理记录（ProxyRecord）。
+    """
+
+    def __init__(self):
+        line_parser = LineParser()
+        self.parsers: Dict[ContentFormat, BaseParser] = {
+            ContentFormat.BASE64: Base64Parser(),
+            ContentFormat.LINES: line_parser,
+            ContentFormat.CLASH: ClashParser(),
+            ContentFormat.JSON: SingBoxParser(),
+        }
+        self.default_parser = line_parser
+
+    def parser_for(self, content_format: ContentFormat) -> BaseParser:
+        """获取格式对应的解析器"""
+        return self.parsers.get(content_format, self.default_parser)
+
+    def parse(self, content: str) -> List[Union[str, ProxyRecord]]:
+        """解析订阅内容为代理链接（或代理记录）列表"""
+        if content is None:
+            raise ValueError("Invalid content format: None")
+        return self.parser_for(ContentSniffer.sniff(content)).parse(content)
+
+    async def parse_stream(self, chunks: AsyncIterable[bytes]) -> AsyncIterator[Union[str, ProxyRecord]]:
+        """流式解析订阅内容：读取开头的内容判断格式后，逐块交给对应的解析器"""
+        iterator = chunks.__aiter__()
+        head = b""
+        # 数据块可能很小，积累足够的内容后再判断格式
+        async for chunk in iterator:
+            head += chunk
+            if len(head) >= ContentSniffer.PREFIX_SIZE:
+                break
+
+        content_format = ContentSniffer.sniff(head.decode("utf-8", "ignore"))
+
+        async def replay():
+            yield head
+            async for chunk in iterator:
+                yield chunk
+
+        async for link in self.parser_for(content_format).parse_stream(replay()):
+            yield link
@@ -2,7 +2,8 @@ import socket
 import asyncio
 from abc import ABC, abstractmethod
 from typing import List, Optional, Dict, Any
-import aiohttp
+from .http_probe import HttpProbe
+from .test_result import TestResult
 
 class BaseTester(ABC):
     """代理测试器的基类"""
@@ -33,6 +34,11 @@ class BaseTester(ABC):
         """
         self.logger = logger
         self.__class__._logger = logger  # 设置类级别的logger
+        self._http_probe: Optional[HttpProbe] = None
+        
+        # 吞吐量采样（站点检查成功后通过同一个代理端口下载一段数据，未设置URL时不采样）
+        self.throughput_url: Optional[str] = None
+        self.throughput_bytes = 512 * 1024
         
         # 获取配置
         self.config = config or {}
@@ -51,6 +57,9 @@ class BaseTester(ABC):
             self.concurrent_tests = tester_config.get('concurrent_tests', self.concurrent_tests)
             self.connect_timeout = tester_config.get('connect_timeout', self.connect_timeout)
             self.retry_times = tester_config.get('retry_times', self.retry_times)
+        
+        # 代理核心（glider/xray）启动等待的最长时间
+        self.startup_timeout = tester_config.get('startup_timeout', testers_config.get('startup_timeout', 5))
     
     @classmethod
     @abstractmethod
@@ -66,6 +75,64 @@ class BaseTester(ABC):
             port = s.getsockname()[1]
         return port
     
+    async def _wait_for_port(self, port: int, process: Optional[asyncio.subprocess.Process] = None,
+                             timeout: Optional[float] = None, initial_delay: float = 0.02,
+                             max_delay: float = 0.5) -> bool:
+        """等待本地端口开始监听
+        
+        以指数退避轮询 127.0.0.1:port，直到端口可连接或超时；
+        如果进程提前退出，读取其stderr并立即返回失败。
+        
+        Args:
+            port: 本地监听端口
+            process: 启动的代理核心进程（可选）
+            timeout: 最长等待时间（秒），默认为 startup_timeout
+            initial_delay: 首次轮询间隔（秒）
+            max_delay: 最大轮询间隔（秒）
+            
+        Returns:
+            bool: 端口是否已就绪
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (self.startup_timeout if timeout is None else timeout)
+        delay = initial_delay
+        
+        while True:
+            # 进程提前退出
+            if process is not None and process.returncode is not None:
+                if self.logger:
+                    stderr = b""
+                    if process.stderr:
+                        try:
+                            stderr = await asyncio.wait_for(process.stderr.read(4096), timeout=1)
+                        except Exception:
+                            pass
+                    self.logger.debug(
+                        f"Process exited early with code {process.returncode}: "
+                        f"{stderr.decode(errors='ignore').strip()}"
+                    )
+                return False
+            
+            try:
+                _, writer = await asyncio.wait_for(
+                    asyncio.open_connection('127.0.0.1', port),
+                    timeout=max_delay
+                )
+                writer.close()
+                await writer.wait_closed()
+                return True
+            except (OSError, asyncio.TimeoutError):
+                pass
+            
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                if self.logger:
+                    self.logger.debug(f"Port {port} not ready after {self.startup_timeout if timeout is None else timeout}s")
+                return False
+            
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * 2, max_delay)
+    
     async def _test_socks5(self, port: int, target_host: str) -> bool:
         """通过SOCKS5协议测试连接"""
         try:
@@ -110,6 +177,74 @@ class BaseTester(ABC):
         """
         pass
 
+    async def test_sites(self, proxy_info: Dict[str, Any], target_hosts: Dict[str, Dict[str, Any]]) -> List[str]:
+        """测试代理对所有目标站点的可用性
+        
+        Args:
+            proxy_info: 代理元信息字典
+            target_hosts: {站点名: 站点配置}，站点配置包含 check_url
+            
+        Returns:
+            List[str]: 可访问的站点名列表
+        """
+        results = await self.measure_sites(proxy_info, target_hosts)
+        return [site for site, result in results.items() if result.success]
+    
+    async def measure_sites(self, proxy_info: Dict[str, Any],
+                            target_hosts: Dict[str, Dict[str, Any]]) -> Dict[str, TestResult]:
+        """测试代理对所有目标站点的可用性和延迟
+        
+        默认对每个站点并发调用 test（只有成功与否）；启动代理核心的测试器会覆盖此方法，
+        只启动一个核心并通过它并发检查所有站点，记录各项时间。
+        
+        Returns:
+            Dict[str, TestResult]: {站点名: 测试结果}，代理核心启动失败时为空
+        """
+        results = await asyncio.gather(*(
+            self.test(proxy_info, site_config) for site_config in target_hosts.values()
+        ))
+        return {site: TestResult(bool(success)) for site, success in zip(target_hosts, results)}
+    
+    async def measure_batch(self, proxies: List[Dict[str, Any]], target_host: Dict[str, Any]) -> List[TestResult]:
+        """批量测试代理对一个站点的可用性和延迟
+        
+        默认对每个代理并发调用 measure_sites；支持批量模式的测试器会覆盖此方法，
+        用一个代理核心进程同时测试所有代理。
+        
+        Returns:
+            List[TestResult]: 与 proxies 顺序对应的测试结果
+        """
+        results = await asyncio.gather(*(
+            self.measure_sites(proxy_info, {"target": target_host}) for proxy_info in proxies
+        ))
+        return [result.get("target", TestResult(False)) for result in results]
+    
+    async def test_batch(self, proxies: List[Dict[str, Any]], target_host: Dict[str, Any]) -> List[bool]:
+        """批量测试代理对一个站点的可用性
+        
+        Returns:
+            List[bool]: 与 proxies 顺序对应的测试结果
+        """
+        return [result.success for result in await self.measure_batch(proxies, target_host)]
+    
+    async def _check_sites(self, port: int, target_hosts: Dict[str, Dict[str, Any]]) -> Dict[str, TestResult]:
+        """通过同一个本地代理端口并发检查所有站点，返回各站点的测试结果
+        
+        至少一个站点可访问且配置了吞吐量采样时，再通过该端口采样一次吞吐量，记入所有成功的结果。
+        """
+        results = await asyncio.gather(*(
+            self._measure_connection(site_config["check_url"], port) for site_config in target_hosts.values()
+        ))
+        results = dict(zip(target_hosts, results))
+        if any(results.values()):
+            throughput = await self._sample_throughput(port)
+            if throughput is not None:
+                results = {
+                    site: result._replace(throughput=throughput) if result else result
+                    for site, result in results.items()
+                }
+        return results
+    
     async def _test_connection(self, url: str, port: int) -> bool:
         """测试代理连接
         
@@ -120,40 +255,48 @@ class BaseTester(ABC):
         Returns:
             bool: 连接是否成功
         """
-        try:
-            # 使用curl命令测试连接
-            process = await asyncio.create_subprocess_exec(
-                "curl",
-                url,
-                "--proxy", f"http://127.0.0.1:{port}",
-                "-k",  # 忽略SSL证书验证
-                "-s",  # 静默模式
-                "-o", "/dev/null",  # 不输出内容
-                "-w", "%{http_code}",  # 只输出状态码
-                "--connect-timeout", "10",  # 连接超时
-                "--max-time", "15",  # 总超时
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            # 等待结果
-            stdout, stderr = await process.communicate()
-            
-            # 检查状态码
-            if process.returncode == 0:
-                status_code = int(stdout.decode().strip())
-                return 200 <= status_code < 400
-                
-            if self.logger:
-                self.logger.debug(f"Curl failed with return code {process.returncode}")
-                if stderr:
-                    self.logger.debug(f"Curl error: {stderr.decode()}")
-            return False
+        return (await self._measure_connection(url, port)).success
+    
+    async def _measure_connection(self, url: str, port: int) -> TestResult:
+        """测试代理连接并记录各项时间（状态码为2xx/3xx时成功）"""
+        return TestResult.from_probe(await self._check_url(url, port))
+    
+    async def _sample_throughput(self, port: int) -> Optional[float]:
+        """通过本地代理端口下载一段数据，返回吞吐量（字节/秒），未配置或失败时返回None"""
+        if not self.throughput_url:
+            return None
+        result = await self._check_url(self.throughput_url, port, sample_bytes=self.throughput_bytes)
+        if result is None or not 200 <= result["status"] < 300:
+            return None
+        return result["throughput"]
+    
+    def set_throughput_sample(self, url: Optional[str], max_bytes: int = 512 * 1024) -> None:
+        """设置吞吐量采样的下载地址和最多读取的字节数"""
+        self.throughput_url = url or None
+        self.throughput_bytes = max_bytes
+    
+    async def _check_url(self, url: str, port: int, sample_bytes: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """通过本地HTTP代理端口请求目标URL
+        
+        Args:
+            url: 目标URL
+            port: 本地代理端口
+            sample_bytes: 采样吞吐量时读取的响应体字节数（None表示不采样）
             
-        except Exception as e:
-            if self.logger:
-                self.logger.debug(f"Connection test failed: {str(e)}")
-            return False
+        Returns:
+            Optional[Dict]: HttpProbe.probe 的结果（状态码和各项时间），失败时返回None
+        """
+        if self._http_probe is None:
+            self._http_probe = HttpProbe(
+                connect_timeout=10,  # 连接超时
+                total_timeout=15,    # 总超时
+                logger=self.logger
+            )
+        return await self._http_probe.probe(url, port, sample_bytes=sample_bytes)
+    
+    async def close(self) -> None:
+        """释放测试器持有的资源"""
+        pass
     
     def is_enabled(self) -> bool:
         """检查测试器是否启用"""
@@ -0,0 +1,75 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+class BatchDispatcher:
+    """批量测试调度器
+
+    将逐个代理的测试请求按目标站点聚合成批次，交给测试器的 test_batch/measure_batch 执行。
+    批次达到 batch_size 或等待超过 linger 秒后立即提交。
+    """
+
+    def __init__(self, batch_fn: Callable[[List[Dict[str, Any]], Dict[str, Any]], Awaitable[List[Any]]],
+                 batch_size: int = 32, linger: float = 0.5, logger=None, failure: Any = False):
+        """
+        Args:
+            batch_fn: 批量测试函数，签名为 (proxies, target_host) -> List[结果]
+            batch_size: 每个批次的最大代理数
+            linger: 批次未满时的最长等待时间（秒）
+            logger: 日志记录器
+            failure: 批量测试失败或没有返回结果时的结果
+        """
+        self.batch_fn = batch_fn
+        self.batch_size = batch_size
+        self.linger = linger
+        self.logger = logger
+        self.failure = failure
+
+        self._pending: Dict[str, List[Tuple[Dict[str, Any], asyncio.Future]]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._tasks = set()
+
+    async def submit(self, proxy_info: Dict[str, Any], target_host: Dict[str, Any]) -> Any:
+        """提交一个测试请求，等待所在批次完成后返回结果"""
+        loop = asyncio.get_running_loop()
+        key = target_host['check_url']
+        future = loop.create_future()
+
+        pending = self._pending.setdefault(key, [])
+        pending.append((proxy_info, future))
+
+        if len(pending) >= self.batch_size:
+            self._flush(key, target_host)
+        elif key not in self._timers:
+            self._timers[key] = loop.call_later(self.linger, self._flush, key, target_host)
+
+        return await future
+
+    def _flush(self, key: str, target_host: Dict[str, Any]) -> None:
+        """提交当前批次"""
+        timer = self._timers.pop(key, None)
+        if timer:
+            timer.cancel()
+
+        batch = self._pending.pop(key, [])
+        if not batch:
+            return
+
+        task = asyncio.ensure_future(self._run(batch, target_host))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]], target_host: Dict[str, Any]) -> None:
+        """执行批量测试并分发结果"""
+        try:
+            results = await self.batch_fn([proxy_info for proxy_info, _ in batch], target_host)
+        except Exception as e:
+            if self.logger:
+                self.logger.debug(f"Batch test failed: {str(e)}")
+            results = [self.failure] * len(batch)
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+        for _, future in batch[len(results):]:
+            if not future.done():
+                future.set_result(self.failure)
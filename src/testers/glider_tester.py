@@ -1,22 +1,42 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
 import asyncio
 import tempfile
+import time
 import os
+import re
 from .base_tester import BaseTester
+from .test_result import TestResult
 from src.decoders.glider_decoder import GliderDecoder
 
+# glider健康检查日志，例如：
+# [check] default: 1.2.3.4:443(0), SUCCESS. Elapsed: 120ms, Latency: 120ms.
+CHECK_LOG_PATTERN = re.compile(r"\[check\] .*?: (\S+)\(-?\d+\), (SUCCESS|FAILED)(?:\. Elapsed: (\d+)ms)?")
+
+# 批量检查的期望响应：glider把 expect 当作正则匹配响应首行，默认只要求包含"HTTP"，
+# 这里与单个测试（HttpProbe）一致，只接受2xx/3xx状态码（%20为状态码前的空格）
+BATCH_CHECK_EXPECT = "expect=%20[23][0-9][0-9]"
+
 class GliderTester(BaseTester):
     """Glider测试器"""
     
     def __init__(self, logger=None, config: Dict = None):
         super().__init__(logger)
         self.config = config or {}
+        self.glider_path = self.config.get('glider_path', 'glider')
+        self.startup_timeout = self.config.get('startup_timeout', self.startup_timeout)
         
     def get_tester_name(self) -> str:
         return "Glider"
         
     async def test(self, proxy_info: Dict[str, Any], target_host: Optional[str] = None) -> bool:
         """使用Glider测试代理"""
+        return bool(await self.test_sites(proxy_info, {"target": target_host}))
+        
+    async def measure_sites(self, proxy_info: Dict[str, Any],
+                            target_hosts: Dict[str, Dict[str, Any]]) -> Dict[str, TestResult]:
+        """启动一个Glider进程，通过它并发测试所有目标站点"""
+        config_path = None
+        process = None
         try:
             # 转换为glider链接
             glider_link = GliderDecoder.decode(proxy_info)
@@ -24,8 +44,8 @@ class GliderTester(BaseTester):
             # 获取空闲端口
             listen_port = self._get_free_port()
             
-            # 生成临时配置文件
-            config = self._generate_config(glider_link, target_host, listen_port)
+            # 生成临时配置文件（单个forward时glider不做健康检查，check取第一个站点即可）
+            config = self._generate_config(glider_link, next(iter(target_hosts.values())), listen_port)
             
             with tempfile.NamedTemporaryFile(mode='w', delete=False) as f:
                 f.write(config)
@@ -33,38 +53,37 @@ class GliderTester(BaseTester):
                 
             # 启动Glider进程
             process = await asyncio.create_subprocess_exec(
-                "glider",
+                self.glider_path,
                 "-config", config_path,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE
             )
             
-            # 等待进程启动
-            await asyncio.sleep(1)
-            
-            # 测试连接
-            success = await self._test_connection(
-                target_host["check_url"],  # 使用目标站点的check_url
-                listen_port
-            )
-            
-            # 终止进程
-            process.terminate()
-            await process.wait()
+            # 等待端口就绪（进程提前退出时立即失败）
+            if not await self._wait_for_port(listen_port, process):
+                return {}
             
-            return success
+            # 并发测试所有站点
+            return await self._check_sites(listen_port, target_hosts)
             
         except Exception as e:
             if self.logger:
                 self.logger.debug(f"Glider test failed: {str(e)}")
-            return False
+            return {}
             
         finally:
+            # 终止进程
+            if process:
+                if process.returncode is None:
+                    process.terminate()
+                await process.wait()
+            
             # 清理临时文件
-            try:
-                os.unlink(config_path)
-            except:
-                pass
+            if config_path:
+                try:
+                    os.unlink(config_path)
+                except:
+                    pass
                 
     def _generate_config(self, forward: str, target_host: Optional[str], listen_port: int) -> str:
         """生成Glider配置"""
@@ -76,4 +95,143 @@ class GliderTester(BaseTester):
             f"checkinterval={self.config.get('check_interval', 30)}",
         ]
         return "\n".join(config_lines)
-        
\ No newline at end of file
+
+    async def measure_batch(self, proxies: List[Dict[str, Any]], target_host: Dict[str, Any]) -> List[TestResult]:
+        """使用单个Glider进程批量测试代理
+
+        所有代理作为同一个进程的forward，由glider的健康检查（check=）
+        逐个通过各自的forward请求check_url，再从检查日志中读取每个forward的结果
+        （检查耗时记为总时间）。glider的检查日志只包含forward的首个地址，
+        因此同一批次中的地址必须唯一。
+
+        Returns:
+            List[TestResult]: 与 proxies 顺序对应的测试结果
+        """
+        results = [TestResult(False)] * len(proxies)
+
+        # 按服务器地址拆分批次，保证每个批次内地址唯一
+        batches: List[Dict[str, int]] = []
+        forwards: Dict[int, str] = {}
+        for index, proxy_info in enumerate(proxies):
+            try:
+                forwards[index] = GliderDecoder.decode(proxy_info)
+            except Exception as e:
+                if self.logger:
+                    self.logger.debug(f"Glider batch skipped proxy: {str(e)}")
+                continue
+
+            addr = self._forward_addr(proxy_info)
+            for batch in batches:
+                if addr not in batch:
+                    batch[addr] = index
+                    break
+            else:
+                batches.append({addr: index})
+
+        async def run(batch: Dict[str, int]):
+            # glider只有一个forward时不做健康检查，退回单个测试
+            if len(batch) == 1:
+                index = next(iter(batch.values()))
+                site_results = await self.measure_sites(proxies[index], {"target": target_host})
+                results[index] = site_results.get("target", TestResult(False))
+                return
+
+            batch_results = await self._run_batch(
+                {addr: forwards[index] for addr, index in batch.items()},
+                target_host
+            )
+            for addr, index in batch.items():
+                results[index] = batch_results.get(addr, TestResult(False))
+
+        await asyncio.gather(*(run(batch) for batch in batches))
+        return results
+
+    async def _run_batch(self, forwards: Dict[str, str], target_host: Dict[str, Any]) -> Dict[str, TestResult]:
+        """启动一个Glider进程检查一批forward，返回 {地址: 测试结果}"""
+        results: Dict[str, TestResult] = {}
+        config_path = None
+        process = None
+        check_timeout = self.config.get('check_timeout', 10)
+
+        try:
+            config = self._generate_batch_config(list(forwards.values()), target_host, self._get_free_port())
+            with tempfile.NamedTemporaryFile(mode='w', delete=False) as f:
+                f.write(config)
+                config_path = f.name
+
+            process = await asyncio.create_subprocess_exec(
+                self.glider_path,
+                "-config", config_path,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT
+            )
+
+            # 所有forward都报告结果或超时后结束
+            deadline = time.monotonic() + check_timeout + 5
+            while len(results) < len(forwards):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    line = await asyncio.wait_for(process.stdout.readline(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+                if not line:
+                    # 进程已退出
+                    break
+
+                match = CHECK_LOG_PATTERN.search(line.decode(errors='ignore'))
+                if match:
+                    addr = self._normalize_addr(match.group(1))
+                    if addr in forwards and addr not in results:
+                        elapsed = match.group(3)
+                        results[addr] = TestResult(
+                            match.group(2) == "SUCCESS",
+                            total=int(elapsed) / 1000 if elapsed else None
+                        )
+
+        except Exception as e:
+            if self.logger:
+                self.logger.debug(f"Glider batch test failed: {str(e)}")
+
+        finally:
+            if process and process.returncode is None:
+                process.terminate()
+                await process.wait()
+            if config_path:
+                try:
+                    os.unlink(config_path)
+                except:
+                    pass
+
+        return results
+
+    def _generate_batch_config(self, forwards: List[str], target_host: Dict[str, Any], listen_port: int) -> str:
+        """生成批量测试的Glider配置"""
+        config_lines = [
+            "verbose=True",
+            f"listen=127.0.0.1:{listen_port}",
+            "strategy=rr",
+            f"check={self._batch_check_url(target_host['check_url'])}",
+            f"checktimeout={self.config.get('check_timeout', 10)}",
+            # 只需要启动时的第一次检查
+            "checkinterval=3600",
+            *[f"forward={forward}" for forward in forwards]
+        ]
+        return "\n".join(config_lines)
+
+    @staticmethod
+    def _batch_check_url(check_url: str) -> str:
+        """批量检查地址（未指定 expect 时加上 BATCH_CHECK_EXPECT）"""
+        return check_url if "#" in check_url else f"{check_url}#{BATCH_CHECK_EXPECT}"
+
+    @staticmethod
+    def _forward_addr(proxy_info: Dict[str, Any]) -> str:
+        """forward首个地址（与glider检查日志中的地址一致）"""
+        return GliderTester._normalize_addr(f"{proxy_info['server']}:{proxy_info['port']}")
+
+    @staticmethod
+    def _normalize_addr(addr: str) -> str:
+        """统一地址格式（去掉IPv6方括号）"""
+        host, _, port = addr.rpartition(":")
+        return f"{host.strip('[]').lower()}:{port}"
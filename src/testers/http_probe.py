@@ -0,0 +1,197 @@
+import asyncio
+import socket
+import ssl
+import time
+import urllib.parse
+from typing import Any, Dict, Optional
+
+from src.utils.constants import HTTP_HEADERS
+
+class HttpProbe:
+    """通过本地HTTP代理端口检查目标URL（不启动curl进程）
+
+    https 目标先发送 CONNECT 建立隧道，再在隧道上完成TLS握手；
+    http 目标直接向代理发送绝对URI的GET请求。
+    除状态码外还记录连接、TLS握手、首字节和总时间，可选读取一段响应体采样下载吞吐量。
+    """
+
+    def __init__(self, connect_timeout: float = 10, total_timeout: float = 15,
+                 max_body: int = 64 * 1024, logger=None):
+        """
+        Args:
+            connect_timeout: 建立连接（含CONNECT隧道和TLS握手）的超时时间（秒）
+            total_timeout: 整个请求的超时时间（秒）
+            max_body: 最多读取的响应体字节数
+            logger: 日志记录器
+        """
+        self.connect_timeout = connect_timeout
+        self.total_timeout = total_timeout
+        self.max_body = max_body
+        self.logger = logger
+
+        # 与 curl -k 一致，不验证证书
+        self.ssl_context = ssl.create_default_context()
+        self.ssl_context.check_hostname = False
+        self.ssl_context.verify_mode = ssl.CERT_NONE
+
+    async def probe(self, url: str, proxy_port: int, proxy_host: str = "127.0.0.1",
+                    sample_bytes: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """检查目标URL
+
+        Args:
+            url: 目标URL
+            proxy_port: 本地代理端口
+            proxy_host: 本地代理地址
+            sample_bytes: 采样吞吐量时读取的响应体字节数（None表示不采样，最多读取 max_body）
+
+        Returns:
+            Optional[Dict]: {'status': 状态码, 'connect': 连接时间, 'tls': TLS握手时间（http目标为None）,
+            'ttfb': 首字节时间, 'total': 总时间, 'bytes': 读取的响应体字节数,
+            'throughput': 吞吐量（字节/秒，未采样时为None）}，时间单位为秒，失败时返回None
+        """
+        try:
+            return await asyncio.wait_for(
+                self._probe(url, proxy_host, proxy_port, sample_bytes),
+                timeout=self.total_timeout
+            )
+        except Exception as e:
+            if self.logger:
+                self.logger.debug(f"HTTP probe failed for {url} via port {proxy_port}: {str(e) or type(e).__name__}")
+            return None
+
+    async def _probe(self, url: str, proxy_host: str, proxy_port: int,
+                     sample_bytes: Optional[int] = None) -> Dict[str, Any]:
+        """执行一次检查"""
+        parsed = urllib.parse.urlsplit(url)
+        host = parsed.hostname
+        if not host:
+            raise ValueError(f"Invalid URL: {url}")
+        port = parsed.port or (443 if parsed.scheme == "https" else 80)
+        path = parsed.path or "/"
+        if parsed.query:
+            path = f"{path}?{parsed.query}"
+
+        start = time.monotonic()
+        timings = {"connect": None, "tls": None}
+        writer = None
+        try:
+            if parsed.scheme == "https":
+                reader, writer = await asyncio.wait_for(
+                    self._open_tunnel(proxy_host, proxy_port, host, port, timings),
+                    timeout=self.connect_timeout
+                )
+                target = path
+            else:
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection(proxy_host, proxy_port),
+                    timeout=self.connect_timeout
+                )
+                timings["connect"] = time.monotonic() - start
+                target = url
+
+            # 发送请求
+            writer.write(self._build_request("GET", target, parsed.netloc))
+            await writer.drain()
+
+            # 读取状态行（首字节）
+            status_line = await reader.readline()
+            ttfb = time.monotonic() - start
+            status = self._parse_status(status_line)
+
+            # 读取响应头和部分响应体
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+            limit = self.max_body if sample_bytes is None else sample_bytes
+            received = 0
+            while received < limit:
+                chunk = await reader.read(min(65536, limit - received))
+                if not chunk:
+                    break
+                received += len(chunk)
+            total = time.monotonic() - start
+
+            # 吞吐量按首字节之后的下载时间计算
+            throughput = None
+            if sample_bytes is not None and received and total > ttfb:
+                throughput = received / (total - ttfb)
+
+            return {
+                "status": status,
+                "connect": timings["connect"],
+                "tls": timings["tls"],
+                "ttfb": ttfb,
+                "total": total,
+                "bytes": received,
+                "throughput": throughput
+            }
+        finally:
+            if writer is not None:
+                writer.close()
+                try:
+                    await writer.wait_closed()
+                except Exception:
+                    pass
+
+    async def _open_tunnel(self, proxy_host: str, proxy_port: int, host: str, port: int,
+                           timings: Optional[Dict[str, Optional[float]]] = None):
+        """通过CONNECT建立隧道并完成TLS握手（timings 中记录隧道建立和TLS握手的时间）"""
+        loop = asyncio.get_running_loop()
+        start = time.monotonic()
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        try:
+            await loop.sock_connect(sock, (proxy_host, proxy_port))
+
+            authority = f"[{host}]:{port}" if ":" in host else f"{host}:{port}"
+            await loop.sock_sendall(sock, self._build_request("CONNECT", authority, authority))
+
+            # 读取CONNECT响应头
+            response = b""
+            while b"\r\n\r\n" not in response:
+                chunk = await loop.sock_recv(sock, 4096)
+                if not chunk:
+                    raise ConnectionError("Proxy closed connection during CONNECT")
+                response += chunk
+                if len(response) > 16384:
+                    raise ConnectionError("CONNECT response too large")
+
+            status = self._parse_status(response.split(b"\r\n", 1)[0])
+            if status != 200:
+                raise ConnectionError(f"CONNECT failed with status {status}")
+            connected = time.monotonic()
+
+            # 在隧道上进行TLS握手
+            streams = await asyncio.open_connection(
+                sock=sock,
+                ssl=self.ssl_context,
+                server_hostname=host
+            )
+            if timings is not None:
+                timings["connect"] = connected - start
+                timings["tls"] = time.monotonic() - connected
+            return streams
+        except BaseException:
+            sock.close()
+            raise
+
+    @staticmethod
+    def _build_request(method: str, target: str, host: str) -> bytes:
+        """构造HTTP/1.1请求"""
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {host}"]
+        if method != "CONNECT":
+            lines.extend([
+                f"User-Agent: {HTTP_HEADERS['User-Agent']}",
+                f"Accept: {HTTP_HEADERS['Accept']}",
+                "Connection: close"
+            ])
+        return ("\r\n".join(lines) + "\r\n\r\n").encode()
+
+    @staticmethod
+    def _parse_status(status_line: bytes) -> int:
+        """解析状态行中的状态码"""
+        parts = status_line.decode("latin-1").split(None, 2)
+        if len(parts) < 2 or not parts[0].startswith("HTTP/"):
+            raise ValueError(f"Invalid status line: {status_line[:64]!r}")
+        return int(parts[1])
@@ -1,49 +1,124 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
 import asyncio
-import socket
+import ipaddress
+import time
 from .base_tester import BaseTester
+from src.utils.dns_resolver import DNSResolver
 
 class TCPTester(BaseTester):
     """TCP连接测试器"""
-    
-    def __init__(self, logger=None, connect_timeout: int = 5, retry_times: int = 2):
+
+    def __init__(self, logger=None, connect_timeout: int = 5, retry_times: int = 2,
+                 resolver: Optional[DNSResolver] = None, attempt_delay: float = 0.25):
         super().__init__(logger)
         self.timeout = connect_timeout
         self.retry_times = retry_times
-        
+        # 未传入时使用自己的解析器；同一次运行中的测试器应共享一个解析器
+        self.resolver = resolver or DNSResolver(logger=logger)
+        # Happy Eyeballs (RFC 8305) 连接尝试间隔
+        self.attempt_delay = attempt_delay
+
     def get_tester_name(self) -> str:
         return "TCP"
-        
+
     async def test(self, proxy_info: Dict[str, Any], target_host: Optional[str] = None) -> bool:
         """测试TCP连接"""
+        return await self.probe(proxy_info) is not None
+
+    async def probe(self, proxy_info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """测试TCP连接，返回最快的连接路径
+
+        解析出所有地址后按 IPv6/IPv4 交替排序，每隔 attempt_delay 发起下一个连接尝试，
+        第一个成功的连接胜出，其余尝试被取消。
+
+        Returns:
+            Optional[Dict]: {'address': 连接的IP, 'family': 'ipv4'/'ipv6', 'rtt': 连接耗时(秒)}，失败时返回None
+        """
         server = proxy_info["server"]
         port = proxy_info["port"]
-        
-        # 首先解析域名
+
+        # 首先解析域名（异步解析，结果有缓存）
         try:
-            if not server.replace(".", "").isdigit():  # 如果不是IP地址
-                server_ip = socket.gethostbyname(server)
-            else:
-                server_ip = server
+            addresses = self._interleave(await self.resolver.resolve(server))
         except Exception as e:
             if self.logger:
                 self.logger.debug(f"DNS resolution failed for {server}: {str(e)}")
-            return False
-        
+            return None
+
         for i in range(self.retry_times + 1):
             try:
-                _, writer = await asyncio.wait_for(
-                    asyncio.open_connection(server_ip, port),
+                return await asyncio.wait_for(
+                    self._race(addresses, int(port)),
                     timeout=self.timeout
                 )
-                writer.close()
-                await writer.wait_closed()
-                return True
             except Exception as e:
                 if i == self.retry_times:
                     if self.logger:
-                        self.logger.debug(f"TCP test failed for {server}({server_ip}):{port}: {str(e)}")
-                    return False
+                        self.logger.debug(f"TCP test failed for {server}({', '.join(addresses)}):{port}: {str(e) or type(e).__name__}")
+                    return None
                 await asyncio.sleep(1)  # 重试前等待1秒
                 continue
-        return False
\ No newline at end of file
+        return None
+
+    async def _race(self, addresses: List[str], port: int) -> Dict[str, Any]:
+        """交错发起连接尝试，返回第一个成功的连接"""
+        winner: asyncio.Future = asyncio.get_running_loop().create_future()
+        tasks: List[asyncio.Task] = []
+        errors: List[Exception] = []
+
+        async def attempt(address: str):
+            start = time.monotonic()
+            try:
+                _, writer = await asyncio.open_connection(address, port)
+            except Exception as e:
+                errors.append(e)
+                # 所有尝试都失败时结束
+                if len(errors) == len(addresses) and not winner.done():
+                    winner.set_exception(errors[-1])
+                return
+            rtt = time.monotonic() - start
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+            if not winner.done():
+                winner.set_result({
+                    "address": address,
+                    "family": "ipv6" if ":" in address else "ipv4",
+                    "rtt": rtt
+                })
+
+        try:
+            for index, address in enumerate(addresses):
+                tasks.append(asyncio.create_task(attempt(address)))
+                if index == len(addresses) - 1:
+                    break
+                # 等待下一次尝试的间隔；当前尝试提前失败时立即开始下一次
+                await asyncio.wait(
+                    [winner, tasks[-1]],
+                    timeout=self.attempt_delay,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if winner.done():
+                    break
+            return await winner
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    def _interleave(addresses: List[str]) -> List[str]:
+        """按地址族交替排列（保持首个地址的地址族优先）"""
+        if not addresses:
+            return []
+        first_v6 = ipaddress.ip_address(addresses[0]).version == 6
+        preferred = [a for a in addresses if (ipaddress.ip_address(a).version == 6) == first_v6]
+        others = [a for a in addresses if (ipaddress.ip_address(a).version == 6) != first_v6]
+        result = []
+        for i in range(max(len(preferred), len(others))):
+            if i < len(preferred):
+                result.append(preferred[i])
+            if i < len(others):
+                result.append(others[i])
+        return result
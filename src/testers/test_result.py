@@ -0,0 +1,55 @@
+from typing import Any, Dict, NamedTuple, Optional
+
+class TestResult(NamedTuple):
+    """一次站点测试的结果
+
+    时间单位为秒，吞吐量单位为字节/秒；没有测量的指标为None。
+    布尔值等于 success，可以直接用于 if 判断。
+    """
+    success: bool
+    status: Optional[int] = None        # HTTP状态码
+    tcp: Optional[float] = None         # 与代理服务器建立TCP连接的时间（TCP测试阶段）
+    connect: Optional[float] = None     # 通过代理建立到目标的连接（含CONNECT隧道）的时间
+    tls: Optional[float] = None         # 与目标的TLS握手时间
+    ttfb: Optional[float] = None        # 首字节时间
+    total: Optional[float] = None       # 请求总时间
+    throughput: Optional[float] = None  # 下载吞吐量采样
+    address: Optional[str] = None       # TCP测试阶段连接成功的代理服务器IP
+    family: Optional[str] = None        # 连接成功的地址族（'ipv4'/'ipv6'）
+
+    # 不让pytest把该类当作测试用例收集
+    __test__ = False
+
+    # 持久化的指标字段
+    METRICS = ("tcp", "connect", "tls", "ttfb", "total", "throughput")
+    # 持久化的连接信息字段
+    ROUTE = ("address", "family")
+
+    def __bool__(self) -> bool:
+        return bool(self.success)
+
+    @classmethod
+    def from_probe(cls, probe: Optional[Dict[str, Any]]) -> "TestResult":
+        """由 HttpProbe.probe 的结果创建（状态码为2xx/3xx时成功）"""
+        if probe is None:
+            return cls(False)
+        return cls(
+            success=200 <= probe["status"] < 400,
+            status=probe["status"],
+            connect=probe.get("connect"),
+            tls=probe.get("tls"),
+            ttfb=probe.get("ttfb"),
+            total=probe.get("total"),
+            throughput=probe.get("throughput"),
+        )
+
+    @classmethod
+    def from_metrics(cls, metrics: Dict[str, float], success: bool = True) -> "TestResult":
+        """由持久化的指标创建"""
+        return cls(success, **{key: metrics[key] for key in cls.METRICS + cls.ROUTE if metrics.get(key) is not None})
+
+    def metrics(self) -> Dict[str, Any]:
+        """已测量的指标（保留4位小数）及连接信息"""
+        metrics = {key: round(getattr(self, key), 4) for key in self.METRICS if getattr(self, key) is not None}
+        metrics.update((key, getattr(self, key)) for key in self.ROUTE if getattr(self, key) is not None)
+        return metrics
@@ -0,0 +1,163 @@
+import asyncio
+import json
+import os
+import tempfile
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+class XrayWorker:
+    """长期运行的Xray进程
+
+    一个进程加载多个入站/出站槽位，每个槽位的HTTP入站通过路由规则
+    (inboundTag -> outboundTag) 固定到一个代理出站。
+    """
+
+    def __init__(self, xray_path: str, ports: List[int], logger=None):
+        self.xray_path = xray_path
+        self.ports = ports
+        self.logger = logger
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.config_path: Optional[str] = None
+
+    @property
+    def slots(self) -> int:
+        """槽位数量"""
+        return len(self.ports)
+
+    async def load(self, outbounds: List[Dict[str, Any]],
+                   ready_check: Optional[Callable[..., Awaitable[bool]]] = None) -> List[int]:
+        """加载一组出站配置（重新加载配置会重启进程），返回对应的本地端口
+        
+        Args:
+            outbounds: 出站配置列表，数量不超过槽位数
+            ready_check: 端口就绪检查函数，签名为 (port, process) -> bool
+        """
+        await self.stop()
+
+        ports = self.ports[:len(outbounds)]
+        config = self._generate_config(outbounds, ports)
+
+        if not self.config_path:
+            with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+                self.config_path = f.name
+        with open(self.config_path, 'w') as f:
+            json.dump(config, f)
+
+        self.process = await asyncio.create_subprocess_exec(
+            self.xray_path,
+            "-config", self.config_path,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE
+        )
+
+        # 等待所有槽位端口就绪
+        if ready_check is not None:
+            ready = await asyncio.gather(*(ready_check(port, self.process) for port in ports))
+            if not all(ready):
+                await self.stop()
+                raise RuntimeError("Xray worker failed to start")
+        return ports
+
+    async def stop(self) -> None:
+        """停止进程"""
+        if self.process and self.process.returncode is None:
+            self.process.terminate()
+            await self.process.wait()
+        self.process = None
+
+    async def close(self) -> None:
+        """停止进程并删除配置文件"""
+        await self.stop()
+        if self.config_path:
+            try:
+                os.unlink(self.config_path)
+            except:
+                pass
+            self.config_path = None
+
+    @staticmethod
+    def _generate_config(outbounds: List[Dict[str, Any]], ports: List[int]) -> Dict:
+        """生成多槽位Xray配置"""
+        inbounds = []
+        tagged_outbounds = []
+        rules = []
+        for index, (outbound, port) in enumerate(zip(outbounds, ports)):
+            inbounds.append({
+                "tag": f"in-{index}",
+                "port": port,
+                "listen": "127.0.0.1",
+                "protocol": "http",
+                "settings": {}
+            })
+            tagged_outbounds.append({**outbound, "tag": f"out-{index}"})
+            rules.append({
+                "type": "field",
+                "inboundTag": [f"in-{index}"],
+                "outboundTag": f"out-{index}"
+            })
+
+        return {
+            "log": {
+                "loglevel": "warning"
+            },
+            "inbounds": inbounds,
+            "outbounds": tagged_outbounds,
+            "routing": {
+                "rules": rules
+            }
+        }
+
+class XrayPool:
+    """Xray进程池 - 将代理分配到空闲的槽位上批量测试"""
+
+    def __init__(self, xray_path: str, pool_size: int, slots: int, port_factory: Callable[[], int],
+                 ready_check: Optional[Callable[..., Awaitable[bool]]] = None, logger=None):
+        """
+        Args:
+            xray_path: xray可执行文件路径
+            pool_size: 进程数量
+            slots: 每个进程的槽位数量
+            port_factory: 获取空闲端口的函数
+            ready_check: 端口就绪检查函数，签名为 (port, process) -> bool
+            logger: 日志记录器
+        """
+        self.logger = logger
+        self.ready_check = ready_check
+        self.workers = [
+            XrayWorker(xray_path, [port_factory() for _ in range(slots)], logger)
+            for _ in range(pool_size)
+        ]
+        self._idle: asyncio.Queue = asyncio.Queue()
+        for worker in self.workers:
+            self._idle.put_nowait(worker)
+
+    async def run(self, outbounds: List[Dict[str, Any]], check: Callable[[int], Any]) -> List[Any]:
+        """在空闲进程上加载出站并对每个槽位执行 check(port)
+
+        出站数量超过单个进程的槽位时分多批执行，返回与 outbounds 顺序对应的结果。
+        """
+        if not outbounds:
+            return []
+
+        slots = self.workers[0].slots
+        chunks = [outbounds[i:i + slots] for i in range(0, len(outbounds), slots)]
+
+        async def run_chunk(chunk: List[Dict[str, Any]]) -> List[Any]:
+            worker = await self._idle.get()
+            try:
+                try:
+                    ports = await worker.load(chunk, self.ready_check)
+                except Exception as e:
+                    if self.logger:
+                        self.logger.debug(f"Failed to load xray worker: {str(e)}")
+                    return [None] * len(chunk)
+                return await asyncio.gather(*(check(port) for port in ports))
+            finally:
+                self._idle.put_nowait(worker)
+
+        results = await asyncio.gather(*(run_chunk(chunk) for chunk in chunks))
+        return [result for chunk_results in results for result in chunk_results]
+
+    async def close(self) -> None:
+        """关闭所有进程"""
+        for worker in self.workers:
+            await worker.close()
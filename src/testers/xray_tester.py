@@ -1,19 +1,28 @@
 import json
 import asyncio
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
 import tempfile
 import os
 from .base_tester import BaseTester
+from .test_result import TestResult
+from .xray_pool import XrayPool
 
 class XrayTester(BaseTester):
     """Xray测试器"""
     
-    def __init__(self, logger=None, timeout: int = 5, retry_times: int = 2, xray_path: str = "xray"):
+    def __init__(self, logger=None, timeout: int = 5, retry_times: int = 2, xray_path: str = "xray",
+                 pool_size: int = 0, pool_slots: int = 16, startup_timeout: float = 5):
         super().__init__(logger)
         self.timeout = timeout
+        self.startup_timeout = startup_timeout
         self.retry_times = retry_times
         self.xray_path = xray_path
         
+        # 进程池模式（pool_size > 0 时启用）
+        self.pool_size = pool_size
+        self.pool_slots = pool_slots
+        self._pool: Optional[XrayPool] = None
+        
     def get_tester_name(self) -> str:
         return "Xray"
         
@@ -24,10 +33,17 @@ class XrayTester(BaseTester):
             proxy_info: 代理配置信息
             target_host: 目标站点配置，包含 host 和 check_url
         """
+        return bool(await self.test_sites(proxy_info, {"target": target_host}))
+        
+    async def measure_sites(self, proxy_info: Dict[str, Any],
+                            target_hosts: Dict[str, Dict[str, Any]]) -> Dict[str, TestResult]:
+        """启动一个Xray进程，通过它并发测试所有目标站点"""
         # 跳过SSH代理
         if proxy_info["proxy_protocol"].value == "ssh":
-            return False
+            return {}
             
+        config_path = None
+        process = None
         try:
             # 获取空闲端口
             listen_port = self._get_free_port()
@@ -40,44 +56,93 @@ class XrayTester(BaseTester):
                 json.dump(config, f)
                 config_path = f.name
                 
-            try:
-                # 启动Xray进程
-                process = await asyncio.create_subprocess_exec(
-                    self.xray_path,
-                    "-config", config_path,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE
-                )
-                
-                # 等待进程启动
-                await asyncio.sleep(1)
-                
-                # 测试连接
-                success = await self._test_connection(
-                    target_host["check_url"],  # 使用目标站点的check_url
-                    listen_port
-                )
-                
-                return success
-                
-            finally:
-                # 终止进程
-                if process:
-                    process.terminate()
-                    await process.wait()
+            # 启动Xray进程
+            process = await asyncio.create_subprocess_exec(
+                self.xray_path,
+                "-config", config_path,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            
+            # 等待端口就绪（进程提前退出时立即失败）
+            if not await self._wait_for_port(listen_port, process):
+                return {}
+            
+            # 并发测试所有站点
+            return await self._check_sites(listen_port, target_hosts)
                 
         except Exception as e:
             if self.logger:
                 self.logger.debug(f"Xray test failed: {str(e)}")
-            return False
+            return {}
             
         finally:
+            # 终止进程
+            if process:
+                if process.returncode is None:
+                    process.terminate()
+                await process.wait()
+            
             # 清理临时文件
+            if config_path:
+                try:
+                    os.unlink(config_path)
+                except:
+                    pass
+    
+    async def measure_batch(self, proxies: List[Dict[str, Any]], target_host: Dict[str, Any]) -> List[TestResult]:
+        """使用Xray进程池批量测试代理
+        
+        每个代理占用一个槽位（HTTP入站 -> 路由规则 -> 代理出站），
+        同一进程内的所有槽位并发测试。
+        
+        Returns:
+            List[TestResult]: 与 proxies 顺序对应的测试结果
+        """
+        if self._pool is None:
+            self._pool = XrayPool(
+                self.xray_path,
+                pool_size=max(self.pool_size, 1),
+                slots=self.pool_slots,
+                port_factory=self._get_free_port,
+                ready_check=self._wait_for_port,
+                logger=self.logger
+            )
+        
+        results = [TestResult(False)] * len(proxies)
+        
+        # 生成出站配置，跳过SSH和不支持的代理
+        indexes = []
+        outbounds = []
+        for index, proxy_info in enumerate(proxies):
+            if proxy_info["proxy_protocol"].value == "ssh":
+                continue
             try:
-                os.unlink(config_path)
-            except:
-                pass
-                
+                outbounds.append(self._generate_config(proxy_info, 0)["outbounds"][0])
+                indexes.append(index)
+            except Exception as e:
+                if self.logger:
+                    self.logger.debug(f"Xray batch skipped proxy: {str(e)}")
+        
+        try:
+            batch_results = await self._pool.run(
+                outbounds,
+                lambda port: self._check_sites(port, {"target": target_host})
+            )
+            for index, site_results in zip(indexes, batch_results):
+                results[index] = (site_results or {}).get("target", TestResult(False))
+        except Exception as e:
+            if self.logger:
+                self.logger.debug(f"Xray batch test failed: {str(e)}")
+        
+        return results
+    
+    async def close(self) -> None:
+        """关闭进程池"""
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+    
     def _generate_config(self, proxy_info: Dict[str, Any], listen_port: int) -> Dict:
         """生成Xray配置"""
         protocol = proxy_info["proxy_protocol"].value
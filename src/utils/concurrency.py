@@ -0,0 +1,151 @@
+import asyncio
+import os
+import statistics
+import time
+from typing import Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+def open_fd_usage() -> Optional[float]:
+    """当前进程已打开文件描述符占软限制的比例，无法获取时返回None"""
+    if resource is None:
+        return None
+    try:
+        soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if soft == resource.RLIM_INFINITY or soft <= 0:
+            return None
+        return len(os.listdir("/proc/self/fd")) / soft
+    except OSError:
+        return None
+
+class AdaptiveLimiter:
+    """自适应并发限制器（AIMD）
+
+    用法与 asyncio.Semaphore 相同（async with limiter）。每完成 window 个任务评估一次：
+    超时率或延迟明显高于基线、或文件描述符不足时，并发上限乘以 decrease；
+    否则加上 increase。adaptive=False 时退化为固定上限。
+    """
+
+    def __init__(self, name: str, initial: int, min_limit: int = 1, max_limit: Optional[int] = None,
+                 adaptive: bool = True, increase: int = 4, decrease: float = 0.5, window: int = 32,
+                 slow_threshold: Optional[float] = None, timeout_margin: float = 0.1,
+                 latency_tolerance: float = 2.0, fd_high_water: float = 0.8, logger=None):
+        """
+        Args:
+            name: 阶段名称（用于日志）
+            initial: 初始并发上限
+            min_limit: 最小并发上限
+            max_limit: 最大并发上限
+            adaptive: 是否启用自适应调整
+            increase: 每个窗口增加的并发数
+            decrease: 退避时的乘数
+            window: 评估窗口（完成的任务数）
+            slow_threshold: 耗时超过该值（秒）的任务视为超时
+            timeout_margin: 超时率超过基线多少时退避
+            latency_tolerance: 延迟中位数超过基线多少倍时退避
+            fd_high_water: 文件描述符使用比例超过该值时退避
+            logger: 日志记录器
+        """
+        self.name = name
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(max_limit or initial, self.min_limit)
+        self.limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self.adaptive = adaptive
+        self.increase = increase
+        self.decrease = decrease
+        self.window = window
+        self.slow_threshold = slow_threshold
+        self.timeout_margin = timeout_margin
+        self.latency_tolerance = latency_tolerance
+        self.fd_high_water = fd_high_water
+        self.logger = logger
+
+        self._active = 0
+        self._condition = asyncio.Condition()
+        self._latencies: List[float] = []
+        self._timeouts = 0
+        self._baseline_timeout_rate: Optional[float] = None
+        self._baseline_latency: Optional[float] = None
+        self._starts: Dict[asyncio.Task, float] = {}
+
+    @property
+    def active(self) -> int:
+        """正在执行的任务数"""
+        return self._active
+
+    async def acquire(self) -> None:
+        """获取一个并发名额"""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._active < int(self.limit))
+            self._active += 1
+
+    async def release(self) -> None:
+        """释放并发名额"""
+        async with self._condition:
+            self._active -= 1
+            self._condition.notify(max(1, int(self.limit) - self._active))
+
+    async def __aenter__(self):
+        await self.acquire()
+        self._starts[asyncio.current_task()] = time.monotonic()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        elapsed = time.monotonic() - self._starts.pop(asyncio.current_task())
+        # 被取消的任务不计入统计
+        if exc_type is None or not issubclass(exc_type, asyncio.CancelledError):
+            timed_out = exc_type is not None or (
+                self.slow_threshold is not None and elapsed >= self.slow_threshold
+            )
+            self.record(elapsed, timed_out)
+        await self.release()
+        return False
+
+    def record(self, latency: float, timed_out: bool = False) -> None:
+        """记录一个任务的结果，满一个窗口时调整并发上限"""
+        if not self.adaptive:
+            return
+        if timed_out:
+            self._timeouts += 1
+        else:
+            self._latencies.append(latency)
+        if self._timeouts + len(self._latencies) >= self.window:
+            self._adjust()
+
+    def _adjust(self) -> None:
+        """根据窗口统计调整并发上限"""
+        total = self._timeouts + len(self._latencies)
+        timeout_rate = self._timeouts / total
+        latency = statistics.median(self._latencies) if self._latencies else None
+        self._timeouts = 0
+        self._latencies = []
+
+        reason = None
+        fd_usage = open_fd_usage()
+        if fd_usage is not None and fd_usage >= self.fd_high_water:
+            reason = f"file descriptors at {fd_usage:.0%}"
+        elif self._baseline_timeout_rate is not None and timeout_rate > self._baseline_timeout_rate + self.timeout_margin:
+            reason = f"timeout rate {timeout_rate:.0%} (baseline {self._baseline_timeout_rate:.0%})"
+        elif latency is not None and self._baseline_latency and latency > self._baseline_latency * self.latency_tolerance:
+            reason = f"latency {latency:.2f}s (baseline {self._baseline_latency:.2f}s)"
+
+        old_limit = int(self.limit)
+        if reason:
+            self.limit = max(self.min_limit, self.limit * self.decrease)
+        else:
+            # 健康窗口更新基线（指数移动平均）
+            self._baseline_timeout_rate = timeout_rate if self._baseline_timeout_rate is None \
+                else 0.8 * self._baseline_timeout_rate + 0.2 * timeout_rate
+            if latency is not None:
+                self._baseline_latency = latency if self._baseline_latency is None \
+                    else 0.8 * self._baseline_latency + 0.2 * latency
+            self.limit = min(self.max_limit, self.limit + self.increase)
+
+        if int(self.limit) != old_limit and self.logger:
+            if reason:
+                self.logger.debug(f"{self.name} concurrency {old_limit} -> {int(self.limit)}: {reason}")
+            else:
+                self.logger.debug(f"{self.name} concurrency {old_limit} -> {int(self.limit)}")
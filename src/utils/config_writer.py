@@ -0,0 +1,58 @@
+import hashlib
+import os
+from pathlib import Path
+from typing import List, Union
+
+class ConfigWriter:
+    """配置文件写入器 - 内容摘要不变时跳过写入，需要写入时先写临时文件再原子替换
+
+    changed 记录本次实际改变（写入或删除）的文件，运行中的glider只在其中
+    有文件时才需要重新加载。
+    """
+
+    def __init__(self, logger=None):
+        self.logger = logger
+        self.changed: List[Path] = []
+
+    def write(self, path: Union[str, Path], content: str) -> bool:
+        """写入文件，返回文件是否改变"""
+        path = Path(path)
+        data = content.encode("utf-8")
+        if self.digest(self._read(path)) == self.digest(data):
+            if self.logger:
+                self.logger.debug(f"Unchanged: {path}")
+            return False
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = path.with_name(f"{path.name}.tmp")
+        with open(tmp_file, "wb") as f:
+            f.write(data)
+        os.replace(tmp_file, path)
+        self.changed.append(path)
+        if self.logger:
+            self.logger.debug(f"Written: {path}")
+        return True
+
+    def remove(self, path: Union[str, Path]) -> bool:
+        """删除不再需要的文件，返回文件是否存在"""
+        path = Path(path)
+        if not path.exists():
+            return False
+        path.unlink()
+        self.changed.append(path)
+        if self.logger:
+            self.logger.debug(f"Removed: {path}")
+        return True
+
+    @staticmethod
+    def digest(data: bytes) -> str:
+        """计算内容摘要（文件不存在时为空字符串）"""
+        return hashlib.sha256(data).hexdigest() if data is not None else ""
+
+    @staticmethod
+    def _read(path: Path):
+        """读取现有文件内容（不存在时返回None）"""
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:
+            return None
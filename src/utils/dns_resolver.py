@@ -0,0 +1,107 @@
+import asyncio
+import ipaddress
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+class DNSResolver:
+    """异步DNS解析器（带TTL缓存）
+
+    解析在独立的线程池中执行，不阻塞事件循环，也不占用默认线程池；
+    成功和失败的结果都会缓存，同一域名的并发解析只发起一次查询。
+    """
+
+    def __init__(self, ttl: float = 300, negative_ttl: float = 60, timeout: float = 5,
+                 max_workers: int = 16, logger=None):
+        """
+        Args:
+            ttl: 解析成功结果的缓存时间（秒）
+            negative_ttl: 解析失败结果的缓存时间（秒）
+            timeout: 单次解析的超时时间（秒）
+            max_workers: 解析线程数
+            logger: 日志记录器
+        """
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.logger = logger
+
+        # host -> (过期时间, 地址列表，失败时为None)
+        self._cache: Dict[str, Tuple[float, Optional[List[str]]]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    async def resolve(self, host: str) -> List[str]:
+        """解析域名，返回IP地址列表（按系统返回的顺序）
+
+        Raises:
+            OSError: 解析失败或超时
+        """
+        # IP地址直接返回
+        try:
+            return [str(ipaddress.ip_address(host.strip("[]")))]
+        except ValueError:
+            pass
+
+        host = host.lower()
+        cached = self._cache.get(host)
+        if cached and cached[0] > time.monotonic():
+            if cached[1] is None:
+                raise OSError(f"DNS resolution failed for {host} (cached)")
+            return cached[1]
+
+        # 同一域名只发起一次查询
+        future = self._inflight.get(host)
+        if future is None:
+            future = asyncio.ensure_future(self._lookup(host))
+            self._inflight[host] = future
+            future.add_done_callback(lambda _: self._inflight.pop(host, None))
+        return await asyncio.shield(future)
+
+    async def resolve_one(self, host: str) -> str:
+        """解析域名，返回第一个IP地址"""
+        return (await self.resolve(host))[0]
+
+    async def _lookup(self, host: str) -> List[str]:
+        """执行查询并写入缓存"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="dns")
+
+        loop = asyncio.get_running_loop()
+        try:
+            infos = await asyncio.wait_for(
+                loop.run_in_executor(
+                    self._executor,
+                    socket.getaddrinfo, host, None, socket.AF_UNSPEC, socket.SOCK_STREAM
+                ),
+                timeout=self.timeout
+            )
+        except asyncio.TimeoutError:
+            self._cache[host] = (time.monotonic() + self.negative_ttl, None)
+            raise OSError(f"DNS resolution timed out for {host}")
+        except OSError:
+            self._cache[host] = (time.monotonic() + self.negative_ttl, None)
+            raise
+
+        addresses = []
+        for _, _, _, _, sockaddr in infos:
+            if sockaddr[0] not in addresses:
+                addresses.append(sockaddr[0])
+        if not addresses:
+            self._cache[host] = (time.monotonic() + self.negative_ttl, None)
+            raise OSError(f"No address found for {host}")
+
+        self._cache[host] = (time.monotonic() + self.ttl, addresses)
+        return addresses
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self._cache.clear()
+
+    def close(self) -> None:
+        """关闭解析线程池"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -0,0 +1,255 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from src.decoders.glider_decoder import GliderDecoder
+from src.encoders.encoder import ProxyEncoder, ProxyProtocol
+from src.models.proxy_record import ProxyRecord
+from src.utils.xray_config_generator import XrayConfigGenerator
+
+class EncodeCache:
+    """链接编码缓存（内存LRU + SQLite）
+
+    以链接摘要为键，保存编码后的记录（编码失败时保存错误信息）以及由记录
+    派生的 glider 链接和 xray 出站配置。同一个链接在多次运行之间、以及
+    清洗和生成配置两个阶段之间只编码一次。磁盘上的条目数超过 max_entries
+    时按最近使用时间淘汰。
+    """
+
+    # 编码结果格式变化时增加版本号，旧缓存会被清空
+    VERSION = 1
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS meta (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS encoded (
+        digest TEXT PRIMARY KEY,
+        record TEXT,
+        error TEXT,
+        glider TEXT,
+        xray TEXT,
+        last_used REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_encoded_last_used ON encoded (last_used);
+    """
+
+    def __init__(self, db_path: str = "results/cache/encode_cache.db", memory_size: int = 20000,
+                 max_entries: int = 200000, logger=None):
+        """
+        Args:
+            db_path: 数据库文件路径
+            memory_size: 内存中保留的条目数
+            max_entries: 数据库中保留的最大条目数
+            logger: 日志记录器
+        """
+        self.db_path = db_path
+        self.memory_size = memory_size
+        self.max_entries = max_entries
+        self.logger = logger
+        self.hits = 0
+        self.misses = 0
+
+        # 摘要 -> 条目 {'record', 'error', 'glider', 'xray'}
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # 需要写入数据库的条目和需要更新使用时间的摘要
+        self._dirty: Dict[str, Dict[str, Any]] = {}
+        self._touched = set()
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.executescript(self.SCHEMA)
+        self._check_version()
+
+    def _check_version(self) -> None:
+        """缓存版本与当前版本不一致时清空"""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if row is not None and row[0] == str(self.VERSION):
+            return
+        if row is not None and self.logger:
+            self.logger.debug(f"Encode cache version changed ({row[0]} -> {self.VERSION}), clearing")
+        self.conn.execute("DELETE FROM encoded")
+        self.conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (str(self.VERSION),)
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def digest(link: str) -> str:
+        """链接摘要"""
+        return hashlib.blake2b(link.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+
+    def _entry(self, digest: str) -> Optional[Dict[str, Any]]:
+        """查找条目（先查内存，再查数据库）"""
+        entry = self._memory.get(digest)
+        if entry is not None:
+            self._memory.move_to_end(digest)
+        else:
+            row = self.conn.execute(
+                "SELECT record, error, glider, xray FROM encoded WHERE digest = ?", (digest,)
+            ).fetchone()
+            if row is None:
+                return None
+            entry = {
+                "record": json.loads(row[0]) if row[0] is not None else None,
+                "error": row[1],
+                "glider": json.loads(row[2]) if row[2] is not None else None,
+                "xray": json.loads(row[3]) if row[3] is not None else None,
+            }
+            self._remember(digest, entry)
+        self._touched.add(digest)
+        return entry
+
+    def _remember(self, digest: str, entry: Dict[str, Any]) -> None:
+        """放入内存LRU"""
+        self._memory[digest] = entry
+        self._memory.move_to_end(digest)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _store(self, digest: str, entry: Dict[str, Any]) -> None:
+        """保存条目（延迟写入数据库）"""
+        self._remember(digest, entry)
+        self._dirty[digest] = entry
+
+    @staticmethod
+    def _to_record(data: Dict[str, Any]) -> ProxyRecord:
+        """由缓存的字典创建新记录（每次返回新对象，调用方可以修改）"""
+        record = ProxyRecord(data)
+        record.proxy_protocol = ProxyProtocol(data["proxy_protocol"])
+        return record
+
+    @staticmethod
+    def _to_data(record: Mapping[str, Any]) -> Dict[str, Any]:
+        """记录转换为可以JSON序列化的字典"""
+        data = dict(record)
+        # 别名是去重时添加的，不属于编码结果
+        data.pop("aliases", None)
+        data["proxy_protocol"] = record["proxy_protocol"].value
+        return data
+
+    def get_many(self, links: List[str]) -> Tuple[List[Optional[Tuple[Optional[ProxyRecord], Optional[str]]]], List[int]]:
+        """批量查找编码结果
+
+        Returns:
+            Tuple: (与 links 对应的 (记录, 错误信息)，未缓存的为None; 未缓存链接的下标)
+        """
+        results = []
+        missing = []
+        for index, link in enumerate(links):
+            entry = self._entry(self.digest(link.strip()))
+            if entry is None:
+                self.misses += 1
+                results.append(None)
+                missing.append(index)
+            else:
+                self.hits += 1
+                record = entry["record"]
+                results.append((self._to_record(record) if record is not None else None, entry["error"]))
+        return results, missing
+
+    def put_many(self, links: List[str], results: List[Tuple[Optional[Mapping[str, Any]], Optional[str]]]) -> None:
+        """批量保存编码结果"""
+        for link, (record, error) in zip(links, results):
+            self._store(self.digest(link.strip()), {
+                "record": self._to_data(record) if record is not None else None,
+                "error": error,
+                "glider": None,
+                "xray": None,
+            })
+
+    def encode(self, link: str) -> ProxyRecord:
+        """编码链接（与 ProxyEncoder.encode 相同，失败时抛出 ValueError）"""
+        results, missing = self.get_many([link])
+        if missing:
+            try:
+                results = [(ProxyEncoder.encode(link), None)]
+            except Exception as e:
+                results = [(None, str(e))]
+            self.put_many([link], results)
+        record, error = results[0]
+        if record is None:
+            raise ValueError(error)
+        return record
+
+    def _derived(self, proxy: Mapping[str, Any], field: str, build: Callable[[Mapping[str, Any]], Any]) -> Any:
+        """获取由记录派生的值（按原始链接缓存，构建失败时缓存错误信息并抛出 ValueError）"""
+        link = proxy.get("raw_link")
+        if not link:
+            return build(proxy)
+
+        digest = self.digest(link.strip())
+        entry = self._entry(digest)
+        if entry is None:
+            entry = {"record": self._to_data(proxy), "error": None, "glider": None, "xray": None}
+        if entry[field] is None:
+            try:
+                entry[field] = {"value": build(proxy)}
+            except Exception as e:
+                entry[field] = {"error": str(e)}
+            self._store(digest, entry)
+
+        derived = entry[field]
+        if "error" in derived:
+            raise ValueError(derived["error"])
+        return derived["value"]
+
+    def glider_link(self, proxy: Mapping[str, Any]) -> str:
+        """代理的glider链接"""
+        return self._derived(proxy, "glider", GliderDecoder.decode)
+
+    def xray_outbound(self, proxy: Mapping[str, Any]) -> Dict[str, Any]:
+        """代理的xray服务器配置"""
+        return self._derived(proxy, "xray", XrayConfigGenerator._generate_server_config)
+
+    def commit(self) -> None:
+        """写入新条目和使用时间，并淘汰超出数量的旧条目"""
+        now = time.time()
+        if self._dirty:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO encoded (digest, record, error, glider, xray, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        digest,
+                        json.dumps(entry["record"], ensure_ascii=False) if entry["record"] is not None else None,
+                        entry["error"],
+                        json.dumps(entry["glider"], ensure_ascii=False) if entry["glider"] is not None else None,
+                        json.dumps(entry["xray"], ensure_ascii=False) if entry["xray"] is not None else None,
+                        now,
+                    )
+                    for digest, entry in self._dirty.items()
+                ]
+            )
+        touched = self._touched - self._dirty.keys()
+        if touched:
+            self.conn.executemany(
+                "UPDATE encoded SET last_used = ? WHERE digest = ?",
+                [(now, digest) for digest in touched]
+            )
+        self._dirty = {}
+        self._touched = set()
+
+        # 按最近使用时间淘汰
+        count = self.conn.execute("SELECT COUNT(*) FROM encoded").fetchone()[0]
+        if count > self.max_entries:
+            self.conn.execute(
+                "DELETE FROM encoded WHERE digest IN "
+                "(SELECT digest FROM encoded ORDER BY last_used ASC LIMIT ?)",
+                (count - self.max_entries,)
+            )
+            if self.logger:
+                self.logger.debug(f"Encode cache evicted {count - self.max_entries} entries")
+        self.conn.commit()
+
+    def close(self) -> None:
+        """提交并关闭数据库"""
+        self.commit()
+        self.conn.close()
@@ -1,13 +1,25 @@
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 from pathlib import Path
 from src.decoders.glider_decoder import GliderDecoder
+from src.utils.config_writer import ConfigWriter
+from src.utils.proxy_ranker import ProxyRanker
 
 class GliderConfigGenerator:
-    """Glider配置生成器"""
+    """Glider配置生成器
+
+    forward按延迟从快到慢排列，只保留前K个（client_config 的 ranking.top_k /
+    ranking.top_k_per_site，0表示全部保留），减少glider健康检查的代理数。
+    """
     
     @staticmethod
-    def generate_client_config(site_proxies: Dict[str, List[Dict[str, Any]]], client_config: Dict) -> str:
-        """生成Glider客户端配置"""
+    def generate_client_config(site_proxies: Dict[str, List[Dict[str, Any]]], client_config: Dict, encode_cache=None,
+                               ranker: Optional[ProxyRanker] = None) -> str:
+        """生成Glider客户端配置
+
+        Args:
+            encode_cache: 链接编码缓存（EncodeCache），传入时复用缓存的glider链接
+            ranker: 代理排序器，未传入时保持结果文件中的顺序
+        """
         config_lines = []
         
         # 基础配置
@@ -22,26 +34,55 @@ class GliderConfigGenerator:
             "\n"
         ])
 
-        # 收集所有代理链接
-        all_forwards = set()
-        for proxies in site_proxies.values():
-            for proxy in proxies:
-                try:
-                    glider_link = GliderDecoder.decode(proxy)
-                    all_forwards.add(f"forward={glider_link}")
-                except Exception:
-                    continue
+        # 收集所有站点中最快的代理
+        ranker = ranker or ProxyRanker()
+        all_forwards = GliderConfigGenerator._forward_lines(
+            ranker.rank_overall(site_proxies),
+            encode_cache,
+            client_config.get('ranking', {}).get('top_k', 0)
+        )
                     
         # 添加所有代理集合
         if all_forwards:
             config_lines.extend([
-                "# All proxies combined",
+                "# All proxies combined (fastest first)",
                 *all_forwards,
                 ""
             ])
         
         return "\n".join(config_lines)
 
+    @staticmethod
+    def select_forwards(proxies: List[Dict[str, Any]], encode_cache=None, limit: int = 0) -> List[Tuple[Dict[str, Any], str]]:
+        """按顺序选出作为forward的代理（跳过无法转换和重复的链接），limit 大于0时最多选出 limit 个
+
+        Returns:
+            List[Tuple[Dict, str]]: [(代理, glider链接)]
+        """
+        forwards = {}
+        for proxy in proxies:
+            if limit and len(forwards) >= limit:
+                break
+            try:
+                glider_link = GliderConfigGenerator._glider_link(proxy, encode_cache)
+            except Exception:
+                continue
+            forwards.setdefault(glider_link, proxy)
+        return [(proxy, glider_link) for glider_link, proxy in forwards.items()]
+
+    @staticmethod
+    def _forward_lines(proxies: List[Dict[str, Any]], encode_cache=None, limit: int = 0) -> List[str]:
+        """按顺序生成forward行（同 select_forwards）"""
+        return [f"forward={glider_link}" for _, glider_link in
+                GliderConfigGenerator.select_forwards(proxies, encode_cache, limit)]
+
+    @staticmethod
+    def _glider_link(proxy: Dict[str, Any], encode_cache=None) -> str:
+        """代理的glider链接"""
+        if encode_cache is not None:
+            return encode_cache.glider_link(proxy)
+        return GliderDecoder.decode(proxy)
+
     @staticmethod
     def _get_domain_rule(site: str) -> str:
         """获取站点的域名规则"""
@@ -56,9 +97,12 @@ class GliderConfigGenerator:
         return domain_map.get(site, f"{site}.com")
 
     @staticmethod
-    def generate_rule_files(site_proxies: Dict[str, List[Dict[str, Any]]], client_config: Dict) -> Dict[str, str]:
-        """生成Glider规则文件"""
+    def generate_rule_files(site_proxies: Dict[str, List[Dict[str, Any]]], client_config: Dict, encode_cache=None,
+                            ranker: Optional[ProxyRanker] = None) -> Dict[str, str]:
+        """生成Glider规则文件（encode_cache、ranker 同 generate_client_config）"""
         rule_files = {}
+        ranker = ranker or ProxyRanker()
+        top_k = client_config.get('ranking', {}).get('top_k_per_site', 0)
         
         # 生成站点规则
         for site, proxies in site_proxies.items():
@@ -78,18 +122,32 @@ class GliderConfigGenerator:
                 ""  # 空行分隔
             ]
             
-            # 添加代理链接
-            forward_lines = []
-            for proxy in proxies:
-                try:
-                    glider_link = GliderDecoder.decode(proxy)
-                    forward_lines.append(f"forward={glider_link}")
-                except Exception:
-                    continue
+            # 添加该站点最快的代理链接
+            forward_lines = GliderConfigGenerator._forward_lines(ranker.rank(proxies, site), encode_cache, top_k)
                     
             if forward_lines:
                 rule_lines.extend(forward_lines)
             
             rule_files[f"{site}.rule"] = "\n".join(rule_lines)
         
-        return rule_files
\ No newline at end of file
+        return rule_files
+
+    @staticmethod
+    def save_config(glider_config: str, rule_files: Dict[str, str], client_config: Dict,
+                    writer: ConfigWriter) -> Path:
+        """写入主配置和规则文件（只写入内容变化的文件），删除已没有代理的站点的规则文件
+
+        Returns:
+            Path: 主配置文件路径
+        """
+        config_dir = Path(client_config['output']['dir'])
+        rules_dir = config_dir / client_config.get('glider', {}).get('rules_dir', 'rules.d')
+        for filename, content in rule_files.items():
+            writer.write(rules_dir / filename, content)
+        for site in client_config['proxy_results']:
+            if f"{site}.rule" not in rule_files:
+                writer.remove(rules_dir / f"{site}.rule")
+
+        glider_config_file = config_dir / 'glider.conf'
+        writer.write(glider_config_file, glider_config)
+        return glider_config_file
@@ -0,0 +1,281 @@
+import asyncio
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from src.encoders.encoder import ProxyEncoder
+from src.utils.config_writer import ConfigWriter
+from src.utils.glider_config_generator import GliderConfigGenerator
+from src.utils.proxy_ranker import ProxyRanker
+
+# 主配置中的代理组（其余代理组以站点名为键）
+DEFAULT_GROUP = None
+
+class GliderSupervisor:
+    """Glider守护 - 运行glider进程并维护其forward
+
+    定期用测试器（GliderTester.measure_batch）检查正在使用的各个代理组的forward：
+    没有通过主配置检查地址的代理从所有代理组中移除，没有通过站点检查地址的代理
+    只从该站点的代理组中移除，空出的位置由结果文件中的下一个代理补上。某个代理组
+    中被替换的forward比例达到 restart_threshold 时才重写配置并重启glider，重启前
+    等待现有连接结束（最多 drain_timeout 秒）。结果文件更新后重新加载代理。
+
+    glider不支持端口复用，也不能只停止接受新连接，重启时只能先停止旧进程再启动新进程：
+    等待期间旧进程仍接受新连接，从旧进程退出到新进程监听就绪（最多 startup_timeout 秒）
+    这段时间监听端口关闭，新连接会失败。
+    """
+
+    def __init__(self, client_config: Dict, tester, encode_cache, ranker_factory: Callable[[], ProxyRanker],
+                 logger=None, glider_path: str = "glider", check_interval: float = 300,
+                 restart_threshold: float = 0.3, drain_timeout: float = 10, startup_timeout: float = 5):
+        """
+        Args:
+            client_config: 客户端配置
+            tester: 检查forward的测试器（需要实现 measure_batch）
+            encode_cache: 链接编码缓存
+            ranker_factory: 创建代理排序器的函数（每次加载结果文件时调用）
+            glider_path: glider可执行文件
+            check_interval: 检查forward的间隔（秒）
+            restart_threshold: 触发重启的代理组forward替换比例
+            drain_timeout: 重启前等待现有连接结束的最长时间（秒）
+            startup_timeout: 等待glider监听端口就绪的最长时间（秒）
+        """
+        self.client_config = client_config
+        self.tester = tester
+        self.encode_cache = encode_cache
+        self.ranker_factory = ranker_factory
+        self.logger = logger
+        self.glider_path = glider_path
+        self.check_interval = check_interval
+        self.restart_threshold = restart_threshold
+        self.drain_timeout = drain_timeout
+        self.startup_timeout = startup_timeout
+
+        glider_config = client_config.get('glider', {})
+        self.listen_port = int(glider_config.get('listen', ':7630').rpartition(':')[2])
+        self.check_url = glider_config.get('check_url', 'http://www.msftconnecttest.com/connecttest.txt#expect=200')
+        self.config_file = Path(client_config['output']['dir']) / 'glider.conf'
+
+        self.process: Optional[asyncio.subprocess.Process] = None
+        # 等待当前glider进程退出的任务（每个进程一个）
+        self._exited: Optional[asyncio.Task] = None
+        self.ranker: Optional[ProxyRanker] = None
+        self.site_proxies: Dict[str, List[Dict[str, Any]]] = {}
+        # 代理组 -> 检查失败的代理（规范标识），DEFAULT_GROUP 中的代理在所有代理组中都不再使用
+        self.dead: Dict[Optional[str], Set[str]] = {}
+        # 正在使用的代理组 {代理组: [(代理, glider链接)]}
+        self.groups: Dict[Optional[str], List[Tuple[Dict[str, Any], str]]] = {}
+        self._results_signature = None
+
+    async def run(self) -> None:
+        """运行glider并持续维护，直到被取消"""
+        self.load_results()
+        self.apply(self.plan())
+        await self.start()
+        try:
+            while True:
+                # 等待检查间隔，glider意外退出时立即重启
+                done, _ = await asyncio.wait({self._exited}, timeout=self.check_interval)
+                if done:
+                    if self.logger:
+                        self.logger.warning(f"Glider exited with code {self.process.returncode}, restarting")
+                    # 避免glider无法启动时频繁重启
+                    await asyncio.sleep(self.startup_timeout)
+                    await self.start()
+                    continue
+
+                if self._signature() != self._results_signature:
+                    if self.logger:
+                        self.logger.info("Proxy results updated, reloading")
+                    self.load_results()
+                else:
+                    await self.check()
+
+                groups = self.plan()
+                if self.is_material(self.groups, groups):
+                    if self.apply(groups):
+                        await self.restart()
+        finally:
+            await self.stop()
+            if self.ranker:
+                self.ranker.close()
+
+    def load_results(self) -> None:
+        """加载结果文件中的代理（清除检查失败记录，重新创建排序器）"""
+        self._results_signature = self._signature()
+        self.site_proxies = {}
+        for site, results_file in self.client_config['proxy_results'].items():
+            proxies = []
+            try:
+                with open(results_file, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        line = line.strip()
+                        if not line or line.startswith('#'):
+                            continue
+                        try:
+                            proxies.append(self.encode_cache.encode(line))
+                        except Exception as e:
+                            if self.logger:
+                                self.logger.debug(f"Failed to encode line: {str(e)}")
+            except OSError:
+                continue
+            if proxies:
+                self.site_proxies[site] = proxies
+        self.dead = {}
+        if self.ranker:
+            self.ranker.close()
+        self.ranker = self.ranker_factory()
+
+    async def check(self) -> None:
+        """检查正在使用的forward，记录检查失败的代理"""
+        target_hosts = self.client_config['target_hosts']
+        checks = [
+            (group, forwards, {'check_url': self.check_url} if group is DEFAULT_GROUP else target_hosts[group])
+            for group, forwards in self.groups.items()
+            if forwards and (group is DEFAULT_GROUP or group in target_hosts)
+        ]
+        results = await asyncio.gather(*(
+            self.tester.measure_batch([proxy for proxy, _ in forwards], target_host)
+            for _, forwards, target_host in checks
+        ))
+
+        for (group, forwards, _), group_results in zip(checks, results):
+            failed = [proxy for (proxy, _), result in zip(forwards, group_results) if not result]
+            self.dead.setdefault(group, set()).update(ProxyEncoder.canonical_key(proxy) for proxy in failed)
+            if self.logger:
+                name = "default" if group is DEFAULT_GROUP else group
+                self.logger.info(f"Glider group {name}: {len(forwards) - len(failed)}/{len(forwards)} forwards alive")
+
+    def plan(self) -> Dict[Optional[str], List[Tuple[Dict[str, Any], str]]]:
+        """按当前的检查结果选出各个代理组的forward（与 GliderConfigGenerator 的选择方式相同）"""
+        ranking = self.client_config.get('ranking', {})
+        overall, sites = self._alive()
+        groups = {DEFAULT_GROUP: GliderConfigGenerator.select_forwards(
+            self.ranker.rank_overall(overall), self.encode_cache, ranking.get('top_k', 0)
+        )}
+        for site, proxies in sites.items():
+            if proxies:
+                groups[site] = GliderConfigGenerator.select_forwards(
+                    self.ranker.rank(proxies, site), self.encode_cache, ranking.get('top_k_per_site', 0)
+                )
+        return groups
+
+    def is_material(self, old: Dict[Optional[str], List[Tuple[Dict[str, Any], str]]],
+                    new: Dict[Optional[str], List[Tuple[Dict[str, Any], str]]]) -> bool:
+        """代理组增减，或某个代理组中被替换的forward比例达到 restart_threshold"""
+        if set(old) != set(new):
+            return True
+        for group, forwards in old.items():
+            old_links = {link for _, link in forwards}
+            new_links = {link for _, link in new[group]}
+            if not old_links:
+                if new_links:
+                    return True
+            elif len(old_links - new_links) / len(old_links) >= self.restart_threshold:
+                return True
+        return False
+
+    def apply(self, groups: Dict[Optional[str], List[Tuple[Dict[str, Any], str]]]) -> bool:
+        """写入与 groups 对应的配置，返回是否有文件改变"""
+        overall, sites = self._alive()
+        glider_config = GliderConfigGenerator.generate_client_config(
+            overall, self.client_config, self.encode_cache, self.ranker
+        )
+        rule_files = GliderConfigGenerator.generate_rule_files(
+            sites, self.client_config, self.encode_cache, self.ranker
+        )
+        writer = ConfigWriter(self.logger)
+        GliderConfigGenerator.save_config(glider_config, rule_files, self.client_config, writer)
+        self.groups = groups
+        if self.logger and writer.changed:
+            self.logger.info(f"Glider config updated: {', '.join(str(path) for path in writer.changed)}")
+        return bool(writer.changed)
+
+    async def start(self) -> None:
+        """启动glider并等待监听端口就绪"""
+        self.process = await asyncio.create_subprocess_exec(
+            self.glider_path, "-config", str(self.config_file.resolve()),
+            cwd=str(self.config_file.parent),
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        self._exited = asyncio.ensure_future(self.process.wait())
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline and self.process.returncode is None:
+            try:
+                _, writer = await asyncio.open_connection('127.0.0.1', self.listen_port)
+                writer.close()
+                if self.logger:
+                    self.logger.info(f"Glider started (pid {self.process.pid}) on port {self.listen_port}")
+                return
+            except OSError:
+                await asyncio.sleep(0.1)
+        if self.logger:
+            self.logger.error(f"Glider did not start listening on port {self.listen_port}")
+
+    async def stop(self) -> None:
+        """停止glider"""
+        process, self.process = self.process, None
+        exited, self._exited = self._exited, None
+        if process is None:
+            return
+        if process.returncode is None:
+            process.terminate()
+            try:
+                await asyncio.wait_for(asyncio.shield(exited), timeout=5)
+            except asyncio.TimeoutError:
+                process.kill()
+        await exited
+
+    async def restart(self) -> None:
+        """等待现有连接结束后重启glider（监听端口在旧进程退出到新进程就绪之间关闭）"""
+        deadline = time.monotonic() + self.drain_timeout
+        while time.monotonic() < deadline and self.active_connections() > 0:
+            await asyncio.sleep(0.5)
+        if self.logger:
+            self.logger.info(f"Restarting glider ({self.active_connections()} connections still open)")
+        stopped = time.monotonic()
+        await self.stop()
+        await self.start()
+        if self.logger:
+            self.logger.info(f"Glider port was closed for {time.monotonic() - stopped:.2f}s during restart")
+
+    def active_connections(self) -> int:
+        """监听端口上已建立的连接数（读取 /proc/net/tcp，不支持时返回0）"""
+        count = 0
+        for table in ("/proc/net/tcp", "/proc/net/tcp6"):
+            try:
+                with open(table, 'r') as f:
+                    next(f, None)
+                    for line in f:
+                        fields = line.split()
+                        # 状态01为ESTABLISHED，本地地址为 十六进制IP:十六进制端口
+                        if len(fields) > 3 and fields[3] == "01" \
+                                and int(fields[1].rpartition(':')[2], 16) == self.listen_port:
+                            count += 1
+            except (OSError, ValueError):
+                continue
+        return count
+
+    def _alive(self) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, List[Dict[str, Any]]]]:
+        """去掉检查失败的代理，返回 (主配置使用的代理, 各站点规则使用的代理)"""
+        dead = self.dead.get(DEFAULT_GROUP, set())
+        overall = {}
+        sites = {}
+        for site, proxies in self.site_proxies.items():
+            site_dead = self.dead.get(site, set())
+            overall[site] = [proxy for proxy in proxies if ProxyEncoder.canonical_key(proxy) not in dead]
+            sites[site] = [proxy for proxy in overall[site] if ProxyEncoder.canonical_key(proxy) not in site_dead]
+        return overall, sites
+
+    def _signature(self) -> Tuple:
+        """结果文件（及测试指标文件）的修改时间"""
+        signature = []
+        for results_file in self.client_config['proxy_results'].values():
+            for path in (results_file, os.path.splitext(results_file)[0] + ".json"):
+                try:
+                    signature.append((path, os.stat(path).st_mtime_ns))
+                except OSError:
+                    signature.append((path, None))
+        return tuple(signature)
@@ -0,0 +1,227 @@
+import json
+import os
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional
+
+from src.encoders.encoder import ProxyEncoder
+
+class HealthStore:
+    """代理健康状态数据库（SQLite）
+
+    记录每个代理最近一次测试的结果、每个站点最后成功/失败的时间、
+    延迟历史和连续失败次数。延迟历史中TCP延迟与站点无关（site为空字符串），
+    其余指标按站点分别记录。最近测试成功的代理在 fresh_ttl 内直接复用结果，
+    连续失败的代理按指数退避推迟重测。
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS proxies (
+        key TEXT PRIMARY KEY,
+        last_tested REAL NOT NULL,
+        next_test REAL NOT NULL,
+        consecutive_failures INTEGER NOT NULL DEFAULT 0,
+        sites TEXT NOT NULL DEFAULT '[]',
+        address TEXT,
+        family TEXT
+    );
+    CREATE TABLE IF NOT EXISTS site_results (
+        key TEXT NOT NULL,
+        site TEXT NOT NULL,
+        last_success REAL,
+        last_failure REAL,
+        PRIMARY KEY (key, site)
+    );
+    CREATE TABLE IF NOT EXISTS latency_history (
+        key TEXT NOT NULL,
+        stage TEXT NOT NULL,
+        tested_at REAL NOT NULL,
+        latency REAL NOT NULL,
+        site TEXT NOT NULL DEFAULT ''
+    );
+    CREATE INDEX IF NOT EXISTS idx_latency_key ON latency_history (key, stage, tested_at);
+    """
+
+    # 旧版本数据库缺少的列 {表: [(列名, 定义)]}
+    MIGRATIONS = {
+        "proxies": [("address", "TEXT"), ("family", "TEXT")],
+        "latency_history": [("site", "TEXT NOT NULL DEFAULT ''")],
+    }
+
+    def __init__(self, db_path: str = "results/cache/health.db", fresh_ttl: float = 3600,
+                 backoff_base: float = 3600, backoff_max: float = 7 * 86400,
+                 history_size: int = 20, commit_interval: int = 100, logger=None):
+        """
+        Args:
+            db_path: 数据库文件路径
+            fresh_ttl: 测试成功的结果在多长时间内（秒）直接复用
+            backoff_base: 第一次失败后的重测间隔（秒），之后每次失败翻倍
+            backoff_max: 最大重测间隔（秒）
+            history_size: 每个代理保留的延迟记录条数
+            commit_interval: 每记录多少次结果提交一次事务
+            logger: 日志记录器
+        """
+        self.db_path = db_path
+        self.fresh_ttl = fresh_ttl
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.history_size = history_size
+        self.commit_interval = commit_interval
+        self.logger = logger
+        self._pending = 0
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.executescript(self.SCHEMA)
+        self._migrate()
+
+    def _migrate(self) -> None:
+        """为旧版本数据库补充缺少的列"""
+        for table, columns in self.MIGRATIONS.items():
+            existing = {row[1] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+            for name, definition in columns:
+                if name not in existing:
+                    self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+        self.conn.commit()
+
+    @staticmethod
+    def proxy_key(proxy_info: Dict[str, Any]) -> str:
+        """代理标识（规范标识，与名称和参数顺序无关）"""
+        return ProxyEncoder.canonical_key(proxy_info)
+
+    def cached_sites(self, key: str, now: Optional[float] = None) -> Optional[List[str]]:
+        """获取可以复用的测试结果
+
+        Returns:
+            Optional[List[str]]: 需要重新测试时返回None；否则返回上次测试可访问的站点
+            （处于失败退避期的代理返回空列表）
+        """
+        now = time.time() if now is None else now
+        row = self.conn.execute(
+            "SELECT next_test, sites FROM proxies WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[0] <= now:
+            return None
+        return json.loads(row[1])
+
+    def record(self, key: str, sites_ok: List[str], sites_tested: List[str],
+               latency: Optional[Dict[str, float]] = None, now: Optional[float] = None,
+               site_latency: Optional[Dict[str, Dict[str, float]]] = None,
+               route: Optional[Dict[str, str]] = None) -> None:
+        """记录一次测试结果
+
+        Args:
+            key: 代理标识
+            sites_ok: 可访问的站点
+            sites_tested: 测试过的站点（未通过TCP测试时为空）
+            latency: 与站点无关的延迟（秒），如 {'tcp': 0.05}
+            site_latency: 各站点的指标 {站点: {'ttfb': 0.3, 'throughput': 1000.0, ...}}
+            route: TCP测试连接成功的地址 {'address': IP, 'family': 'ipv4'/'ipv6'}
+        """
+        now = time.time() if now is None else now
+        row = self.conn.execute(
+            "SELECT consecutive_failures FROM proxies WHERE key = ?", (key,)
+        ).fetchone()
+        failures = 0 if sites_ok else (row[0] if row else 0) + 1
+
+        if sites_ok:
+            next_test = now + self.fresh_ttl
+        else:
+            next_test = now + min(self.backoff_max, self.backoff_base * 2 ** (failures - 1))
+
+        route = route or {}
+        self.conn.execute(
+            "INSERT OR REPLACE INTO proxies (key, last_tested, next_test, consecutive_failures, sites, address, family) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, now, next_test, failures, json.dumps(sites_ok), route.get("address"), route.get("family"))
+        )
+
+        for site in sites_tested:
+            column = "last_success" if site in sites_ok else "last_failure"
+            self.conn.execute(
+                "INSERT OR IGNORE INTO site_results (key, site) VALUES (?, ?)",
+                (key, site)
+            )
+            self.conn.execute(
+                f"UPDATE site_results SET {column} = ? WHERE key = ? AND site = ?",
+                (now, key, site)
+            )
+
+        rows = [("", stage, value) for stage, value in (latency or {}).items()]
+        rows += [
+            (site, stage, value)
+            for site, metrics in (site_latency or {}).items()
+            for stage, value in metrics.items()
+        ]
+        for site, stage, value in rows:
+            self.conn.execute(
+                "INSERT INTO latency_history (key, site, stage, tested_at, latency) VALUES (?, ?, ?, ?, ?)",
+                (key, site, stage, now, value)
+            )
+            # 只保留最近 history_size 条
+            self.conn.execute(
+                "DELETE FROM latency_history WHERE key = ? AND site = ? AND stage = ? AND tested_at NOT IN "
+                "(SELECT tested_at FROM latency_history WHERE key = ? AND site = ? AND stage = ? "
+                "ORDER BY tested_at DESC LIMIT ?)",
+                (key, site, stage, key, site, stage, self.history_size)
+            )
+
+        self._pending += 1
+        if self._pending >= self.commit_interval:
+            self.commit()
+
+    def latency_history(self, key: str, stage: str, site: str = "") -> List[float]:
+        """获取延迟历史（按时间从新到旧，site为空时获取与站点无关的记录）"""
+        rows = self.conn.execute(
+            "SELECT latency FROM latency_history WHERE key = ? AND site = ? AND stage = ? ORDER BY tested_at DESC",
+            (key, site, stage)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def latest_latency(self, key: str, site: str = "") -> Dict[str, float]:
+        """获取各阶段最近一次的延迟（及吞吐量）
+
+        包含与站点无关的记录（如TCP延迟）和 site 站点的记录，site为空时只包含前者。
+        """
+        rows = self.conn.execute(
+            "SELECT stage, latency FROM latency_history WHERE key = ? AND site IN ('', ?) "
+            "ORDER BY site = ?, tested_at",
+            (key, site, site)
+        ).fetchall()
+        # 站点的记录排在后面；按时间升序，后面的记录覆盖前面的
+        return dict(rows)
+
+    def route(self, key: str) -> Dict[str, str]:
+        """获取最近一次TCP测试连接成功的地址和地址族（没有记录时为空）"""
+        row = self.conn.execute(
+            "SELECT address, family FROM proxies WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return {}
+        return {name: value for name, value in zip(("address", "family"), row) if value is not None}
+
+    def site_status(self, key: str) -> Dict[str, Dict[str, Optional[float]]]:
+        """获取各站点最后成功/失败的时间"""
+        rows = self.conn.execute(
+            "SELECT site, last_success, last_failure FROM site_results WHERE key = ?", (key,)
+        ).fetchall()
+        return {site: {"last_success": success, "last_failure": failure} for site, success, failure in rows}
+
+    def consecutive_failures(self, key: str) -> int:
+        """获取连续失败次数"""
+        row = self.conn.execute(
+            "SELECT consecutive_failures FROM proxies WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def commit(self) -> None:
+        """提交事务"""
+        self.conn.commit()
+        self._pending = 0
+
+    def close(self) -> None:
+        """提交并关闭数据库"""
+        self.commit()
+        self.conn.close()
@@ -0,0 +1,87 @@
+import asyncio
+from typing import Any, AsyncIterable, Awaitable, Callable, List, Optional
+
+# 队列结束标记
+_END = object()
+
+class Stage:
+    """流水线阶段"""
+
+    def __init__(self, name: str, handler: Callable[[Any], Awaitable[Any]], workers: int = 1,
+                 queue_size: int = 256, expand: bool = False):
+        """
+        Args:
+            name: 阶段名称（用于日志）
+            handler: 处理函数，返回None表示丢弃该条目
+            workers: 并发处理的协程数
+            queue_size: 输入队列容量（队列满时上游阻塞）
+            expand: 处理结果为可迭代对象时逐个传递给下一阶段
+        """
+        self.name = name
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+        self.expand = expand
+
+class Pipeline:
+    """基于有界队列的流式处理流水线
+
+    数据源的条目依次经过各阶段，阶段之间用有界队列连接，
+    上游条目到达后立即向下游传递，队列满时形成背压。
+    """
+
+    def __init__(self, stages: List[Stage], logger=None):
+        if not stages:
+            raise ValueError("Pipeline requires at least one stage")
+        self.stages = stages
+        self.logger = logger
+
+    async def run(self, source: AsyncIterable[Any]) -> None:
+        """运行流水线直到数据源耗尽且所有条目处理完毕"""
+        queues = [asyncio.Queue(maxsize=stage.queue_size) for stage in self.stages]
+        tasks: List[asyncio.Task] = []
+
+        for index, stage in enumerate(self.stages):
+            output = queues[index + 1] if index + 1 < len(queues) else None
+            next_workers = self.stages[index + 1].workers if output is not None else 0
+            remaining = [stage.workers]
+            for _ in range(stage.workers):
+                tasks.append(asyncio.create_task(
+                    self._worker(stage, queues[index], output, next_workers, remaining)
+                ))
+
+        try:
+            async for item in source:
+                await queues[0].put(item)
+            for _ in range(self.stages[0].workers):
+                await queues[0].put(_END)
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _worker(self, stage: Stage, input_queue: asyncio.Queue, output_queue: Optional[asyncio.Queue],
+                      next_workers: int, remaining: List[int]) -> None:
+        """阶段工作协程"""
+        while True:
+            item = await input_queue.get()
+            if item is _END:
+                break
+
+            try:
+                result = await stage.handler(item)
+            except Exception as e:
+                if self.logger:
+                    self.logger.debug(f"Pipeline stage {stage.name} failed: {str(e)}")
+                continue
+
+            if result is None or output_queue is None:
+                continue
+            for output in (result if stage.expand else (result,)):
+                await output_queue.put(output)
+
+        # 本阶段最后一个工作协程退出时通知下游结束
+        remaining[0] -= 1
+        if remaining[0] == 0 and output_queue is not None:
+            for _ in range(next_workers):
+                await output_queue.put(_END)
@@ -0,0 +1,73 @@
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from src.encoders.encoder import ProxyEncoder
+from src.utils.health_store import HealthStore
+
+class ProxyRanker:
+    """代理排序 - 按测得的延迟和历史成功情况排序，最快的代理排在前面
+
+    延迟取结果文件旁的测试指标（FileOutput.load_metrics），依次使用首字节时间、
+    总时间和TCP连接时间；没有测量数据的代理排在最后。传入健康状态数据库时，
+    连续失败的次数和站点最近一次失败会按 failure_penalty 放大延迟。
+    """
+
+    # 没有测量数据的代理的延迟（秒）
+    UNMEASURED = 60.0
+
+    def __init__(self, site_metrics: Optional[Dict[str, Dict[str, Dict[str, float]]]] = None,
+                 health_store: Optional[HealthStore] = None, failure_penalty: float = 0.5):
+        """
+        Args:
+            site_metrics: {站点: {链接: 测试指标}}
+            health_store: 健康状态数据库（可选，由排序器关闭）
+            failure_penalty: 每次失败增加的延迟比例
+        """
+        self.site_metrics = site_metrics or {}
+        self.health_store = health_store
+        self.failure_penalty = failure_penalty
+
+    def score(self, proxy: Mapping[str, Any], site: Optional[str] = None) -> Tuple[float, float]:
+        """排序分数（越小越快）：(调整后的延迟, -吞吐量)"""
+        metrics = self.site_metrics.get(site, {}).get(proxy.get("raw_link"), {}) if site else {}
+        latency = metrics.get("ttfb") or metrics.get("total") or metrics.get("tcp") or self.UNMEASURED
+        return latency * (1 + self.failure_penalty * self._failures(proxy, site)), -(metrics.get("throughput") or 0)
+
+    def rank(self, proxies: List[Mapping[str, Any]], site: Optional[str] = None) -> List[Mapping[str, Any]]:
+        """对一个站点的代理排序（同一服务器的代理只保留最快的一个）"""
+        return self._unique(sorted(proxies, key=lambda proxy: self.score(proxy, site)))
+
+    def rank_overall(self, site_proxies: Dict[str, List[Mapping[str, Any]]]) -> List[Mapping[str, Any]]:
+        """对所有站点的代理排序（代理的分数取其在各站点中最好的分数）"""
+        scored = []
+        for site, proxies in site_proxies.items():
+            for proxy in proxies:
+                # 序号保证分数相同时保持原顺序
+                scored.append((self.score(proxy, site), len(scored), proxy))
+        scored.sort(key=lambda item: item[:2])
+        return self._unique([proxy for _, _, proxy in scored])
+
+    def close(self) -> None:
+        """关闭健康状态数据库"""
+        if self.health_store is not None:
+            self.health_store.close()
+            self.health_store = None
+
+    def _failures(self, proxy: Mapping[str, Any], site: Optional[str]) -> int:
+        """失败次数：连续失败次数，站点最近一次测试失败时加一"""
+        if self.health_store is None:
+            return 0
+        key = HealthStore.proxy_key(proxy)
+        failures = self.health_store.consecutive_failures(key)
+        if site:
+            status = self.health_store.site_status(key).get(site)
+            if status and (status["last_failure"] or 0) > (status["last_success"] or 0):
+                failures += 1
+        return failures
+
+    @staticmethod
+    def _unique(proxies: List[Mapping[str, Any]]) -> List[Mapping[str, Any]]:
+        """按规范标识去重，保持顺序"""
+        unique = {}
+        for proxy in proxies:
+            unique.setdefault(ProxyEncoder.canonical_key(proxy), proxy)
+        return list(unique.values())
@@ -0,0 +1,45 @@
+import time
+from typing import Callable, Dict, Hashable, Iterable, List, Optional
+
+class Scheduler:
+    """周期任务计划 - 每个键（订阅源、任务名）按各自的间隔独立到期
+
+    从未运行过的键立即到期；mark 记录一次运行，下次在 间隔 秒后到期。
+    """
+
+    def __init__(self, default_interval: float, intervals: Optional[Dict[Hashable, float]] = None,
+                 clock: Callable[[], float] = time.time):
+        """
+        Args:
+            default_interval: 默认间隔（秒）
+            intervals: 单独配置间隔的键 {键: 间隔}
+            clock: 时钟（测试时替换）
+        """
+        self.default_interval = default_interval
+        self.intervals = dict(intervals or {})
+        self.clock = clock
+        self.last_run: Dict[Hashable, float] = {}
+
+    def interval(self, key: Hashable) -> float:
+        """键的运行间隔"""
+        return self.intervals.get(key, self.default_interval)
+
+    def next_run(self, key: Hashable) -> float:
+        """键的下次运行时间（从未运行时为0）"""
+        last = self.last_run.get(key)
+        return 0.0 if last is None else last + self.interval(key)
+
+    def due(self, keys: Iterable[Hashable], now: Optional[float] = None) -> List[Hashable]:
+        """已到期的键（保持传入的顺序）"""
+        now = self.clock() if now is None else now
+        return [key for key in keys if self.next_run(key) <= now]
+
+    def mark(self, key: Hashable, now: Optional[float] = None) -> None:
+        """记录键的一次运行"""
+        self.last_run[key] = self.clock() if now is None else now
+
+    def wait_time(self, keys: Iterable[Hashable], now: Optional[float] = None) -> float:
+        """距离最早到期的键的时间（秒，已有键到期时为0，没有键时为默认间隔）"""
+        now = self.clock() if now is None else now
+        next_runs = [self.next_run(key) for key in keys]
+        return max(0.0, min(next_runs) - now) if next_runs else self.default_interval
@@ -1,4 +1,4 @@
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Mapping
 import json
 import uuid
 
@@ -6,8 +6,12 @@ class XrayConfigGenerator:
     """Xray配置生成器"""
     
     @staticmethod
-    def generate_client_config(site_proxies: Dict[str, List[Dict[str, Any]]], client_config: Dict) -> Dict:
-        """生成Xray客户端配置"""
+    def generate_client_config(site_proxies: Dict[str, List[Mapping[str, Any]]], client_config: Dict, encode_cache=None) -> Dict:
+        """生成Xray客户端配置
+
+        Args:
+            encode_cache: 链接编码缓存（EncodeCache），传入时复用缓存的服务器配置
+        """
         config = {
             "log": {
                 "loglevel": "warning"
@@ -44,7 +48,7 @@ class XrayConfigGenerator:
             site_name = site_config.get('display_name', site)
             
             # 生成出站配置
-            outbound = XrayConfigGenerator._generate_outbound(proxies, site)
+            outbound = XrayConfigGenerator._generate_outbound(proxies, site, encode_cache)
             if outbound:
                 config['outbounds'].append(outbound)
                 outbound_tags.append(outbound['tag'])
@@ -104,7 +108,7 @@ class XrayConfigGenerator:
         return inbound
     
     @staticmethod
-    def _generate_outbound(proxies: List[Dict[str, Any]], tag: str) -> Dict:
+    def _generate_outbound(proxies: List[Mapping[str, Any]], tag: str, encode_cache=None) -> Dict:
         """生成出站配置"""
         # 过滤出支持的代理
         supported_proxies = [p for p in proxies if p['proxy_protocol'].value in ('ss', 'vmess', 'vless', 'trojan')]
@@ -117,14 +121,15 @@ class XrayConfigGenerator:
             "tag": f"proxy-{tag}",
             "settings": {
                 "servers": [
-                    XrayConfigGenerator._generate_server_config(proxy)
+                    encode_cache.xray_outbound(proxy) if encode_cache is not None
+                    else XrayConfigGenerator._generate_server_config(proxy)
                     for proxy in supported_proxies
                 ]
             }
         }
     
     @staticmethod
-    def _generate_server_config(proxy: Dict[str, Any]) -> Dict:
+    def _generate_server_config(proxy: Mapping[str, Any]) -> Dict:
         """生成服务器配置"""
         protocol = proxy['proxy_protocol'].value
         
@@ -1,4 +1,5 @@
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Mapping, Tuple
+import ipaddress
 import re
 import yaml
 
@@ -9,7 +10,7 @@ class ProxyValidator:
         with open(config_path, 'r') as f:
             self.config = yaml.safe_load(f)
             
-    def validate(self, proxy_info: Dict[str, Any]) -> Tuple[bool, str]:
+    def validate(self, proxy_info: Mapping[str, Any]) -> Tuple[bool, str]:
         """验证代理配置的有效性"""
         try:
             # 获取协议类型
@@ -20,7 +21,7 @@ class ProxyValidator:
                 return False, "Missing server or port"
                 
             # 验证服务器地址格式
-            if not re.match(r'^[a-zA-Z0-9.-]+$', proxy_info["server"]):
+            if not self._is_valid_server(proxy_info["server"]):
                 return False, f"Invalid server address format: {proxy_info['server']}"
                 
             # 根据协议验证
@@ -44,6 +45,17 @@ class ProxyValidator:
         except Exception as e:
             return False, f"Validation error: {str(e)}"
             
+    @staticmethod
+    def _is_valid_server(server: str) -> bool:
+        """验证服务器地址（域名、IPv4或IPv6，IPv6可带方括号）"""
+        if re.match(r'^[a-zA-Z0-9.-]+$', server):
+            return True
+        try:
+            ipaddress.IPv6Address(server.strip("[]"))
+            return True
+        except ValueError:
+            return False
+            
     def _validate_ss(self, info: Dict[str, Any]) -> Tuple[bool, str]:
         """验证Shadowsocks配置"""
         if not info.get("method") or not info.get("password"):
@@ -30,11 +30,12 @@ def test_generate_config(tmp_path):
     # 确保有代理配置
     assert len(forward_lines) > 0
     
-    # 验证代理格式
+    # 验证代理格式：forward为逗号分隔的链，最后一层是代理协议，前面是tls/ws等传输层
     for line in forward_lines:
         assert line.startswith("forward=")
-        protocol = line.split("://")[0].split("=")[1]
-        assert protocol in ["ss", "ssr", "vmess", "vless", "trojan", "ssh"]
+        layers = [layer.split("://")[0] for layer in line[len("forward="):].split(",")]
+        assert layers[-1] in ["ss", "ssr", "vmess", "vless", "trojan", "ssh"]
+        assert all(layer in ["tls", "ws"] for layer in layers[:-1])
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"]) 
\ No newline at end of file
@@ -0,0 +1,87 @@
+import pickle
+import pytest
+from concurrent.futures import ProcessPoolExecutor
+from src.encoders.encoder import ProxyEncoder, ProxyProtocol
+from src.models.proxy_record import ProxyRecord
+
+def key(link: str) -> str:
+    return ProxyEncoder.canonical_key(ProxyEncoder.encode(link))
+
+def test_canonical_key_ignores_cosmetic_differences():
+    """测试名称、参数顺序、大小写和base64填充不影响规范标识"""
+    assert key("trojan://pw@Example.com:443?sni=a.com&type=ws&path=/x#HK 01") == \
+        key("trojan://pw@example.com:443?type=ws&path=/x&sni=A.com#香港")
+    assert key("ss://YWVzLTEyOC1nY206dGVzdA@1.2.3.4:8388#a") == \
+        key("ss://YWVzLTEyOC1nY206dGVzdA==@1.2.3.4:8388#b")
+    assert key("ss://YWVzLTEyOC1nY206dGVzdA@[2001:DB8::1]:8388#a") == \
+        key("ss://YWVzLTEyOC1nY206dGVzdA@[2001:db8::1]:8388#b")
+
+def test_canonical_key_keeps_semantic_differences():
+    """测试端口、认证信息和传输参数不同的代理标识不同"""
+    base = key("trojan://pw@example.com:443?type=ws&path=/x#a")
+    assert base != key("trojan://pw@example.com:8443?type=ws&path=/x#a")
+    assert base != key("trojan://other@example.com:443?type=ws&path=/x#a")
+    assert base != key("trojan://pw@example.com:443?type=ws&path=/y#a")
+    assert base != key("vless://pw@example.com:443?type=ws&path=/x#a")
+
+def test_host_port_round_trip():
+    """测试服务器地址和端口与编码时的分离方式互逆（IPv6地址加方括号）"""
+    for host_port in ("1.2.3.4:8388", "example.com:443", "[2001:db8::1]:8388"):
+        proxy = ProxyEncoder.encode(f"ss://YWVzLTEyOC1nY206dGVzdA@{host_port}#a")
+        assert ProxyEncoder.host_port(proxy) == host_port
+
+def test_proxy_record_mapping_compat():
+    """测试ProxyRecord兼容字典用法"""
+    record = ProxyEncoder.encode("trojan://pw@example.com:443?sni=a.com#HK")
+    assert isinstance(record, ProxyRecord)
+    assert record["server"] == "example.com"
+    assert record.get("flow") is None and "flow" not in record
+    assert record.get("sni") == "a.com" and "sni" in record
+    assert record.proxy_type == "trojan"
+    assert record == record.to_dict()
+    assert dict(record)["proxy_protocol"] is ProxyProtocol.TROJAN
+    with pytest.raises(KeyError):
+        record["flow"]
+
+    # 不在预定义字段中的键保存在额外字典中
+    record["tcp_rtt"] = 0.1
+    assert record["tcp_rtt"] == 0.1 and "tcp_rtt" in list(record)
+    del record["tcp_rtt"]
+    assert "tcp_rtt" not in record
+
+    assert pickle.loads(pickle.dumps(record)) == record
+    assert not hasattr(record, "__dict__")
+
+def test_proxy_record_interns_repeated_strings():
+    """测试重复出现的字段值共享同一个字符串对象"""
+    a = ProxyEncoder.encode("trojan://a@" + "cdn.example.com" + ":443?sni=cdn.example.com&type=ws#a")
+    b = ProxyEncoder.encode("trojan://b@" + "cdn.example.com" + ":443?sni=cdn.example.com&type=ws#b")
+    assert a["server"] is b["server"]
+    assert a["sni"] is b["sni"]
+
+LINKS = [
+    "ss://YWVzLTEyOC1nY206dGVzdA@1.2.3.4:8388#a",
+    "invalid://link",
+    "trojan://pw@example.com:443?sni=a.com#b",
+    "vless://11111111-1111-1111-1111-111111111111@[::1]:443?type=ws&path=/x#c",
+    "trojan://missing-port",
+]
+
+def test_encode_many_serial():
+    """测试批量编码按顺序返回结果和错误"""
+    results = ProxyEncoder.encode_many(LINKS, workers=1)
+    assert [record is None for record, _ in results] == [False, True, False, False, True]
+    assert results[1][1].startswith("Unsupported protocol")
+    assert results[2][0] == ProxyEncoder.encode(LINKS[2])
+
+def test_encode_many_parallel_matches_serial():
+    """测试进程池并行编码与串行结果一致"""
+    links = LINKS * 5
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        parallel = ProxyEncoder.encode_many(links, chunk_size=3, min_parallel=1, executor=pool)
+    serial = ProxyEncoder.encode_many(links, workers=1)
+    assert parallel == serial
+    assert isinstance(parallel[0][0], ProxyRecord)
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,85 @@
+import pytest
+from aiohttp import web
+from src.fetchers.fetch_cache import FetchCache, NOT_MODIFIED
+from src.fetchers.http_fetcher import HttpFetcher
+
+@pytest.fixture
+async def etag_server():
+    """启动支持ETag的本地订阅服务器"""
+    requests = []
+
+    async def sub(request):
+        requests.append(dict(request.headers))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304)
+        return web.Response(text="ss://a\nss://b", headers={"ETag": '"v1"'})
+
+    app = web.Application()
+    app.router.add_get('/sub', sub)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}/sub", requests
+    await runner.cleanup()
+
+def test_digest_match(tmp_path):
+    """测试内容未变化时返回缓存链接"""
+    cache = FetchCache(cache_file=str(tmp_path / "cache.json"))
+    assert cache.get_links("u", "content") is None
+
+    cache.put_links("u", "content", ["ss://a"])
+    assert cache.get_links("u", "content") == ["ss://a"]
+    assert cache.get_links("u", "changed") is None
+
+    # 持久化后重新加载
+    cache.save()
+    reloaded = FetchCache(cache_file=str(tmp_path / "cache.json"))
+    assert reloaded.get_links("u", "content") == ["ss://a"]
+
+def test_conditional_headers_require_links(tmp_path):
+    """测试只有在解析成功后才发送条件请求头"""
+    cache = FetchCache(cache_file=str(tmp_path / "cache.json"))
+    cache.record_validators("u", '"v1"', "Mon, 01 Jan 2024 00:00:00 GMT")
+    assert cache.conditional_headers("u") == {}
+
+    cache.put_links("u", "content", ["ss://a"])
+    assert cache.conditional_headers("u") == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"
+    }
+
+async def test_not_modified(etag_server, tmp_path):
+    """测试304响应复用缓存链接"""
+    url, requests = etag_server
+    cache = FetchCache(cache_file=str(tmp_path / "cache.json"))
+    fetcher = HttpFetcher(max_retries=0, cache=cache)
+
+    content = await fetcher.fetch(url)
+    assert content == "ss://a\nss://b"
+    cache.put_links(url, content, ["ss://a", "ss://b"])
+
+    content = await fetcher.fetch(url)
+    assert content is NOT_MODIFIED
+    assert requests[-1]["If-None-Match"] == '"v1"'
+    assert cache.get_links(url, content) == ["ss://a", "ss://b"]
+
+async def test_stream_parse_error(etag_server, tmp_path):
+    """测试流式解析失败时与空响应相同：返回None并重试，不记录校验信息"""
+    url, requests = etag_server
+    cache = FetchCache(cache_file=str(tmp_path / "cache.json"))
+    fetcher = HttpFetcher(max_retries=1, cache=cache)
+
+    async def broken(chunks):
+        async for _ in chunks:
+            pass
+        raise ValueError("bad content")
+        yield
+
+    assert await fetcher.fetch(url, broken) is None
+    assert len(requests) == 2
+    assert url not in cache._pending
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
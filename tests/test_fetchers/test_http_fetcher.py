@@ -0,0 +1,81 @@
+import asyncio
+import base64
+import pytest
+from aiohttp import web
+from src.fetchers.fetch_cache import FetchCache
+from src.fetchers.http_fetcher import HttpFetcher, StreamedLinks
+from src.parsers import SubscriptionParser
+
+@pytest.fixture
+async def subscription_server():
+    """启动本地订阅服务器"""
+    async def fast(request):
+        return web.Response(text="ss://fast")
+
+    async def slow(request):
+        await asyncio.sleep(0.3)
+        return web.Response(text="ss://slow")
+
+    async def missing(request):
+        return web.Response(status=404)
+
+    app = web.Application()
+    app.router.add_get('/fast', fast)
+    app.router.add_get('/slow', slow)
+    app.router.add_get('/missing', missing)
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}"
+    await runner.cleanup()
+
+async def test_fetch(subscription_server):
+    """测试单个URL获取"""
+    fetcher = HttpFetcher(connect_timeout=5, max_retries=0)
+    assert await fetcher.fetch(f"{subscription_server}/fast") == "ss://fast"
+    assert await fetcher.fetch(f"{subscription_server}/missing") is None
+
+async def test_fetch_many_yields_as_completed(subscription_server):
+    """测试并发获取按完成顺序返回"""
+    fetcher = HttpFetcher(connect_timeout=5, max_retries=0)
+    urls = [f"{subscription_server}/slow", f"{subscription_server}/fast", f"{subscription_server}/missing"]
+
+    results = []
+    async with fetcher:
+        async for url, content in fetcher.fetch_many(urls):
+            results.append((url, content))
+
+    assert len(results) == 3
+    assert results[-1] == (f"{subscription_server}/slow", "ss://slow")
+    assert dict(results)[f"{subscription_server}/fast"] == "ss://fast"
+    assert dict(results)[f"{subscription_server}/missing"] is None
+
+async def test_fetch_local_file(tmp_path):
+    """测试读取本地订阅文件"""
+    path = tmp_path / "sub.txt"
+    path.write_text("trojan://local")
+    fetcher = HttpFetcher()
+    results = [item async for item in fetcher.fetch_many([str(path)])]
+    assert results == [(str(path), "trojan://local")]
+
+async def test_fetch_many_stream(subscription_server, tmp_path):
+    """测试流式获取：边读取边解析，并返回内容摘要"""
+    content = "\n".join(f"ss://node{i}" for i in range(1000))
+    path = tmp_path / "sub.txt"
+    path.write_text(base64.b64encode(content.encode()).decode())
+
+    fetcher = HttpFetcher(connect_timeout=5, max_retries=0, chunk_size=7)
+    urls = [str(path), f"{subscription_server}/fast", f"{subscription_server}/missing"]
+    results = dict([item async for item in fetcher.fetch_many(urls, SubscriptionParser().parse_stream)])
+
+    assert isinstance(results[str(path)], StreamedLinks)
+    assert results[str(path)].links == content.splitlines()
+    assert results[str(path)].digest == FetchCache.digest(path.read_text())
+    assert results[f"{subscription_server}/fast"].links == ["ss://fast"]
+    assert results[f"{subscription_server}/missing"] is None
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
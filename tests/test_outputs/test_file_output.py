@@ -0,0 +1,54 @@
+import pytest
+from src.encoders.encoder import ProxyEncoder
+from src.outputs.file_output import FileOutput
+from src.testers.test_result import TestResult
+
+LINKS = [
+    "ss://YWVzLTEyOC1nY206dGVzdA@192.168.100.1:8888#a",
+    "trojan://password@192.168.100.2:443?security=tls#b",
+]
+
+def test_save_with_metrics(tmp_path):
+    """测试链接和测试指标分别保存，按链接读取指标"""
+    output = FileOutput(output_dir=str(tmp_path / "output"), backup_dir=str(tmp_path / "backup"))
+    proxies = [ProxyEncoder.encode(link) for link in LINKS]
+    results = [TestResult(True, tcp=0.05, ttfb=0.31234567, total=0.5, address="::1", family="ipv6"),
+               TestResult(True, total=1.2)]
+    output.save("google", proxies, metrics=[result.metrics() for result in results])
+
+    lines = (tmp_path / "output" / "google.txt").read_text(encoding="utf-8").splitlines()
+    assert [line for line in lines if line and not line.startswith("#")] == LINKS
+
+    metrics = FileOutput.load_metrics(tmp_path / "output" / "google.txt")
+    assert metrics == {
+        LINKS[0]: {"tcp": 0.05, "ttfb": 0.3123, "total": 0.5, "address": "::1", "family": "ipv6"},
+        LINKS[1]: {"total": 1.2},
+    }
+    assert TestResult.from_metrics(metrics[LINKS[0]]) == results[0]._replace(ttfb=0.3123)
+
+    # 备份包含指标文件
+    output.backup_results()
+    backups = list((tmp_path / "backup").iterdir())
+    assert sorted(path.name for path in backups[0].iterdir()) == ["google.json", "google.txt"]
+
+def test_backup_pruned(tmp_path):
+    """测试备份数超过 max_backups 时删除最旧的备份"""
+    backup_dir = tmp_path / "backup"
+    for name in ("20240101_000000", "20240102_000000", "20240103_000000"):
+        (backup_dir / name).mkdir(parents=True)
+    (backup_dir / "keep").mkdir()
+    output = FileOutput(output_dir=str(tmp_path / "output"), backup_dir=str(backup_dir),
+                        config={"output": {"backup": {"max_backups": 2}}})
+    output.save("google", [ProxyEncoder.encode(LINKS[0])])
+    output.backup_results()
+
+    names = sorted(path.name for path in backup_dir.iterdir())
+    assert len(names) == 3
+    assert names[0] == "20240103_000000" and names[-1] == "keep"
+
+def test_load_metrics_missing(tmp_path):
+    """测试没有指标文件时返回空字典"""
+    assert FileOutput.load_metrics(tmp_path / "missing.txt") == {}
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
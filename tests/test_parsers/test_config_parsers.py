@@ -0,0 +1,124 @@
+import json
+import pytest
+from src.encoders.encoder import ProxyEncoder, ProxyProtocol
+from src.parsers import ClashParser, SingBoxParser, SubscriptionParser
+from src.parsers.singbox_parser import OutboundScanner
+
+CLASH_CONFIG = """
+port: 7890
+mode: rule
+proxies:
+  - {name: ss1, type: ss, server: 1.2.3.4, port: 8388, cipher: aes-256-gcm, password: test}
+  - name: vmess1
+    type: vmess
+    server: v.example.com
+    port: "443"
+    uuid: 11111111-2222-3333-4444-555555555555
+    alterId: 0
+    cipher: auto
+    tls: true
+    servername: sni.example.com
+    network: ws
+    ws-opts:
+      path: /ws
+      headers: {Host: h.example.com}
+  - {name: vless1, type: vless, server: 5.6.7.8, port: 443, uuid: u, flow: xtls-rprx-vision, tls: true, servername: www.example.com, reality-opts: {public-key: KEY, short-id: ab}, client-fingerprint: chrome}
+  - {name: trojan1, type: trojan, server: t.example.com, port: 443, password: pass, sni: t.example.com, skip-cert-verify: true}
+  - {name: hy2, type: hysteria2, server: h.example.com, port: 443}
+  - {name: broken, type: ss, server: 1.1.1.1}
+proxy-groups: []
+"""
+
+SINGBOX_CONFIG = {
+    "log": {"level": "info"},
+    "outbounds": [
+        {"type": "direct", "tag": "direct"},
+        {"type": "shadowsocks", "tag": "ss1", "server": "1.2.3.4", "server_port": 8388,
+         "method": "aes-256-gcm", "password": "test"},
+        {"type": "vless", "tag": "vless1", "server": "5.6.7.8", "server_port": 443, "uuid": "u",
+         "flow": "xtls-rprx-vision",
+         "tls": {"enabled": True, "server_name": "www.example.com", "utls": {"enabled": True, "fingerprint": "chrome"},
+                 "reality": {"enabled": True, "public_key": "KEY", "short_id": "ab"}}},
+        {"type": "trojan", "tag": "trojan1", "server": "t.example.com", "server_port": 443, "password": "pass",
+         "tls": {"enabled": True, "server_name": "t.example.com", "insecure": True},
+         "transport": {"type": "ws", "path": "/ws", "headers": {"Host": "h.example.com"}}},
+        {"type": "selector", "tag": "proxy", "outbounds": ["ss1", "vless1"]},
+    ],
+    "route": {"rules": []},
+}
+
+async def chunked(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+def test_clash_parser():
+    """测试Clash配置转换为代理记录（与对应链接的编码结果一致）"""
+    records = ClashParser().parse(CLASH_CONFIG)
+    assert [record["name"] for record in records] == ["ss1", "vmess1", "vless1", "trojan1"]
+    assert all("raw_link" not in record for record in records)
+
+    ss = records[0]
+    assert ss["proxy_protocol"] == ProxyProtocol.SS
+    assert ProxyEncoder.canonical_key(ss) == ProxyEncoder.canonical_key(
+        ProxyEncoder.encode("ss://YWVzLTI1Ni1nY206dGVzdA@1.2.3.4:8388#ss1"))
+
+    vmess = records[1]
+    assert vmess["port"] == 443
+    assert (vmess["type"], vmess["host"], vmess["path"]) == ("ws", "h.example.com", "/ws")
+    assert (vmess["security"], vmess["sni"]) == ("tls", "sni.example.com")
+
+    vless = records[2]
+    assert ProxyEncoder.canonical_key(vless) == ProxyEncoder.canonical_key(ProxyEncoder.encode(
+        "vless://u@5.6.7.8:443?encryption=none&flow=xtls-rprx-vision&security=reality"
+        "&sni=www.example.com&fp=chrome&type=tcp&pbk=KEY&sid=ab#vless1"))
+
+    trojan = records[3]
+    assert trojan["security"] == "tls" and trojan["skipVerify"] and trojan["allowInsecure"] == "1"
+
+def test_singbox_parser():
+    """测试sing-box配置转换为代理记录（忽略非代理出站）"""
+    records = SingBoxParser().parse(json.dumps(SINGBOX_CONFIG))
+    assert [record["name"] for record in records] == ["ss1", "vless1", "trojan1"]
+    clash_records = ClashParser().parse(CLASH_CONFIG)
+    assert ProxyEncoder.canonical_key(records[0]) == ProxyEncoder.canonical_key(clash_records[0])
+    assert ProxyEncoder.canonical_key(records[1]) == ProxyEncoder.canonical_key(clash_records[2])
+    assert (records[2]["type"], records[2]["host"], records[2]["path"]) == ("ws", "h.example.com", "/ws")
+
+    # 顶层数组
+    assert len(SingBoxParser().parse(json.dumps(SINGBOX_CONFIG["outbounds"]))) == 3
+    with pytest.raises(ValueError):
+        SingBoxParser().parse("{invalid")
+
+@pytest.mark.parametrize("size", [1, 7, 100, 1 << 20])
+async def test_singbox_parse_stream(size):
+    """测试增量解析在任意分块边界下的结果与完整解析一致"""
+    data = json.dumps(SINGBOX_CONFIG, ensure_ascii=False, indent=2).encode()
+    records = [record async for record in SingBoxParser().parse_stream(chunked(data, size))]
+    assert [dict(record) for record in records] == [dict(record) for record in SingBoxParser().parse(data.decode())]
+
+def test_outbound_scanner():
+    """测试扫描器逐个产出已完整的元素"""
+    scanner = OutboundScanner()
+    assert scanner.feed('{"log": {}, "outbou') == []
+    assert scanner.feed('nds": [{"a": 1}, {"b": "x]') == [{"a": 1}]
+    assert scanner.feed('"}, {"c": 3}]') == [{"b": "x]"}, {"c": 3}]
+    assert scanner.feed(', "route": {}}') == []
+    scanner.close()
+
+    scanner = OutboundScanner()
+    scanner.feed('[{"a": 1}, {"b"')
+    with pytest.raises(ValueError):
+        scanner.close()
+
+async def test_subscription_parser_configs():
+    """测试订阅解析器识别配置格式并产出代理记录"""
+    parser = SubscriptionParser()
+    assert len(parser.parse(CLASH_CONFIG)) == 4
+    data = json.dumps(SINGBOX_CONFIG).encode()
+    records = [record async for record in parser.parse_stream(chunked(data, 16))]
+    assert [record["name"] for record in records] == ["ss1", "vless1", "trojan1"]
+    clash = [record async for record in parser.parse_stream(chunked(CLASH_CONFIG.encode(), 16))]
+    assert [record["name"] for record in clash] == ["ss1", "vmess1", "vless1", "trojan1"]
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
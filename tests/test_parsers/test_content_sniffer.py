@@ -0,0 +1,36 @@
+import base64
+import pytest
+from src.parsers import ContentFormat, ContentSniffer, SubscriptionParser
+
+def test_sniff_base64():
+    """测试识别Base64内容（含换行和url-safe字符）"""
+    content = base64.urlsafe_b64encode(b"ss://test1\nvmess://test2\n" * 50).decode()
+    assert ContentSniffer.sniff(content) == ContentFormat.BASE64
+    wrapped = "\n".join(content[i:i + 76] for i in range(0, len(content), 76))
+    assert ContentSniffer.sniff(wrapped) == ContentFormat.BASE64
+
+def test_sniff_lines():
+    """测试识别按行分隔的链接（包括看起来像Base64的开头）"""
+    assert ContentSniffer.sniff("ss://test1\nvmess://test2") == ContentFormat.LINES
+    assert ContentSniffer.sniff("# 节点列表\ntrojan://pass@host:443") == ContentFormat.LINES
+    assert ContentSniffer.sniff("") == ContentFormat.LINES
+    assert ContentSniffer.sniff("not a subscription!") == ContentFormat.LINES
+
+def test_sniff_configs():
+    """测试识别Clash和JSON配置"""
+    clash = "port: 7890\nmode: rule\nproxies:\n  - {name: a, type: ss, server: 1.2.3.4}\n"
+    assert ContentSniffer.sniff(clash) == ContentFormat.CLASH
+    assert ContentSniffer.sniff("# comment\nproxies:\n  - name: a\n") == ContentFormat.CLASH
+    assert ContentSniffer.sniff('﻿{"outbounds": []}') == ContentFormat.JSON
+    assert ContentSniffer.sniff('[{"type": "vmess"}]') == ContentFormat.JSON
+
+def test_subscription_parser_dispatch():
+    """测试订阅解析器按格式选择解析器"""
+    parser = SubscriptionParser()
+    assert parser.parse("ss://test1\nvmess://test2") == ["ss://test1", "vmess://test2"]
+    assert parser.parse(base64.b64encode(b"ss://test1\nvmess://test2").decode()) == ["ss://test1", "vmess://test2"]
+    with pytest.raises(ValueError):
+        parser.parse(None)
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
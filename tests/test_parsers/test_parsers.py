@@ -1,5 +1,6 @@
+import base64
 import pytest
-from src.parsers import BaseParser, Base64Parser, LineParser
+from src.parsers import BaseParser, Base64Parser, LineParser, SubscriptionParser
 
 def test_base_parser():
     """测试基础解析器"""
@@ -144,5 +145,29 @@ def test_subscription_content():
     assert not any('deprecated' in link for link in links)
     assert not any('old-node' in link for link in links)
 
+async def _stream(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+async def _parse_stream(data: bytes, size: int):
+    return [link async for link in SubscriptionParser().parse_stream(_stream(data, size))]
+
+async def test_base64_parse_stream_chunk_boundaries():
+    """测试流式解析在任意数据块边界下结果与整体解析相同"""
+    text = "# 注释\nss://test1#节点 # 注释\r\nvmess://test2\n\ntrojan://test3#a#b\nvless://test4"
+    encoded = base64.urlsafe_b64encode(text.encode()).rstrip(b"=")
+    wrapped = b"\n".join(encoded[i:i + 16] for i in range(0, len(encoded), 16))
+    expected = LineParser().parse(text)
+
+    for data in (encoded, wrapped, text.encode()):
+        for size in (1, 2, 3, 5, 7, 64, 4096):
+            assert await _parse_stream(data, size) == expected
+
+async def test_base64_parse_stream_invalid():
+    """测试流式解析无效的Base64内容"""
+    assert await _parse_stream(b"", 16) == []
+    with pytest.raises(ValueError):
+        await _parse_stream(base64.b64encode(b"\xff\xfe"), 16)
+
 if __name__ == "__main__":
     pytest.main([__file__, "-vv"]) 
\ No newline at end of file
@@ -1,7 +1,7 @@
 import pytest
 import os
 from pathlib import Path
-from src.models.proxy_v2 import ProxyParser, ProxyType
+from src.encoders.encoder import ProxyEncoder, ProxyProtocol
 import re
 
 def load_test_data(filename: str) -> list:
@@ -45,15 +45,15 @@ def validate_proxy_info(info: dict, protocol: str) -> tuple[bool, str]:
             if not info["id"] or not re.match(r'^[0-9a-f-]{36}$', info["id"]):
                 return False, f"Invalid UUID format: {info['id']}"
                 
-            if info["net"] not in ["tcp", "ws", "http", "h2", "grpc", "quic"]:
-                return False, f"Unsupported network type: {info['net']}"
+            if info["type"] not in ["tcp", "ws", "http", "h2", "grpc", "quic"]:
+                return False, f"Unsupported network type: {info['type']}"
                 
             # 验证TLS配置
-            if info["tls"] == "tls" and not info["sni"]:
+            if info["security"] == "tls" and not info["sni"]:
                 return False, "Missing SNI for TLS connection"
                 
             # 验证WebSocket配置
-            if info["net"] == "ws" and not info["path"]:
+            if info["type"] == "ws" and not info["path"]:
                 return False, "Missing WebSocket path"
                 
         elif protocol == "vless":
@@ -117,7 +117,7 @@ def test_proxy_links(filename):
     for link in links:
         try:
             # 尝试解析链接
-            info = ProxyParser.parse(link)
+            info = ProxyEncoder.encode(link)
             
             # 验证基本字段
             assert info["proxy_protocol"].value == protocol
@@ -176,7 +176,7 @@ def test_parse_results():
             # 只测试第一个链接的详细信息
             link = links[0]
             try:
-                info = ProxyParser.parse(link)
+                info = ProxyEncoder.encode(link)
                 print(f"\nParsed {info['proxy_protocol']} proxy configuration:")
                 for key, value in sorted(info.items()):
                     if key != "raw_link":  # 跳过原始链接以保持输出简洁
@@ -0,0 +1,181 @@
+import asyncio
+import os
+import sys
+import pytest
+from src.testers.base_tester import BaseTester
+from src.testers.batch_dispatcher import BatchDispatcher
+from src.testers.glider_tester import GliderTester
+from src.testers.test_result import TestResult
+from src.testers.xray_pool import XrayPool, XrayWorker
+from src.encoders.encoder import ProxyEncoder
+
+TARGET = {"check_url": "https://example.com"}
+
+# 模拟glider：对配置中的每个forward输出一行检查日志，端口为偶数的视为成功
+FAKE_GLIDER = """#!{python}
+import re, sys, time
+config = open(sys.argv[2]).read()
+for addr in re.findall(r"@([^,?\\s]+)$", config, re.M):
+    if int(addr.rsplit(":", 1)[1]) % 2 == 0:
+        print(f"2024/01/01 00:00:00 group.go:1: [check] default: {{addr}}(0), SUCCESS. Elapsed: 120ms, Latency: 120ms.", flush=True)
+    else:
+        print(f"2024/01/01 00:00:00 group.go:1: [check] default: {{addr}}(0), FAILED.", flush=True)
+time.sleep(30)
+"""
+
+# 模拟xray：在配置的所有入站端口上监听
+FAKE_XRAY = """#!{python}
+import json, socket, sys, time
+config = json.load(open(sys.argv[2]))
+sockets = []
+for inbound in config["inbounds"]:
+    s = socket.socket()
+    s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    s.bind(("127.0.0.1", inbound["port"]))
+    s.listen(8)
+    sockets.append(s)
+time.sleep(30)
+"""
+
+class DummyTester(BaseTester):
+    """用于测试基类方法的虚拟测试器"""
+    def get_tester_name(self) -> str:
+        return "Dummy"
+
+    async def test(self, proxy_info, target_host=None) -> bool:
+        return proxy_info.get("ok", True)
+
+async def test_batch_dispatcher_groups_requests():
+    """测试调度器将请求聚合为批次"""
+    calls = []
+
+    async def batch_fn(proxies, target_host):
+        calls.append(len(proxies))
+        return [proxy["ok"] for proxy in proxies]
+
+    dispatcher = BatchDispatcher(batch_fn, batch_size=3, linger=0.05)
+    proxies = [{"ok": i % 2 == 0} for i in range(5)]
+    results = await asyncio.gather(*(dispatcher.submit(p, TARGET) for p in proxies))
+
+    assert results == [True, False, True, False, True]
+    assert calls == [3, 2]
+
+async def test_batch_dispatcher_failure():
+    """测试批量函数异常时所有请求返回False"""
+    async def batch_fn(proxies, target_host):
+        raise RuntimeError("boom")
+
+    dispatcher = BatchDispatcher(batch_fn, batch_size=2, linger=0.05)
+    results = await asyncio.gather(*(dispatcher.submit({}, TARGET) for _ in range(2)))
+    assert results == [False, False]
+
+    # 返回测试结果对象时，失败的请求返回指定的失败结果
+    dispatcher = BatchDispatcher(batch_fn, batch_size=2, linger=0.05, failure=TestResult(False))
+    results = await asyncio.gather(*(dispatcher.submit({}, TARGET) for _ in range(2)))
+    assert results == [TestResult(False)] * 2 and not any(results)
+
+async def test_default_batch():
+    """测试不支持批量模式的测试器逐个测试代理"""
+    tester = DummyTester()
+    proxies = [{"ok": True}, {"ok": False}, {"ok": True}]
+    assert await tester.test_batch(proxies, TARGET) == [True, False, True]
+    assert await tester.measure_batch([], TARGET) == []
+
+@pytest.mark.skipif(sys.platform == "win32", reason="需要可执行脚本")
+async def test_glider_batch(tmp_path):
+    """测试单个glider进程批量测试多个代理"""
+    glider = tmp_path / "glider"
+    glider.write_text(FAKE_GLIDER.format(python=sys.executable))
+    os.chmod(glider, 0o755)
+
+    tester = GliderTester(config={"glider_path": str(glider), "check_timeout": 2})
+    proxies = [
+        ProxyEncoder.encode("ss://YWVzLTEyOC1nY206dGVzdA@192.168.1.1:8388#a"),
+        ProxyEncoder.encode("ss://YWVzLTEyOC1nY206dGVzdA@192.168.1.2:8389#b"),
+        ProxyEncoder.encode("trojan://password@192.168.1.3:443#c"),
+    ]
+    assert await tester.test_batch(proxies, TARGET) == [True, False, False]
+
+    # 检查耗时记为总时间
+    results = await tester.measure_batch(proxies, TARGET)
+    assert [result.success for result in results] == [True, False, False]
+    assert results[0].total == 0.12 and results[1].total is None
+
+def test_glider_batch_config():
+    """测试批量配置包含所有forward"""
+    tester = GliderTester(config={"check_timeout": 5})
+    config = tester._generate_batch_config(["ss://a@1.1.1.1:1", "ss://b@2.2.2.2:2"], TARGET, 1080)
+    assert "listen=127.0.0.1:1080" in config
+    # 与单个测试一致，只接受2xx/3xx状态码
+    assert "check=https://example.com#expect=%20[23][0-9][0-9]" in config
+    expect_config = tester._generate_batch_config(["ss://a@1.1.1.1:1"], {"check_url": "http://a#expect=200"}, 1080)
+    assert "check=http://a#expect=200\n" in expect_config
+    assert "checktimeout=5" in config
+    assert config.count("forward=") == 2
+    assert GliderTester._normalize_addr("[2001:DB8::1]:443") == "2001:db8::1:443"
+
+def test_xray_worker_config():
+    """测试多槽位Xray配置的路由规则"""
+    outbounds = [{"protocol": "trojan"}, {"protocol": "vless"}]
+    config = XrayWorker._generate_config(outbounds, [2001, 2002])
+
+    assert [inbound["port"] for inbound in config["inbounds"]] == [2001, 2002]
+    assert [outbound["tag"] for outbound in config["outbounds"]] == ["out-0", "out-1"]
+    assert config["routing"]["rules"][1] == {
+        "type": "field",
+        "inboundTag": ["in-1"],
+        "outboundTag": "out-1"
+    }
+
+@pytest.mark.skipif(sys.platform == "win32", reason="需要可执行脚本")
+async def test_xray_pool_recycles_slots(tmp_path):
+    """测试进程池按槽位分批并保持结果顺序"""
+    xray = tmp_path / "xray"
+    xray.write_text(FAKE_XRAY.format(python=sys.executable))
+    os.chmod(xray, 0o755)
+
+    tester = DummyTester()
+    pool = XrayPool(str(xray), pool_size=1, slots=2, port_factory=tester._get_free_port,
+                    ready_check=tester._wait_for_port)
+    ports = [worker_port for worker_port in pool.workers[0].ports]
+    seen = []
+
+    async def check(port):
+        seen.append(port)
+        return port
+
+    try:
+        results = await pool.run([{"protocol": "trojan"}] * 5, check)
+    finally:
+        await pool.close()
+
+    # 单个进程2个槽位，5个出站分3次加载
+    assert results == [ports[0], ports[1], ports[0], ports[1], ports[0]]
+    assert len(seen) == 5
+
+@pytest.mark.skipif(sys.platform == "win32", reason="需要可执行脚本")
+async def test_wait_for_port_detects_early_exit(tmp_path):
+    """测试进程提前退出时立即返回失败"""
+    tester = DummyTester()
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, "-c", "import sys; sys.stderr.write('bad config'); sys.exit(1)",
+        stderr=asyncio.subprocess.PIPE
+    )
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    assert await tester._wait_for_port(tester._get_free_port(), process, timeout=5) is False
+    assert loop.time() - start < 4
+
+async def test_wait_for_port_ready():
+    """测试端口监听后立即就绪"""
+    tester = DummyTester()
+    server = await asyncio.start_server(lambda r, w: w.close(), '127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        assert await tester._wait_for_port(port, timeout=1) is True
+    finally:
+        server.close()
+        await server.wait_closed()
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,82 @@
+import asyncio
+import pytest
+from src.testers.http_probe import HttpProbe
+
+@pytest.fixture
+async def fake_proxy():
+    """模拟HTTP代理：GET返回204，CONNECT返回403"""
+    requests = []
+
+    async def handle(reader, writer):
+        request_line = await reader.readline()
+        while (await reader.readline()) not in (b"\r\n", b""):
+            pass
+        requests.append(request_line.decode().strip())
+        if request_line.startswith(b"CONNECT"):
+            writer.write(b"HTTP/1.1 403 Forbidden\r\n\r\n")
+        else:
+            writer.write(b"HTTP/1.1 204 No Content\r\nContent-Length: 0\r\n\r\n")
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    yield port, requests
+    server.close()
+    await server.wait_closed()
+
+async def test_probe_http(fake_proxy):
+    """测试http目标通过代理发送绝对URI请求"""
+    port, requests = fake_proxy
+    result = await HttpProbe(total_timeout=5).probe("http://example.com/generate_204?x=1", port)
+
+    assert result["status"] == 204
+    assert 0 <= result["ttfb"] <= result["total"]
+    assert requests == ["GET http://example.com/generate_204?x=1 HTTP/1.1"]
+
+async def test_probe_connect_rejected(fake_proxy):
+    """测试CONNECT被拒绝时返回None"""
+    port, requests = fake_proxy
+    assert await HttpProbe(total_timeout=5).probe("https://example.com", port) is None
+    assert requests == ["CONNECT example.com:443 HTTP/1.1"]
+
+async def test_probe_proxy_down():
+    """测试代理端口未监听时返回None"""
+    assert await HttpProbe(connect_timeout=1, total_timeout=2).probe("http://example.com", 1) is None
+
+async def test_probe_timings_and_throughput():
+    """测试记录各项时间，指定采样字节数时计算吞吐量"""
+    body = b"x" * 200000
+
+    async def handle(reader, writer):
+        while (await reader.readline()) not in (b"\r\n", b""):
+            pass
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n" % len(body) + body)
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        probe = HttpProbe(total_timeout=5)
+        result = await probe.probe("http://example.com/", port)
+        assert result["status"] == 200
+        assert 0 <= result["connect"] <= result["ttfb"] <= result["total"]
+        assert result["tls"] is None and result["throughput"] is None
+        assert result["bytes"] == probe.max_body
+
+        result = await probe.probe("http://example.com/", port, sample_bytes=150000)
+        assert result["bytes"] == 150000
+        assert result["throughput"] > 0
+    finally:
+        server.close()
+        await server.wait_closed()
+
+def test_parse_status():
+    """测试状态行解析"""
+    assert HttpProbe._parse_status(b"HTTP/1.1 301 Moved Permanently\r\n") == 301
+    with pytest.raises(ValueError):
+        HttpProbe._parse_status(b"garbage")
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -1,7 +1,13 @@
+import asyncio
+import os
+import sys
 import pytest
 from src.testers.base_tester import BaseTester
 from src.testers.tcp_tester import TCPTester
+from src.testers.glider_tester import GliderTester
 from src.encoders.encoder import ProxyEncoder
+from src.decoders.glider_decoder import GliderDecoder
+from src.validators.proxy_validator import ProxyValidator
 from typing import Dict, Any, Optional
 
 class DummyTester(BaseTester):
@@ -62,5 +68,91 @@ async def test_tcp_tester_with_target():
         result = await tester.test(proxy_info, target)
         assert isinstance(result, bool)
 
+@pytest.fixture
+async def tcp_server():
+    """仅监听127.0.0.1的TCP服务"""
+    server = await asyncio.start_server(lambda r, w: w.close(), "127.0.0.1", 0)
+    yield server.sockets[0].getsockname()[1]
+    server.close()
+    await server.wait_closed()
+
+def test_tcp_tester_interleave():
+    """测试地址按地址族交替排列"""
+    addresses = ["2001:db8::1", "2001:db8::2", "10.0.0.1", "2001:db8::3", "10.0.0.2"]
+    assert TCPTester._interleave(addresses) == [
+        "2001:db8::1", "10.0.0.1", "2001:db8::2", "10.0.0.2", "2001:db8::3"
+    ]
+
+@pytest.mark.asyncio
+async def test_tcp_tester_race(tcp_server):
+    """测试第一个地址连接失败时由后续地址胜出"""
+    tester = TCPTester(connect_timeout=2, retry_times=0, attempt_delay=1)
+    result = await tester._race(["127.0.0.2", "127.0.0.1"], tcp_server)
+    assert result["address"] == "127.0.0.1"
+    assert result["family"] == "ipv4"
+    assert result["rtt"] < 1
+
+    with pytest.raises(OSError):
+        await tester._race(["127.0.0.2", "127.0.0.3"], tcp_server)
+
+@pytest.mark.asyncio
+async def test_tcp_tester_ipv6_link(tcp_server):
+    """测试带方括号IPv6地址的代理可以被编码，IPv4代理可以连通"""
+    tester = TCPTester(connect_timeout=2, retry_times=0)
+    proxy_info = ProxyEncoder.encode(f"ss://YWVzLTEyOC1nY206dGVzdA@[::ffff:127.0.0.1]:{tcp_server}#v6")
+    assert proxy_info["server"] == "::ffff:127.0.0.1"
+    assert ProxyValidator().validate(proxy_info) == (True, "OK")
+    assert GliderDecoder.decode(proxy_info) == f"ss://aes-128-gcm:test@[::ffff:127.0.0.1]:{tcp_server}"
+    assert await tester.test(ProxyEncoder.encode(f"ss://YWVzLTEyOC1nY206dGVzdA@127.0.0.1:{tcp_server}#v4"))
+
+# 模拟glider：在listen端口上提供HTTP代理，主机名包含good的站点返回200
+FAKE_GLIDER = """#!{python}
+import re, socketserver, sys
+port = int(re.search(r"listen=:(\\d+)", open(sys.argv[2]).read()).group(1))
+
+class Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        request_line = self.rfile.readline()
+        while self.rfile.readline() not in (b"\\r\\n", b""):
+            pass
+        status = b"200 OK" if b"good" in request_line else b"502 Bad Gateway"
+        self.wfile.write(b"HTTP/1.1 " + status + b"\\r\\nContent-Length: 0\\r\\n\\r\\n")
+
+socketserver.ThreadingTCPServer(("127.0.0.1", port), Handler).serve_forever()
+"""
+
+@pytest.mark.asyncio
+async def test_base_tester_test_sites():
+    """测试默认的多站点测试"""
+    tester = DummyTester()
+    target_hosts = {"a": {"check_url": "http://a"}, "b": {"check_url": "http://b"}}
+    assert await tester.test_sites({}, target_hosts) == ["a", "b"]
+
+@pytest.mark.skipif(sys.platform == "win32", reason="需要可执行脚本")
+@pytest.mark.asyncio
+async def test_glider_tester_test_sites(tmp_path):
+    """测试一个glider进程并发检查所有站点"""
+    glider = tmp_path / "glider"
+    glider.write_text(FAKE_GLIDER.format(python=sys.executable))
+    os.chmod(glider, 0o755)
+
+    tester = GliderTester(config={"glider_path": str(glider)})
+    proxy_info = ProxyEncoder.encode("ss://YWVzLTEyOC1nY206dGVzdA@127.0.0.1:8388#Example")
+    target_hosts = {
+        "good1": {"check_url": "http://good1.example.com/"},
+        "bad": {"check_url": "http://bad.example.com/"},
+        "good2": {"check_url": "http://good2.example.com/"}
+    }
+    try:
+        assert await tester.test_sites(proxy_info, target_hosts) == ["good1", "good2"]
+        assert await tester.test(proxy_info, target_hosts["bad"]) is False
+
+        results = await tester.measure_sites(proxy_info, target_hosts)
+        assert [result.status for result in results.values()] == [200, 502, 200]
+        assert 0 <= results["good1"].ttfb <= results["good1"].total
+        assert set(results["good1"].metrics()) == {"connect", "ttfb", "total"}
+    finally:
+        await tester.close()
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"]) 
\ No newline at end of file
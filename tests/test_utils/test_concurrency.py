@@ -0,0 +1,71 @@
+import asyncio
+import pytest
+from src.utils import concurrency
+from src.utils.concurrency import AdaptiveLimiter
+
+@pytest.fixture(autouse=True)
+def no_fd_pressure(monkeypatch):
+    """默认不模拟文件描述符压力"""
+    monkeypatch.setattr(concurrency, "open_fd_usage", lambda: 0.1)
+
+async def test_limit_bounds_concurrency():
+    """测试同时执行的任务数不超过上限"""
+    limiter = AdaptiveLimiter("test", initial=3, adaptive=False)
+    peak = 0
+
+    async def task():
+        nonlocal peak
+        async with limiter:
+            peak = max(peak, limiter.active)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(task() for _ in range(20)))
+    assert peak == 3
+    assert limiter.active == 0
+
+def test_additive_increase():
+    """测试健康窗口逐步增加并发上限，且不超过最大值"""
+    limiter = AdaptiveLimiter("test", initial=4, max_limit=10, increase=4, window=4)
+    for _ in range(4):
+        limiter.record(0.1)
+    assert limiter.limit == 8
+    for _ in range(8):
+        limiter.record(0.1)
+    assert limiter.limit == 10
+
+def test_backoff_on_timeout_spike():
+    """测试超时率高于基线时乘性减少"""
+    limiter = AdaptiveLimiter("test", initial=16, max_limit=64, min_limit=2, window=10)
+    for _ in range(10):
+        limiter.record(0.1)
+    assert limiter.limit == 20
+
+    for _ in range(5):
+        limiter.record(5, timed_out=True)
+    for _ in range(5):
+        limiter.record(0.1)
+    assert limiter.limit == 10
+
+def test_backoff_on_latency_and_fd_pressure(monkeypatch):
+    """测试延迟升高或文件描述符不足时退避"""
+    limiter = AdaptiveLimiter("test", initial=16, max_limit=64, window=2, increase=0)
+    limiter.record(0.1)
+    limiter.record(0.1)
+    limiter.record(1.0)
+    limiter.record(1.0)
+    assert limiter.limit == 8
+
+    monkeypatch.setattr(concurrency, "open_fd_usage", lambda: 0.95)
+    limiter.record(0.1)
+    limiter.record(0.1)
+    assert limiter.limit == 4
+
+async def test_slow_tasks_count_as_timeouts():
+    """测试超过slow_threshold的任务计为超时"""
+    limiter = AdaptiveLimiter("test", initial=4, window=100, slow_threshold=0)
+    async with limiter:
+        pass
+    assert limiter._timeouts == 1
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -2,6 +2,7 @@ import pytest
 from src.utils.glider_config_generator import GliderConfigGenerator
 from src.utils.xray_config_generator import XrayConfigGenerator
 from src.encoders.encoder import ProxyEncoder
+from src.utils.proxy_ranker import ProxyRanker
 
 def test_glider_config_generator():
     """测试Glider配置生成器"""
@@ -59,6 +60,27 @@ def test_glider_config_generator():
     assert "# Rules for 示例站点" in rule_content
     assert "domain=*.example.com proxy" in rule_content
 
+def test_glider_config_top_k():
+    """测试forward按延迟排序并只保留前K个"""
+    links = [f"ss://YWVzLTEyOC1nY206dGVzdA@192.168.1.{i}:8388#{i}" for i in range(1, 6)]
+    site_proxies = {"google": [ProxyEncoder.encode(link) for link in links]}
+    ranker = ProxyRanker({"google": {link: {"ttfb": 1 / i} for i, link in enumerate(links, 1)}})
+    client_config = {
+        "target_hosts": {"google": {"check_url": "http://www.google.com"}},
+        "ranking": {"top_k": 3, "top_k_per_site": 2},
+    }
+
+    config = GliderConfigGenerator.generate_client_config(site_proxies, client_config, ranker=ranker)
+    forwards = [line for line in config.splitlines() if line.startswith("forward=")]
+    assert forwards == [f"forward=ss://aes-128-gcm:test@192.168.1.{i}:8388" for i in (5, 4, 3)]
+
+    rule = GliderConfigGenerator.generate_rule_files(site_proxies, client_config, ranker=ranker)["google.rule"]
+    assert [line for line in rule.splitlines() if line.startswith("forward=")] == forwards[:2]
+
+    # 未配置时保留全部代理
+    config = GliderConfigGenerator.generate_client_config(site_proxies, {"target_hosts": {}})
+    assert config.count("forward=") == 5
+
 def test_xray_config_generator():
     """测试Xray配置生成器"""
     # 准备测试数据
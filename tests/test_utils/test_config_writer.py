@@ -0,0 +1,39 @@
+import os
+import pytest
+from src.utils.config_writer import ConfigWriter
+
+def test_write_only_when_changed(tmp_path):
+    """测试内容不变时不重写文件，并记录改变了的文件"""
+    path = tmp_path / "rules.d" / "google.rule"
+    writer = ConfigWriter()
+    assert writer.write(path, "forward=ss://a\n")
+    assert path.read_text(encoding="utf-8") == "forward=ss://a\n"
+
+    mtime = os.stat(path).st_mtime_ns
+    writer = ConfigWriter()
+    assert not writer.write(path, "forward=ss://a\n")
+    assert os.stat(path).st_mtime_ns == mtime
+    assert writer.changed == []
+
+    assert writer.write(path, "forward=ss://b\n")
+    assert writer.changed == [path]
+    assert path.read_text(encoding="utf-8") == "forward=ss://b\n"
+
+def test_write_is_atomic(tmp_path):
+    """测试写入后不留下临时文件"""
+    path = tmp_path / "glider.conf"
+    ConfigWriter().write(path, "listen=:7630")
+    assert [entry.name for entry in tmp_path.iterdir()] == ["glider.conf"]
+
+def test_remove(tmp_path):
+    """测试删除不再需要的文件"""
+    path = tmp_path / "github.rule"
+    path.write_text("forward=ss://a", encoding="utf-8")
+    writer = ConfigWriter()
+    assert writer.remove(path)
+    assert not writer.remove(path)
+    assert not path.exists()
+    assert writer.changed == [path]
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
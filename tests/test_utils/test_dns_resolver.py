@@ -0,0 +1,55 @@
+import asyncio
+import socket
+import pytest
+from src.utils.dns_resolver import DNSResolver
+
+@pytest.fixture
+def lookups(monkeypatch):
+    """记录getaddrinfo调用，bad.example返回解析失败"""
+    calls = []
+
+    def fake_getaddrinfo(host, port, family=0, type=0, *args):
+        calls.append(host)
+        if host.startswith("bad"):
+            raise socket.gaierror("Name or service not known")
+        return [
+            (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("10.0.0.1", 0)),
+            (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("10.0.0.1", 0)),
+            (socket.AF_INET6, socket.SOCK_STREAM, 6, "", ("fd00::1", 0, 0, 0)),
+        ]
+
+    monkeypatch.setattr(socket, "getaddrinfo", fake_getaddrinfo)
+    return calls
+
+async def test_resolve_ip_literal(lookups):
+    """测试IP地址不发起查询"""
+    resolver = DNSResolver()
+    assert await resolver.resolve("1.2.3.4") == ["1.2.3.4"]
+    assert await resolver.resolve("[2001:db8::1]") == ["2001:db8::1"]
+    assert lookups == []
+
+async def test_resolve_cached_and_deduplicated(lookups):
+    """测试并发解析同一域名只查询一次，结果被缓存"""
+    resolver = DNSResolver()
+    results = await asyncio.gather(*(resolver.resolve("CDN.example") for _ in range(10)))
+    assert all(result == ["10.0.0.1", "fd00::1"] for result in results)
+    assert await resolver.resolve_one("cdn.example") == "10.0.0.1"
+    assert lookups == ["cdn.example"]
+    resolver.close()
+
+async def test_resolve_negative_cache(lookups):
+    """测试解析失败被缓存，过期后重新查询"""
+    resolver = DNSResolver(negative_ttl=60)
+    for _ in range(2):
+        with pytest.raises(OSError):
+            await resolver.resolve("bad.example")
+    assert lookups == ["bad.example"]
+
+    resolver.clear()
+    with pytest.raises(OSError):
+        await resolver.resolve("bad.example")
+    assert lookups == ["bad.example", "bad.example"]
+    resolver.close()
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
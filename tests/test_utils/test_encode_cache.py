@@ -0,0 +1,98 @@
+import pytest
+from src.decoders.glider_decoder import GliderDecoder
+from src.encoders.encoder import ProxyEncoder, ProxyProtocol
+from src.utils.encode_cache import EncodeCache
+
+SS_LINK = "ss://YWVzLTEyOC1nY206dGVzdA@1.2.3.4:443#HK"
+TROJAN_LINK = "trojan://pass@example.com:443?security=tls&sni=example.com&alpn=h2,http/1.1#JP"
+
+def test_encode_is_persisted(tmp_path):
+    """测试编码结果在重新打开缓存后仍然可用"""
+    db = str(tmp_path / "encode.db")
+    cache = EncodeCache(db)
+    record = cache.encode(TROJAN_LINK)
+    assert dict(record) == dict(ProxyEncoder.encode(TROJAN_LINK))
+    cache.close()
+
+    cache = EncodeCache(db)
+    results, missing = cache.get_many([TROJAN_LINK, SS_LINK])
+    assert missing == [1]
+    cached, error = results[0]
+    assert error is None
+    assert cached["proxy_protocol"] is ProxyProtocol.TROJAN
+    assert dict(cached) == dict(record)
+    cache.close()
+
+def test_cached_records_are_independent(tmp_path):
+    """测试每次返回新的记录，修改记录不影响缓存"""
+    cache = EncodeCache(str(tmp_path / "encode.db"))
+    first = cache.encode(SS_LINK)
+    first["aliases"] = ["HK"]
+    first["name"] = "changed"
+    second = cache.encode(SS_LINK)
+    assert second["name"] == "HK"
+    assert "aliases" not in second
+    cache.close()
+
+def test_errors_are_cached(tmp_path):
+    """测试编码失败的链接同样被缓存"""
+    cache = EncodeCache(str(tmp_path / "encode.db"))
+    with pytest.raises(ValueError) as first:
+        cache.encode("vless://no-at-sign")
+    assert cache.misses == 1
+    with pytest.raises(ValueError) as second:
+        cache.encode("vless://no-at-sign")
+    assert cache.hits == 1
+    assert str(first.value) == str(second.value)
+    cache.close()
+
+def test_derived_outbounds(tmp_path):
+    """测试缓存glider链接和xray服务器配置"""
+    db = str(tmp_path / "encode.db")
+    cache = EncodeCache(db)
+    record = cache.encode(TROJAN_LINK)
+    assert cache.glider_link(record) == GliderDecoder.decode(record)
+    assert cache.xray_outbound(record)["password"] == "pass"
+    cache.close()
+
+    cache = EncodeCache(db)
+    record = cache.encode(TROJAN_LINK)
+    assert cache.glider_link(record) == GliderDecoder.decode(record)
+    assert cache.misses == 0
+    cache.close()
+
+def test_eviction_keeps_recently_used(tmp_path):
+    """测试超过最大条目数时淘汰最久未使用的条目"""
+    db = str(tmp_path / "encode.db")
+    links = [f"ss://YWVzLTEyOC1nY206dGVzdA@1.2.3.{i}:443#{i}" for i in range(5)]
+    cache = EncodeCache(db, memory_size=2, max_entries=3)
+    for link in links[:3]:
+        cache.encode(link)
+    cache.commit()
+    # 使用第一个链接后再加入两个新链接
+    cache.encode(links[0])
+    cache.commit()
+    for link in links[3:]:
+        cache.encode(link)
+    cache.close()
+
+    cache = EncodeCache(db)
+    _, missing = cache.get_many(links)
+    assert missing == [1, 2]
+    cache.close()
+
+def test_version_change_clears_cache(tmp_path, monkeypatch):
+    """测试版本变化时清空缓存"""
+    db = str(tmp_path / "encode.db")
+    cache = EncodeCache(db)
+    cache.encode(SS_LINK)
+    cache.close()
+
+    monkeypatch.setattr(EncodeCache, "VERSION", EncodeCache.VERSION + 1)
+    cache = EncodeCache(db)
+    _, missing = cache.get_many([SS_LINK])
+    assert missing == [0]
+    cache.close()
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,125 @@
+import socket
+import sys
+import pytest
+from src.testers.test_result import TestResult
+from src.utils.encode_cache import EncodeCache
+from src.utils.glider_supervisor import DEFAULT_GROUP, GliderSupervisor
+from src.utils.proxy_ranker import ProxyRanker
+
+LINKS = [f"ss://YWVzLTEyOC1nY206dGVzdA@192.168.1.{i}:8388#{i}" for i in range(1, 7)]
+
+# 模拟glider：在配置的端口上监听
+FAKE_GLIDER = """#!{python}
+import re, socket, sys, time
+port = int(re.search(r"listen=:(\\d+)", open(sys.argv[2]).read()).group(1))
+s = socket.socket()
+s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+s.bind(("127.0.0.1", port))
+s.listen(8)
+time.sleep(30)
+"""
+
+class FakeTester:
+    """服务器在 dead 中的代理检查失败"""
+    def __init__(self):
+        self.dead = set()
+        self.checked = []
+
+    async def measure_batch(self, proxies, target_host):
+        self.checked.append((target_host["check_url"], len(proxies)))
+        return [TestResult(proxy["server"] not in self.dead) for proxy in proxies]
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+@pytest.fixture
+def supervisor(tmp_path):
+    results_file = tmp_path / "google.txt"
+    results_file.write_text("# results\n" + "\n".join(LINKS) + "\n", encoding="utf-8")
+    client_config = {
+        "glider": {"listen": f":{free_port()}"},
+        "target_hosts": {"google": {"check_url": "http://www.google.com"}},
+        "proxy_results": {"google": str(results_file)},
+        "ranking": {"top_k": 3, "top_k_per_site": 2},
+        "output": {"dir": str(tmp_path / "configs")},
+    }
+    encode_cache = EncodeCache(":memory:")
+    supervisor = GliderSupervisor(client_config, FakeTester(), encode_cache, ProxyRanker,
+                                  restart_threshold=0.5, drain_timeout=0)
+    supervisor.load_results()
+    yield supervisor
+    encode_cache.close()
+
+def forward_servers(groups, group):
+    return [proxy["server"] for proxy, _ in groups[group]]
+
+async def test_dead_forwards_replaced(supervisor, tmp_path):
+    """测试检查失败的代理被结果文件中的下一个代理替换，变化明显时才重写配置"""
+    assert supervisor.apply(supervisor.plan())
+    assert forward_servers(supervisor.groups, DEFAULT_GROUP) == ["192.168.1.1", "192.168.1.2", "192.168.1.3"]
+    assert forward_servers(supervisor.groups, "google") == ["192.168.1.1", "192.168.1.2"]
+    rule_file = tmp_path / "configs" / "rules.d" / "google.rule"
+    assert rule_file.exists()
+
+    # 一个forward失效：站点代理组的替换比例为1/2，主配置为1/3
+    supervisor.tester.dead = {"192.168.1.2"}
+    await supervisor.check()
+    groups = supervisor.plan()
+    assert forward_servers(groups, DEFAULT_GROUP) == ["192.168.1.1", "192.168.1.3", "192.168.1.4"]
+    assert forward_servers(groups, "google") == ["192.168.1.1", "192.168.1.3"]
+    assert supervisor.is_material(supervisor.groups, groups)
+    assert supervisor.apply(groups)
+    assert "192.168.1.2" not in (tmp_path / "configs" / "glider.conf").read_text(encoding="utf-8")
+    assert "192.168.1.2" not in rule_file.read_text(encoding="utf-8")
+
+    # 没有新的失效时不需要重写
+    supervisor.tester.dead = set()
+    await supervisor.check()
+    assert not supervisor.is_material(supervisor.groups, supervisor.plan())
+    assert not supervisor.apply(supervisor.plan())
+
+async def test_site_failure_only_affects_site(supervisor):
+    """测试只有站点检查失败的代理仍然保留在主配置中"""
+    supervisor.apply(supervisor.plan())
+    supervisor.tester.dead = {"192.168.1.1"}
+    # 只检查站点代理组
+    supervisor.groups = {"google": supervisor.groups["google"]}
+    await supervisor.check()
+    groups = supervisor.plan()
+    assert forward_servers(groups, DEFAULT_GROUP)[0] == "192.168.1.1"
+    assert forward_servers(groups, "google") == ["192.168.1.2", "192.168.1.3"]
+
+async def test_reload_on_results_change(supervisor, tmp_path):
+    """测试结果文件更新后重新加载代理并清除检查失败记录"""
+    supervisor.dead = {DEFAULT_GROUP: {"x"}}
+    assert supervisor._signature() == supervisor._results_signature
+    (tmp_path / "google.txt").write_text(LINKS[-1] + "\n", encoding="utf-8")
+    assert supervisor._signature() != supervisor._results_signature
+    supervisor.load_results()
+    assert supervisor.dead == {}
+    assert forward_servers(supervisor.plan(), "google") == ["192.168.1.6"]
+
+@pytest.mark.skipif(sys.platform == "win32", reason="需要可执行的脚本")
+async def test_start_and_restart(supervisor, tmp_path):
+    """测试启动glider并在重启时替换进程"""
+    glider = tmp_path / "glider"
+    glider.write_text(FAKE_GLIDER.format(python=sys.executable))
+    glider.chmod(0o755)
+    supervisor.glider_path = str(glider)
+    supervisor.apply(supervisor.plan())
+
+    await supervisor.start()
+    try:
+        first, first_exited = supervisor.process, supervisor._exited
+        assert first.returncode is None
+        await supervisor.restart()
+        assert first.returncode is not None and first_exited.done()
+        assert supervisor.process.returncode is None and not supervisor._exited.done()
+    finally:
+        await supervisor.stop()
+    assert supervisor._exited is None
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,94 @@
+import sqlite3
+import pytest
+from src.encoders.encoder import ProxyEncoder
+from src.utils.health_store import HealthStore
+
+@pytest.fixture
+def store(tmp_path):
+    store = HealthStore(str(tmp_path / "health.db"), fresh_ttl=100, backoff_base=10, backoff_max=50)
+    yield store
+    store.close()
+
+def test_proxy_key_ignores_name():
+    """测试代理标识忽略备注"""
+    assert HealthStore.proxy_key(ProxyEncoder.encode("ss://YWVzLTEyOC1nY206dGVzdA@1.2.3.4:443#HK 01")) == \
+        HealthStore.proxy_key(ProxyEncoder.encode("ss://YWVzLTEyOC1nY206dGVzdA@1.2.3.4:443#香港"))
+
+def test_fresh_success_is_reused(store):
+    """测试成功结果在fresh_ttl内复用"""
+    assert store.cached_sites("p", now=0) is None
+    store.record("p", ["google"], ["google", "github"], {"tcp": 0.05}, now=0)
+    assert store.cached_sites("p", now=50) == ["google"]
+    assert store.cached_sites("p", now=100) is None
+
+    status = store.site_status("p")
+    assert status["google"] == {"last_success": 0, "last_failure": None}
+    assert status["github"] == {"last_success": None, "last_failure": 0}
+
+def test_failures_back_off_exponentially(store):
+    """测试连续失败按指数退避，成功后重置"""
+    now = 0
+    for expected_delay in (10, 20, 40, 50, 50):
+        store.record("p", [], [], now=now)
+        assert store.cached_sites("p", now=now + expected_delay - 1) == []
+        assert store.cached_sites("p", now=now + expected_delay) is None
+        now += expected_delay
+    assert store.consecutive_failures("p") == 5
+
+    store.record("p", ["google"], ["google"], now=now)
+    assert store.consecutive_failures("p") == 0
+
+def test_latency_history_is_capped(tmp_path):
+    """测试延迟历史只保留最近的记录"""
+    store = HealthStore(str(tmp_path / "health.db"), history_size=3)
+    for i in range(5):
+        store.record("p", ["google"], ["google"], {"tcp": i / 10}, now=i)
+    assert store.latency_history("p", "tcp") == [0.4, 0.3, 0.2]
+    store.close()
+
+    # 重新打开后数据仍然存在
+    reopened = HealthStore(str(tmp_path / "health.db"))
+    assert reopened.latency_history("p", "tcp") == [0.4, 0.3, 0.2]
+    reopened.close()
+
+def test_latest_latency(store):
+    """测试获取各阶段最近一次的指标（站点指标按站点分别记录）"""
+    assert store.latest_latency("p") == {}
+    store.record("p", ["google", "github"], ["google", "github"], {"tcp": 0.1}, now=0,
+                 site_latency={"google": {"ttfb": 0.5, "throughput": 1000.0}, "github": {"ttfb": 0.9}})
+    store.record("p", ["google"], ["google"], {"tcp": 0.2}, now=1, site_latency={"google": {"ttfb": 0.4}})
+    assert store.latest_latency("p") == {"tcp": 0.2}
+    assert store.latest_latency("p", "google") == {"tcp": 0.2, "ttfb": 0.4, "throughput": 1000.0}
+    assert store.latest_latency("p", "github") == {"tcp": 0.2, "ttfb": 0.9}
+    assert store.latency_history("p", "ttfb", "google") == [0.4, 0.5]
+    assert store.latency_history("p", "ttfb") == []
+
+def test_route(store):
+    """测试记录TCP测试连接成功的地址和地址族"""
+    assert store.route("p") == {}
+    store.record("p", ["google"], ["google"], {"tcp": 0.1}, now=0, route={"address": "::1", "family": "ipv6"})
+    assert store.route("p") == {"address": "::1", "family": "ipv6"}
+    store.record("p", [], [], now=1)
+    assert store.route("p") == {}
+
+def test_migrate_old_database(tmp_path):
+    """测试旧版本数据库补充缺少的列"""
+    path = str(tmp_path / "health.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE latency_history (key TEXT NOT NULL, stage TEXT NOT NULL, "
+                 "tested_at REAL NOT NULL, latency REAL NOT NULL)")
+    conn.execute("INSERT INTO latency_history VALUES ('p', 'tcp', 0, 0.1)")
+    conn.execute("CREATE TABLE proxies (key TEXT PRIMARY KEY, last_tested REAL NOT NULL, next_test REAL NOT NULL, "
+                 "consecutive_failures INTEGER NOT NULL DEFAULT 0, sites TEXT NOT NULL DEFAULT '[]')")
+    conn.commit()
+    conn.close()
+
+    store = HealthStore(path)
+    store.record("p", ["google"], ["google"], now=1, site_latency={"google": {"ttfb": 0.3}},
+                 route={"address": "1.2.3.4", "family": "ipv4"})
+    assert store.latest_latency("p", "google") == {"tcp": 0.1, "ttfb": 0.3}
+    assert store.route("p") == {"address": "1.2.3.4", "family": "ipv4"}
+    store.close()
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,68 @@
+import asyncio
+import pytest
+from src.utils.pipeline import Pipeline, Stage
+
+async def numbers(n):
+    for i in range(n):
+        yield i
+
+async def test_pipeline_stages():
+    """测试条目依次经过各阶段，None被丢弃，expand展开结果"""
+    results = []
+
+    async def expand(i):
+        return [i, i + 100]
+
+    async def drop_odd(i):
+        return None if i % 2 else i
+
+    async def sink(i):
+        results.append(i)
+
+    pipeline = Pipeline([
+        Stage("expand", expand, expand=True),
+        Stage("filter", drop_odd, workers=3),
+        Stage("sink", sink, workers=2)
+    ])
+    await pipeline.run(numbers(10))
+    assert sorted(results) == [0, 2, 4, 6, 8, 100, 102, 104, 106, 108]
+
+async def test_pipeline_streams_with_backpressure():
+    """测试下游在数据源耗尽前开始处理，且有界队列限制了积压"""
+    produced = 0
+    first_seen_at = None
+
+    async def source():
+        nonlocal produced
+        for i in range(50):
+            produced += 1
+            yield i
+
+    async def slow_sink(i):
+        nonlocal first_seen_at
+        if first_seen_at is None:
+            first_seen_at = produced
+        await asyncio.sleep(0.001)
+
+    pipeline = Pipeline([
+        Stage("pass", lambda i: asyncio.sleep(0, i), queue_size=2),
+        Stage("sink", slow_sink, queue_size=2)
+    ])
+    await pipeline.run(source())
+    assert produced == 50
+    assert first_seen_at < 10
+
+async def test_pipeline_handler_errors_are_dropped():
+    """测试处理函数异常时只丢弃该条目"""
+    results = []
+
+    async def fail_on_three(i):
+        if i == 3:
+            raise ValueError("boom")
+        results.append(i)
+
+    await Pipeline([Stage("sink", fail_on_three)]).run(numbers(5))
+    assert results == [0, 1, 2, 4]
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,50 @@
+import pytest
+from src.encoders.encoder import ProxyEncoder
+from src.utils.health_store import HealthStore
+from src.utils.proxy_ranker import ProxyRanker
+
+LINKS = [
+    "ss://YWVzLTEyOC1nY206dGVzdA@192.168.1.1:8388#slow",
+    "ss://YWVzLTEyOC1nY206dGVzdA@192.168.1.2:8388#fast",
+    "ss://YWVzLTEyOC1nY206dGVzdA@192.168.1.3:8388#unmeasured",
+    "ss://YWVzLTEyOC1nY206dGVzdA@192.168.1.4:8388#tcp-only",
+]
+
+@pytest.fixture
+def proxies():
+    return [ProxyEncoder.encode(link) for link in LINKS]
+
+def test_rank_by_latency(proxies):
+    """测试按首字节时间（没有时依次用总时间、TCP时间）排序，未测量的排在最后"""
+    ranker = ProxyRanker({"google": {
+        LINKS[0]: {"ttfb": 0.9, "total": 1.0},
+        LINKS[1]: {"ttfb": 0.2, "total": 0.3},
+        LINKS[3]: {"tcp": 0.5},
+    }})
+    assert [proxy["name"] for proxy in ranker.rank(proxies, "google")] == ["fast", "tcp-only", "slow", "unmeasured"]
+    # 没有该站点的指标时保持原顺序
+    assert [proxy["name"] for proxy in ranker.rank(proxies, "github")] == ["slow", "fast", "unmeasured", "tcp-only"]
+
+def test_rank_overall_uses_best_site(proxies):
+    """测试总排序取代理在各站点中最好的分数，并按服务器去重"""
+    ranker = ProxyRanker({
+        "google": {LINKS[0]: {"ttfb": 0.9}, LINKS[1]: {"ttfb": 0.5}},
+        "github": {LINKS[0]: {"ttfb": 0.1}},
+    })
+    ranked = ranker.rank_overall({"google": proxies[:2], "github": proxies[:1]})
+    assert [proxy["name"] for proxy in ranked] == ["slow", "fast"]
+
+def test_failures_penalized(proxies, tmp_path):
+    """测试连续失败和站点最近一次失败会降低排名"""
+    store = HealthStore(str(tmp_path / "health.db"))
+    store.record(HealthStore.proxy_key(proxies[1]), [], ["google"], now=0)
+    ranker = ProxyRanker({"google": {LINKS[0]: {"ttfb": 0.5}, LINKS[1]: {"ttfb": 0.3}}}, store, failure_penalty=1)
+    try:
+        # 0.3 * (1 + 1 * 2) > 0.5
+        assert [proxy["name"] for proxy in ranker.rank(proxies[:2], "google")] == ["slow", "fast"]
+    finally:
+        ranker.close()
+    assert ranker.health_store is None
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,37 @@
+import pytest
+from src.utils.scheduler import Scheduler
+
+def test_sources_due_independently():
+    """测试每个键按各自的间隔到期，从未运行过的键立即到期"""
+    scheduler = Scheduler(3600, {"fast": 600})
+    assert scheduler.due(["fast", "slow"], now=0) == ["fast", "slow"]
+
+    scheduler.mark("fast", now=0)
+    scheduler.mark("slow", now=0)
+    assert scheduler.due(["fast", "slow"], now=599) == []
+    assert scheduler.due(["fast", "slow"], now=600) == ["fast"]
+    assert scheduler.due(["fast", "slow"], now=3600) == ["fast", "slow"]
+
+def test_wait_time():
+    """测试距离最早到期的键的时间"""
+    scheduler = Scheduler(3600, {"fast": 600})
+    scheduler.mark("fast", now=100)
+    scheduler.mark("slow", now=0)
+    assert scheduler.wait_time(["fast", "slow"], now=200) == 500
+    assert scheduler.wait_time(["fast", "slow"], now=1000) == 0
+    # 有从未运行过的键时立即到期
+    assert scheduler.wait_time(["fast", "new"], now=200) == 0
+    # 没有键时等待默认间隔
+    assert scheduler.wait_time([], now=200) == 3600
+
+def test_clock():
+    """测试未指定时间时使用时钟"""
+    now = [1000.0]
+    scheduler = Scheduler(60, clock=lambda: now[0])
+    scheduler.mark("retest")
+    assert scheduler.due(["retest"]) == []
+    now[0] += 60
+    assert scheduler.due(["retest"]) == ["retest"]
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])